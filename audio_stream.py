@@ -0,0 +1,115 @@
+# audio_stream.py
+import os
+import subprocess
+import threading
+import logging
+# numpy iter_blocks() içinde içe aktarılır (arayüz açılışı)
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SAMPLE_RATE = 16000 # Whisper'ın beklediği örnekleme hızı
+BYTES_PER_SAMPLE = 4 # float32
+DEFAULT_BLOCK_SECONDS = 5 # ffmpeg çıkışından her seferde okunacak ses miktarı
+
+
+def _ffmpeg_popen_kwargs():
+    """Windows'ta ffmpeg için konsol penceresi açılmasını engeller (main_gui.check_ffmpeg ile aynı)."""
+    if os.name == 'nt':
+        return {"creationflags": subprocess.CREATE_NO_WINDOW}
+    return {}
+
+
+def probe_duration(path):
+    """Ses/video dosyasının süresi (sn). ffprobe yoksa veya süre okunamazsa None."""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+           "-of", "default=noprint_wrappers=1:nokey=1", path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, **_ffmpeg_popen_kwargs())
+        return float(result.stdout.strip())
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+class PcmStream:
+    """
+    Tek bir ffmpeg süreci üzerinden 16 kHz mono float32 PCM akışı.
+    Girdi bir dosya yolu olabilir ya da None verilip baytlar feed() ile
+    (örn. indirme sürerken) ffmpeg'in stdin'ine yazılabilir. Çıkış, sabit
+    boyutlu bloklar halinde iter_blocks() ile okunur; tüm ses asla belleğe alınmaz.
+    """
+
+    def __init__(self, input_path=None, start_seconds=0.0):
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+        if input_path:
+            cmd.append("-nostdin")
+        if input_path and start_seconds:
+            cmd += ["-ss", f"{start_seconds:.3f}"] # Girdi tarafında hızlı atlama
+        cmd += ["-i", input_path or "pipe:0",
+                "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL if input_path else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **_ffmpeg_popen_kwargs(),
+        )
+        self._stderr_chunks = []
+        # feed() ile besleyen taraf (örn. indirme thread'i) yarıda kalırsa hatayı buraya yazar;
+        # ffmpeg kesik girdiyle de başarıyla çıktığından wait() bunu ayrıca döndürür
+        self.feed_error = None
+        # stderr dolup ffmpeg'i kilitlemesin diye arka planda okunur
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    def _drain_stderr(self):
+        for line in self._process.stderr:
+            self._stderr_chunks.append(line.decode("utf-8", errors="replace"))
+
+    def feed(self, data):
+        """Kodlanmış ses baytlarını ffmpeg'e yazar. ffmpeg kapandıysa False döner."""
+        try:
+            self._process.stdin.write(data)
+            return True
+        except (BrokenPipeError, OSError):
+            return False
+
+    def close_input(self):
+        """Girdinin bittiğini ffmpeg'e bildirir."""
+        if self._process.stdin:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+
+    def iter_blocks(self, block_seconds=DEFAULT_BLOCK_SECONDS):
+        """ffmpeg çıkışını block_seconds uzunluğunda float32 numpy dizileri olarak üretir."""
+        import numpy as np
+        block_bytes = int(block_seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE
+        pending = b""
+        while True:
+            data = self._process.stdout.read(block_bytes - len(pending))
+            if not data:
+                break
+            pending += data
+            if len(pending) >= block_bytes:
+                yield np.frombuffer(pending, dtype=np.float32)
+                pending = b""
+        # Son (kısmi) blok; float32 sınırına hizalanır
+        usable = len(pending) - len(pending) % BYTES_PER_SAMPLE
+        if usable:
+            yield np.frombuffer(pending[:usable], dtype=np.float32)
+
+    def wait(self):
+        """ffmpeg'in bitmesini bekler. Dönüş: hata mesajı (ffmpeg veya girdi hatası) veya None."""
+        return_code = self._process.wait()
+        self._stderr_thread.join(timeout=5)
+        if return_code != 0:
+            return f"ffmpeg hata kodu {return_code}: {''.join(self._stderr_chunks).strip()[-500:]}"
+        if self.feed_error:
+            return f"Ses girdisi yarıda kaldı: {self.feed_error}"
+        return None
+
+    def kill(self):
+        if self._process.poll() is None:
+            self._process.kill()
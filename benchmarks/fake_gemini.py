@@ -0,0 +1,176 @@
+# benchmarks/fake_gemini.py
+"""
+Gemini REST API'sini taklit eden yerel sunucu (çevrimdışı benchmark/test için).
+summarizer, GEMINI_API_ENDPOINT ortam değişkeni bu sunucunun adresine
+ayarlandığında gerçek API yerine buraya istek gönderir.
+
+Tek başına çalıştırma:
+    python benchmarks/fake_gemini.py --port 8765 --latency 0.5
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PATH_RE = re.compile(r"^/v1beta/models/(?P<model>[^:/]+):(?P<method>\w+)")
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    """
+    latency: her isteğin sabit gecikmesi (sn); latency_per_1k_tokens: prompt
+    uzunluğuna bağlı ek gecikme; failure_rate: 503 dönen isteklerin oranı;
+    rpm_limit: son 60 saniyede bu sayıyı aşan istekler 429 alır (0: sınırsız);
+    stream_chunk_delay: akışlı (streamGenerateContent) yanıtta parçalar arası gecikme.
+    İstek başına gecikmeler `latencies` listesinde tutulur.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.2, latency_per_1k_tokens=0.0, failure_rate=0.0, rpm_limit=0,
+                 stream_chunk_delay=0.05):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.stream_chunk_delay = stream_chunk_delay
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.failure_rate = failure_rate
+        self.rpm_limit = rpm_limit
+        self.latencies = []
+        self.request_count = 0
+        self.rejected_count = 0 # 429 ile reddedilen istekler
+        self._recent = deque() # Kabul edilen isteklerin zamanları (rpm_limit için)
+        self._lock = threading.Lock()
+
+    def _over_rpm_limit(self):
+        if not self.rpm_limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm_limit:
+                self.rejected_count += 1
+                return True
+            self._recent.append(now)
+            return False
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass # Benchmark çıktısını kirletmesin
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, text, prompt_tokens):
+        """
+        streamGenerateContent yanıtı: REST taşımasının beklediği biçimde, parça
+        parça yazılan bir JSON dizisi (bağlantı kapanınca biter).
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        words = text.split(" ")
+        pieces = [" ".join(words[i:i + 4]) + " " for i in range(0, len(words), 4)]
+        self.wfile.write(b"[")
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(self.server.stream_chunk_delay)
+                self.wfile.write(b",\r\n")
+            chunk = {"candidates": [{"content": {"parts": [{"text": piece}], "role": "model"}, "index": 0}]}
+            if i == len(pieces) - 1:
+                chunk["candidates"][0]["finishReason"] = "STOP"
+                chunk["usageMetadata"] = {"promptTokenCount": prompt_tokens,
+                                          "candidatesTokenCount": len(text) // 4,
+                                          "totalTokenCount": prompt_tokens + len(text) // 4}
+            self.wfile.write(json.dumps(chunk).encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"]")
+
+    def do_POST(self):
+        started = time.perf_counter()
+        server = self.server
+        match = _PATH_RE.match(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not match:
+            self._send_json(404, {"error": {"code": 404, "message": f"models/ bulunamadı: {self.path}"}})
+            return
+
+        prompt = " ".join(part.get("text", "")
+                          for content in request.get("contents", [])
+                          for part in content.get("parts", []))
+        prompt_tokens = max(1, len(prompt) // 4)
+
+        with server._lock:
+            server.request_count += 1
+        if match.group("method") != "countTokens" and server._over_rpm_limit():
+            self._send_json(429, {"error": {"code": 429, "message": "Sahte sunucu: kota aşıldı",
+                                            "status": "RESOURCE_EXHAUSTED"}})
+            return
+        if server.failure_rate and random.random() < server.failure_rate:
+            self._send_json(503, {"error": {"code": 503, "message": "Sahte sunucu: geçici hata",
+                                            "status": "UNAVAILABLE"}})
+            return
+
+        time.sleep(server.latency + server.latency_per_1k_tokens * prompt_tokens / 1000)
+        text = (f"Sahte özet ({prompt_tokens} token girdi): Bu metin yerel benchmark sunucusu tarafından "
+                f"üretildi. Akışlı istekte parça parça gönderilir; böylece ilk tokenin gelme süresi ölçülebilir.")
+        if match.group("method") == "streamGenerateContent":
+            self._send_stream(text, prompt_tokens)
+            with server._lock:
+                server.latencies.append(time.perf_counter() - started)
+            return
+        payload = {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": prompt_tokens + len(text) // 4,
+            },
+        }
+        if match.group("method") == "countTokens":
+            payload = {"totalTokens": prompt_tokens}
+        self._send_json(200, payload)
+        with server._lock:
+            server.latencies.append(time.perf_counter() - started)
+
+
+def start_fake_gemini(port=0, **kwargs):
+    """Sunucuyu arka plan thread'inde başlatır. Dönüş: FakeGeminiServer (url özelliği ile)."""
+    server = FakeGeminiServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel sahte Gemini sunucusu")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--latency-per-1k-tokens", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--rpm-limit", type=int, default=0)
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.05)
+    args = parser.parse_args()
+    server = FakeGeminiServer(("127.0.0.1", args.port), latency=args.latency,
+                              latency_per_1k_tokens=args.latency_per_1k_tokens,
+                              failure_rate=args.failure_rate, rpm_limit=args.rpm_limit,
+                              stream_chunk_delay=args.stream_chunk_delay)
+    print(f"Sahte Gemini sunucusu: {server.url} (GEMINI_API_ENDPOINT={server.url})")
+    server.serve_forever()
@@ -0,0 +1,103 @@
+# benchmarks/fixtures.py
+"""
+Benchmark için deterministik sentetik ses dosyaları.
+Dosyalar ilk çalıştırmada üretilir (aynı tohumla her makinede aynı içerik);
+repoya büyük ikili dosyalar eklemek yerine üretici kod paketlenir.
+"""
+import os
+import wave
+import logging
+
+import numpy as np
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SAMPLE_RATE = 16000
+BLOCK_SECONDS = 60 # Uzun dosyalar bellek şişirmeden blok blok yazılır
+
+# Ad -> süre (saniye)
+AUDIO_FIXTURES = {
+    "speech_30s": 30,
+    "speech_2m": 120,
+    "speech_10m": 600,
+}
+
+# Uzun ses modunun tepe bellek ölçümü için (ilk kullanımda üretilir; 4 saat ~460 MB WAV)
+LONG_AUDIO_FIXTURES = {
+    "speech_10m": 600,
+    "speech_1h": 3600,
+    "speech_4h": 14400,
+}
+
+# Sahte Gemini sunucusuna gönderilecek transkript uzunlukları (kelime)
+TEXT_FIXTURES = {
+    "text_short": 800,
+    "text_long": 40000, # map-reduce yolunu tetikler
+}
+
+
+def _speech_like_block(rng, n_samples):
+    """
+    Konuşmaya benzer sinyal: 120-220 Hz temel frekanslı harmonik "heceler",
+    aralarında kısa sessizlikler ve düşük seviyeli arka plan gürültüsü.
+    """
+    out = np.zeros(n_samples, dtype=np.float32)
+    pos = 0
+    while pos < n_samples:
+        if rng.random() < 0.15:
+            pos += int(rng.uniform(0.3, 1.2) * SAMPLE_RATE) # duraklama
+            continue
+        length = int(rng.uniform(0.08, 0.25) * SAMPLE_RATE)
+        length = min(length, n_samples - pos)
+        t = np.arange(length) / SAMPLE_RATE
+        f0 = rng.uniform(120, 220)
+        syllable = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+        envelope = np.sin(np.pi * np.arange(length) / max(1, length)) ** 2
+        out[pos:pos + length] = 0.3 * syllable * envelope
+        pos += length + int(rng.uniform(0.02, 0.08) * SAMPLE_RATE)
+    out += rng.normal(0, 0.005, n_samples).astype(np.float32)
+    return np.clip(out, -1, 1)
+
+
+def write_speech_wav(path, seconds, seed=0):
+    """Verilen sürede 16 kHz mono 16-bit WAV dosyası yazar (blok blok)."""
+    rng = np.random.default_rng(seed)
+    tmp_path = path + ".tmp"
+    with wave.open(tmp_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        remaining = int(seconds * SAMPLE_RATE)
+        while remaining > 0:
+            n = min(remaining, BLOCK_SECONDS * SAMPLE_RATE)
+            wav.writeframes((_speech_like_block(rng, n) * 32767).astype("<i2").tobytes())
+            remaining -= n
+    os.replace(tmp_path, path)
+    return path
+
+
+def audio_fixture(name, seconds=None):
+    """Adı verilen ses fikstürünün yolunu döndürür; yoksa üretir."""
+    seconds = seconds or AUDIO_FIXTURES.get(name) or LONG_AUDIO_FIXTURES[name]
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, f"{name}.wav")
+    if not os.path.exists(path):
+        logging.info(f"Sentetik ses üretiliyor: {path} ({seconds} sn)")
+        write_speech_wav(path, seconds, seed=seconds)
+    return path
+
+
+def text_fixture(name):
+    """Deterministik, cümlelere ayrılmış İngilizce benzeri transkript metni."""
+    words = TEXT_FIXTURES[name]
+    rng = np.random.default_rng(words)
+    vocabulary = ("the model video audio people think about time because really data system "
+                  "result example question process important different change today first "
+                  "number part world point problem new work good way actually").split()
+    sentences = []
+    count = 0
+    while count < words:
+        length = int(rng.integers(8, 20))
+        sentence = " ".join(rng.choice(vocabulary, length))
+        sentences.append(sentence.capitalize() + ".")
+        count += length
+    return " ".join(sentences)
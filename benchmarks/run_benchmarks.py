@@ -0,0 +1,374 @@
+# benchmarks/run_benchmarks.py
+"""
+İndirme, transkript ve özetleme aşamaları için çevrimdışı benchmark.
+
+    python benchmarks/run_benchmarks.py                       # tüm aşamalar
+    python benchmarks/run_benchmarks.py --stages transcribe --whisper-model tiny
+    python benchmarks/run_benchmarks.py --compare eski.json yeni.json
+
+- İndirme: yt-dlp, yerel HTTP sunucusundaki fikstür dosyalarını indirir. --download-profiles
+  ile indirme profilleri (speech: yeniden kodlamasız en küçük ses, quality: m4a) karşılaştırılır;
+  indirilen ve diske yazılan bayt raporlanır.
+- Transkript: farklı uzunluklarda sentetik ses; gerçek zaman faktörü (RTF) raporlanır.
+  --engines ile CPU çıkarım ön ayarlarının (int8, fast, ...) hızı karşılaştırılır. Sentetik
+  seste kelime olmadığından doğruluk (WER) ölçülmez; ön ayarların doğruluk kaybı gerçek
+  konuşma kaydıyla ayrıca değerlendirilmelidir.
+  --vad ile sessizlik/müzik atlanır; atlanan ses süresi raporlanır.
+- Bellek (--stages memory): 10 dk / 1 sa / 4 sa sesle tepe bellek (peak RSS);
+  "long" modda ses süresinden bağımsız kalmalıdır. Varsayılan aşamalara dahil değildir.
+- Özetleme: yerel sahte Gemini sunucusu (ayarlanabilir gecikme). --compress-budgets
+  ile yerel ön sıkıştırmanın token bütçeleri karşılaştırılır; gönderilen token,
+  gecikme ve tahmini maliyet raporlanır.
+Her durum ayrı bir süreçte çalışır; böylece tepe bellek (peak RSS) ölçümleri
+birbirini etkilemez. Sonuçlar commit'ler arası karşılaştırma için JSON'a yazılır.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import threading
+import multiprocessing
+import logging
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from fixtures import AUDIO_FIXTURES, LONG_AUDIO_FIXTURES, TEXT_FIXTURES, FIXTURE_DIR, audio_fixture, text_fixture
+from fake_gemini import start_fake_gemini
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+STAGES = ("download", "transcribe", "summarize")
+EXTRA_STAGES = ("memory",) # Uzun sürer; yalnızca --stages ile açıkça istenince çalışır
+
+
+# --- Ölçüm yardımcıları ---
+
+def _peak_rss_mb():
+    """Mevcut sürecin tepe bellek kullanımı (MB). Windows'ta ölçülemez (None)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """En yakın sıra yöntemiyle yüzdelikler (ms)."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {}
+    for p in points:
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+        result[f"p{p}"] = round(ordered[index] * 1000, 1)
+    return result
+
+
+def _run_isolated(fn, *args):
+    """Fonksiyonu yeni bir süreçte çalıştırır ve sonucuna tepe belleği ekler."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_with_peak_rss, (fn,) + args)
+
+
+def _with_peak_rss(fn, *args):
+    result = fn(*args)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+# --- Durumlar (alt süreçte çalışır) ---
+
+def _case_download(url, repeat, profile):
+    from downloader import download_audio_yt_dlp
+    latencies = []
+    total_bytes = 0
+    downloaded = []
+    errors = []
+    for _ in range(repeat):
+        out_dir = tempfile.mkdtemp(prefix="bench_dl_")
+        started = time.perf_counter()
+        path, error = download_audio_yt_dlp(url, output_path=out_dir, profile=profile,
+                                            on_downloaded=lambda size, seconds: downloaded.append(size))
+        latencies.append(time.perf_counter() - started)
+        if error:
+            errors.append(error)
+        elif path:
+            total_bytes += os.path.getsize(path)
+        shutil.rmtree(out_dir, ignore_errors=True)
+    wall = sum(latencies)
+    return {
+        "wall_seconds": round(wall, 3),
+        "latency_ms": percentiles(latencies),
+        "downloaded_mb": round(sum(downloaded) / repeat / (1024 * 1024), 2),
+        "output_mb": round(total_bytes / repeat / (1024 * 1024), 2),
+        "errors": errors[:3],
+    }
+
+
+def _case_transcribe(path, audio_seconds, model_name, repeat, options):
+    from model_registry import get_model
+    from transcriber import transcribe_audio, resolve_engine
+    from metrics import metrics
+    started = time.perf_counter()
+    get_model(model_name, precision=resolve_engine(options.get("engine"))[0])
+    load_seconds = time.perf_counter() - started
+
+    latencies = []
+    errors = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _, _, error = transcribe_audio(path, model_name=model_name, delete_audio=False, **options)
+        latencies.append(time.perf_counter() - started)
+        if error:
+            errors.append(error)
+    wall = sum(latencies)
+    return {
+        "vad_skipped_seconds": metrics.average("whisper_vad_skipped_seconds"),
+        "wall_seconds": round(wall, 3),
+        "model_load_seconds": round(load_seconds, 3),
+        "audio_seconds": audio_seconds,
+        "rtf": round(wall / repeat / audio_seconds, 4),
+        "latency_ms": percentiles(latencies),
+        "errors": errors[:3],
+    }
+
+
+def _case_summarize(text, endpoint, repeat, concurrency, rpm, tpm, compress_tokens=None):
+    os.environ["GEMINI_API_ENDPOINT"] = endpoint
+    from summarizer import summarize_text, count_tokens, configure_rate_limits, compress_transcript
+    from metrics import metrics
+    configure_rate_limits(rpm, tpm)
+    latencies = []
+    errors = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        summary, error = summarize_text(text, "benchmark-anahtari", "en", max_concurrency=concurrency,
+                                        compress_tokens=compress_tokens)
+        latencies.append(time.perf_counter() - started)
+        if error:
+            errors.append(error)
+    _, compression = compress_transcript(text, compress_tokens)
+    return {
+        "wall_seconds": round(sum(latencies), 3),
+        "input_tokens": compression["input_tokens"],
+        "sent_tokens": compression["output_tokens"],
+        "compress_seconds": compression["seconds"],
+        "prompt_tokens_per_run": round(metrics.counter("gemini_prompt_tokens_total") / repeat),
+        "cost_usd_per_run": round(metrics.counter("gemini_cost_usd_total") / repeat, 6),
+        "latency_ms": percentiles(latencies),
+        "errors": errors[:3],
+    }
+
+
+# --- Aşama çalıştırıcıları (ana süreç) ---
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        # yt-dlp bağlantıyı erken kapatabilir (örn. format tespiti sonrası)
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def _serve_fixtures():
+    """Fikstür klasörünü yerel HTTP sunucusunda yayınlar."""
+    handler = partial(_QuietHandler, directory=FIXTURE_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_download(args):
+    results = []
+    server = _serve_fixtures()
+    host, port = server.server_address[:2]
+    try:
+        for name in args.audio:
+            audio_fixture(name)
+            url = f"http://{host}:{port}/{name}.wav"
+            for profile in args.download_profiles:
+                result = _run_isolated(_case_download, url, args.repeat, profile)
+                result.update(stage="download", case=f"{name}/{profile}", profile=profile,
+                              input_mb=round(os.path.getsize(audio_fixture(name)) / (1024 * 1024), 2))
+                results.append(result)
+                _print_result(result)
+    finally:
+        server.shutdown()
+    return results
+
+
+def bench_transcribe(args):
+    results = []
+    for mode in args.modes:
+        for name in args.audio:
+            path = audio_fixture(name)
+            for engine in args.engines:
+                options = {"mode": mode, "engine": engine, "threads": args.threads, "vad": args.vad}
+                if mode == "batched":
+                    options["batch_size"] = args.batch_size
+                result = _run_isolated(_case_transcribe, path, AUDIO_FIXTURES[name], args.whisper_model,
+                                       args.repeat, options)
+                # Varsayılan ön ayarın durum adı eski sonuç dosyalarıyla karşılaştırılabilir kalır
+                case = (f"{name}/{mode}/{args.whisper_model}" + (f"/{engine}" if engine != "default" else "")
+                        + ("/vad" if args.vad else ""))
+                result.update(stage="transcribe", case=case, engine=engine)
+                results.append(result)
+                _print_result(result)
+    return results
+
+
+def bench_memory(args):
+    """Uzun ses fikstürleriyle transkriptin tepe belleği (her durum ayrı süreçte)."""
+    results = []
+    for mode in args.memory_modes:
+        for name in args.long_audio:
+            path = audio_fixture(name)
+            options = {"mode": mode, "engine": args.engines[0], "threads": args.threads}
+            result = _run_isolated(_case_transcribe, path, LONG_AUDIO_FIXTURES[name], args.whisper_model, 1, options)
+            result.update(stage="memory", case=f"{name}/{mode}/{args.whisper_model}")
+            results.append(result)
+            _print_result(result)
+    return results
+
+
+def bench_summarize(args):
+    results = []
+    server = start_fake_gemini(latency=args.gemini_latency, latency_per_1k_tokens=args.gemini_latency_per_1k)
+    try:
+        for name in TEXT_FIXTURES:
+            for budget in args.compress_budgets:
+                server.latencies.clear()
+                result = _run_isolated(_case_summarize, text_fixture(name), server.url, args.repeat,
+                                       args.concurrency, args.gemini_rpm, args.gemini_tpm, budget or None)
+                result.update(stage="summarize", case=f"{name}@{budget}" if budget else name,
+                              api_calls=len(server.latencies), api_latency_ms=percentiles(server.latencies))
+                results.append(result)
+                _print_result(result)
+    finally:
+        server.shutdown()
+    return results
+
+
+# --- Rapor ---
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_result(result):
+    extra = f" rtf={result['rtf']}" if "rtf" in result else ""
+    if "downloaded_mb" in result:
+        extra += f" downloaded={result['downloaded_mb']}MB output={result['output_mb']}MB"
+    if "sent_tokens" in result:
+        extra += f" tokens={result['input_tokens']}->{result['sent_tokens']} cost=${result['cost_usd_per_run']}"
+    print(f"{result['stage']:<11} {result['case']:<32} wall={result['wall_seconds']:>8.3f}s"
+          f"{extra} peak_rss={result['peak_rss_mb']}MB latency={result['latency_ms']}"
+          + (f" HATA={result['errors'][0]}" if result.get("errors") else ""))
+
+
+def compare(old_path, new_path):
+    """İki sonuç dosyasını durum bazında karşılaştırır (yeni/eski oranı)."""
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["stage"], r["case"]): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    print(f"{'aşama':<11} {'durum':<32} {'eski(s)':>9} {'yeni(s)':>9} {'oran':>6} {'rss eski/yeni (MB)':>20}")
+    for result in new:
+        before = old.get((result["stage"], result["case"]))
+        if not before:
+            continue
+        ratio = result["wall_seconds"] / before["wall_seconds"] if before["wall_seconds"] else float("nan")
+        print(f"{result['stage']:<11} {result['case']:<32} {before['wall_seconds']:>9.3f} "
+              f"{result['wall_seconds']:>9.3f} {ratio:>6.2f} "
+              f"{str(before.get('peak_rss_mb')) + '/' + str(result.get('peak_rss_mb')):>20}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Özetle aşama benchmark'ları (çevrimdışı)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Virgülle ayrılmış aşamalar (ek: {','.join(EXTRA_STAGES)})")
+    parser.add_argument("--audio", default=",".join(AUDIO_FIXTURES), help="Kullanılacak ses fikstürleri")
+    parser.add_argument("--download-profiles", default="speech,quality",
+                        help="İndirme profilleri (speech: yeniden kodlamasız en küçük ses, quality: m4a)")
+    parser.add_argument("--whisper-model", default="tiny")
+    parser.add_argument("--modes", default="sequential", help="Transkript modları (örn. sequential,chunked,batched)")
+    parser.add_argument("--batch-size", type=int, default=8, help="batched modda birlikte çözümlenen pencere sayısı")
+    parser.add_argument("--engines", default="default,int8,fast,accurate",
+                        help="Whisper CPU ön ayarları (hız karşılaştırması)")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op thread sayısı (varsayılan: tüm çekirdekler)")
+    parser.add_argument("--vad", action="store_true", help="Transkriptten önce sessizlik/müzik bölümlerini atla")
+    parser.add_argument("--long-audio", default=",".join(LONG_AUDIO_FIXTURES),
+                        help="Bellek aşamasında kullanılacak uzun ses fikstürleri")
+    parser.add_argument("--memory-modes", default="long", help="Bellek aşamasındaki transkript modları (örn. long,sequential)")
+    parser.add_argument("--repeat", type=int, default=3, help="Durum başına tekrar sayısı")
+    parser.add_argument("--gemini-latency", type=float, default=0.3, help="Sahte Gemini sabit gecikmesi (sn)")
+    parser.add_argument("--gemini-latency-per-1k", type=float, default=0.05,
+                        help="Sahte Gemini'de 1000 prompt token başına ek gecikme (sn)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Eşzamanlı Gemini isteği sayısı")
+    parser.add_argument("--compress-budgets", default="0",
+                        help="Yerel ön sıkıştırma token bütçeleri (örn. 0,2000,8000; 0: kapalı)")
+    parser.add_argument("--gemini-rpm", type=int, default=0, help="İstemci tarafı istek/dakika kotası (0: sınırsız)")
+    parser.add_argument("--gemini-tpm", type=int, default=0, help="İstemci tarafı token/dakika kotası (0: sınırsız)")
+    parser.add_argument("--output", help="Sonuç JSON dosyası (varsayılan: benchmarks/results/<zaman>_<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("ESKI", "YENI"), help="İki sonuç dosyasını karşılaştır")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    args.audio = [name for name in args.audio.split(",") if name]
+    args.download_profiles = [profile for profile in args.download_profiles.split(",") if profile]
+    args.modes = [mode for mode in args.modes.split(",") if mode]
+    args.engines = [engine for engine in args.engines.split(",") if engine]
+    args.long_audio = [name for name in args.long_audio.split(",") if name]
+    args.memory_modes = [mode for mode in args.memory_modes.split(",") if mode]
+    args.compress_budgets = [int(budget) for budget in args.compress_budgets.split(",") if budget]
+    runners = {"download": bench_download, "transcribe": bench_transcribe, "summarize": bench_summarize,
+               "memory": bench_memory}
+
+    results = []
+    for stage in args.stages.split(","):
+        results.extend(runners[stage](args))
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "cpu_count": os.cpu_count()},
+        "settings": {key: value for key, value in vars(args).items() if key not in ("compare", "output")},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{commit or 'nocommit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Sonuçlar: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+# cli.py
+"""
+Arayüzsüz (headless) toplu özetleme.
+
+Örnekler:
+    python cli.py https://youtu.be/VIDEO_ID https://youtu.be/BASKA_ID
+    python cli.py --file urls.txt --output-dir ozetler
+    python cli.py "https://www.youtube.com/@kanal/videos" --downloads 4 --summarizers 8
+    python cli.py --file urls.txt --events-jsonl olaylar.jsonl --metrics-prom ozetle.prom
+
+İndirme (ağ), transkript (CPU) ve özetleme (API) aşamaları sınırlı kuyruklarla
+bağlanmış bir boru hattı olarak çalışır; böylece bir video özetlenirken
+diğeri yazıya dökülür, bir başkası indirilir.
+"""
+import os
+import re
+import sys
+import json
+import queue
+import shutil
+import argparse
+import tempfile
+import threading
+import logging
+import multiprocessing
+
+from downloader import (expand_playlist, CAPTION_POLICIES, CAPTION_POLICY_PREFER, DOWNLOAD_PROFILES,
+                        DEFAULT_DOWNLOAD_PROFILE)
+from summarizer import save_summary, configure_rate_limits, DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
+from result_cache import ResultCache
+from video_store import VideoStore, DEFAULT_STORE_PATH
+from metrics import metrics
+from transcriber import ENGINE_PRESETS, DEFAULT_ENGINE, DEFAULT_BATCH_SIZE
+from pipeline import (VideoJob, lookup_cached, fetch_stage, transcribe_stage, summarize_stage,
+                      cleanup_job, STATUS_FAILED, STATUS_DONE)
+
+# Logger kurulumu
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MANIFEST_NAME = "manifest.jsonl"
+QUEUE_SIZE = 4 # Aşamalar arası kuyruklarda bekleyebilecek en fazla iş
+
+_DONE = object() # Kuyruk sonu işareti
+
+
+def read_urls(args):
+    """Komut satırı, dosya ve oynatma listesi/kanal URL'lerinden video URL listesi üretir."""
+    raw_urls = list(args.urls)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            raw_urls.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+    urls = []
+    for url in raw_urls:
+        expanded, error = expand_playlist(url)
+        if error:
+            logging.error(f"URL atlandı ({url}): {error}")
+        urls.extend(expanded)
+    # Sırayı koruyarak tekrarları çıkar
+    return list(dict.fromkeys(urls))
+
+
+def _stage_worker(stage_fn, in_queue, out_queue):
+    """
+    Girdi kuyruğundan iş alır, aşamayı uygular ve sonraki kuyruğa aktarır.
+    Hatalı işler de aktarılır (manifest'e yazılmaları için); sonraki aşamalar onları atlar.
+    """
+    while True:
+        job = in_queue.get()
+        if job is _DONE:
+            in_queue.put(_DONE) # Aynı aşamadaki diğer işçiler için geri koy
+            break
+        if not job.error:
+            try:
+                stage_fn(job)
+            except Exception as e:
+                logging.error(f"Beklenmedik aşama hatası ({job.url}): {e}", exc_info=True)
+                job.error = f"Beklenmedik hata: {e}"
+        out_queue.put(job)
+
+
+def _run_stage(name, stage_fn, n_workers, in_queue, out_queue):
+    """Bir aşama için n_workers thread başlatır; hepsi bitince sonraki kuyruğa işaret koyar."""
+    threads = [threading.Thread(target=_stage_worker, args=(stage_fn, in_queue, out_queue),
+                                name=f"{name}-{i}", daemon=True)
+               for i in range(max(1, n_workers))]
+    for thread in threads:
+        thread.start()
+
+    def closer():
+        for thread in threads:
+            thread.join()
+        out_queue.put(_DONE)
+
+    closer_thread = threading.Thread(target=closer, name=f"{name}-closer", daemon=True)
+    closer_thread.start()
+    return closer_thread
+
+
+def write_result(job, output_dir, manifest_lock):
+    """Başarılı işin özetini video başına bir dosyaya yazar ve manifest'e bir satır ekler."""
+    record = job.to_dict()
+    if not job.error:
+        name = job.video_id or re.sub(r'\W+', '_', job.url)[-60:]
+        filename = os.path.join(output_dir, f"{name}.txt")
+        saved, save_error = save_summary(job.summary, filename=filename)
+        if save_error:
+            record["status"] = STATUS_FAILED
+            record["error"] = save_error
+        else:
+            record["output"] = filename
+
+    with manifest_lock:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return record
+
+
+def run_batch(urls, api_key, output_dir, caption_policy=CAPTION_POLICY_PREFER, whisper_model="base",
+              downloads=3, transcribers=1, summarizers=4, whisper_workers=None, stream_audio=False,
+              cache=None, whisper_engine=DEFAULT_ENGINE, whisper_threads=None, vad=False,
+              whisper_mode="chunked", whisper_batch_size=DEFAULT_BATCH_SIZE, compress_tokens=None, store=None,
+              download_profile=DEFAULT_DOWNLOAD_PROFILE):
+    """
+    URL listesini indirme -> transkript -> özet boru hattından geçirir.
+    store (VideoStore) verilirse her sonuç arşive de yazılır (toplu işlemlerle).
+    Dönüş: manifest kayıtlarının listesi.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cache = cache or ResultCache()
+    workspace = tempfile.mkdtemp(prefix="ozetle_batch_")
+    # Eşzamanlı transkript işleri çekirdekleri paylaşır (torch thread sayısı açıkça verilir)
+    whisper_threads = whisper_threads or max(1, (os.cpu_count() or 1) // max(1, transcribers))
+    whisper_options = {"mode": whisper_mode, "workers": whisper_workers, "engine": whisper_engine,
+                       "threads": whisper_threads, "vad": vad, "batch_size": whisper_batch_size}
+
+    download_q = queue.Queue()
+    transcribe_q = queue.Queue(maxsize=QUEUE_SIZE)
+    summarize_q = queue.Queue(maxsize=QUEUE_SIZE)
+    results_q = queue.Queue()
+
+    def fetch(job):
+        lookup_cached(job, cache)
+        error = fetch_stage(job, cache)
+        if error:
+            job.error = error
+
+    def transcribe(job):
+        error = transcribe_stage(job, cache)
+        cleanup_job(job, remove_workspace=False) # Klasör tüm işlerle paylaşılıyor
+        if error:
+            job.error = error
+
+    def summarize(job):
+        error = summarize_stage(job, cache, api_key)
+        if error:
+            job.error = error
+
+    _run_stage("download", fetch, downloads, download_q, transcribe_q)
+    _run_stage("transcribe", transcribe, transcribers, transcribe_q, summarize_q)
+    _run_stage("summarize", summarize, summarizers, summarize_q, results_q)
+
+    for url in urls:
+        download_q.put(VideoJob(url, caption_policy=caption_policy, whisper_model=whisper_model,
+                                whisper_options=whisper_options, workspace=workspace,
+                                stream_audio=stream_audio, summary_options={"compress_tokens": compress_tokens},
+                                download_profile=download_profile))
+    download_q.put(_DONE)
+
+    manifest_lock = threading.Lock()
+    records = []
+    while True:
+        job = results_q.get()
+        if job is _DONE:
+            break
+        record = write_result(job, output_dir, manifest_lock)
+        records.append(record)
+        if store and (job.transcript or job.summary):
+            store.put(job.store_record())
+        logging.info(f"[{len(records)}/{len(urls)}] {record['status']}: {job.url}")
+
+    shutil.rmtree(workspace, ignore_errors=True)
+    if store:
+        store.flush()
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="YouTube videolarını arayüz olmadan toplu olarak özetler.")
+    parser.add_argument("urls", nargs="*", help="Video, oynatma listesi veya kanal URL'leri")
+    parser.add_argument("-f", "--file", help="Her satırında bir URL bulunan dosya")
+    parser.add_argument("-o", "--output-dir", default="ozetler", help="Özet dosyaları ve manifest klasörü")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"),
+                        help="Gemini API anahtarı (varsayılan: GEMINI_API_KEY ortam değişkeni)")
+    parser.add_argument("--caption-policy", choices=CAPTION_POLICIES, default=CAPTION_POLICY_PREFER)
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--downloads", type=int, default=3, help="Eşzamanlı indirme sayısı")
+    parser.add_argument("--download-profile", choices=DOWNLOAD_PROFILES, default=DEFAULT_DOWNLOAD_PROFILE,
+                        help="speech: konuşma için yeterli en küçük ses, yeniden kodlamadan; quality: en iyi ses (m4a)")
+    parser.add_argument("--transcribers", type=int, default=1, help="Eşzamanlı transkript işi sayısı")
+    parser.add_argument("--whisper-workers", type=int, default=None,
+                        help="Transkript işi başına Whisper işçi süreci (CPU bütçesi = transcribers x bu değer)")
+    parser.add_argument("--whisper-mode", choices=("sequential", "chunked", "batched", "long"), default="chunked",
+                        help="chunked: parçalar ayrı süreçlerde; batched: 30 sn'lik pencereler tek süreçte yığın halinde; "
+                             "long: ses belleğe alınmadan bloklar halinde (çok saatlik sesler için)")
+    parser.add_argument("--whisper-batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="batched modda birlikte çözümlenen pencere sayısı")
+    parser.add_argument("--whisper-engine", choices=list(ENGINE_PRESETS), default=DEFAULT_ENGINE,
+                        help="CPU çıkarım ön ayarı: hassasiyet (fp32/int8) ve çözümleme (beam_size, best_of, sıcaklık)")
+    parser.add_argument("--whisper-threads", type=int, default=None,
+                        help="Transkript işi başına torch thread sayısı (varsayılan: çekirdek / transcribers)")
+    parser.add_argument("--vad", action="store_true",
+                        help="Sessizlik ve müzik bölümlerini Whisper'a vermeden atla (zaman damgaları korunur)")
+    parser.add_argument("--summarizers", type=int, default=4, help="Eşzamanlı Gemini çağrısı sayısı")
+    parser.add_argument("--compress-tokens", type=int, default=None,
+                        help="Transkripti Gemini'den önce yerelde bu token bütçesine indir (TextRank cümle seçimi)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Sesi diske yazmadan indirirken yazıya dök (geçici dosya ve yeniden kodlama yok)")
+    parser.add_argument("--gemini-rpm", type=int, default=None,
+                        help=f"Gemini istek/dakika kotası, tüm işler için ortak (varsayılan: {DEFAULT_REQUESTS_PER_MINUTE}, 0: sınırsız)")
+    parser.add_argument("--gemini-tpm", type=int, default=None,
+                        help=f"Gemini token/dakika kotası (varsayılan: {DEFAULT_TOKENS_PER_MINUTE}, 0: sınırsız)")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH,
+                        help="Transkript/özet arşivi (SQLite, tam metin aranabilir; boş: kapalı)")
+    parser.add_argument("--events-jsonl", help="Aşama/ölçüm olaylarının JSON satırları olarak ekleneceği dosya")
+    parser.add_argument("--metrics-prom", help="Prometheus metin biçiminde sayaç/özet dosyası")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("Gemini API anahtarı gerekli (--api-key veya GEMINI_API_KEY).")
+    if not args.urls and not args.file:
+        parser.error("En az bir URL veya --file belirtin.")
+
+    configure_rate_limits(args.gemini_rpm, args.gemini_tpm)
+    if args.events_jsonl:
+        metrics.enable_jsonl(args.events_jsonl)
+    if args.metrics_prom:
+        metrics.enable_prometheus(args.metrics_prom)
+
+    urls = read_urls(args)
+    if not urls:
+        logging.error("İşlenecek video bulunamadı.")
+        return 1
+
+    records = run_batch(urls, args.api_key, args.output_dir, caption_policy=args.caption_policy,
+                        whisper_model=args.whisper_model, downloads=args.downloads,
+                        transcribers=args.transcribers, summarizers=args.summarizers,
+                        whisper_workers=args.whisper_workers, stream_audio=args.stream,
+                        whisper_engine=args.whisper_engine, whisper_threads=args.whisper_threads,
+                        vad=args.vad, whisper_mode=args.whisper_mode,
+                        whisper_batch_size=args.whisper_batch_size, compress_tokens=args.compress_tokens,
+                        store=VideoStore(args.store) if args.store else None,
+                        download_profile=args.download_profile)
+    failed = sum(1 for record in records if record["status"] != STATUS_DONE)
+    logging.info(f"Tamamlandı: {len(records) - failed} başarılı, {failed} başarısız. "
+                 f"Manifest: {os.path.join(args.output_dir, MANIFEST_NAME)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,18 +1,96 @@
 # downloader.py
-import yt_dlp
+# yt_dlp modül yüklenirken değil, kullanan fonksiyonlarda içe aktarılır (arayüz açılışı)
 import os
+import re
 import time
+import html
+import threading
 import logging # Hata ayıklama için logging ekleyelim
+import xml.etree.ElementTree as ET
+
+from metrics import metrics
 
 # Logger kurulumu (isteğe bağlı ama faydalı)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def download_audio_yt_dlp(url, output_path="temp_audio"):
+# İndirme formatı ve dönüştürme ayarları (önbellek anahtarında da kullanılır)
+AUDIO_FORMAT = 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best' # Öncelikli formatlar
+AUDIO_CODEC = 'm4a'
+AUDIO_QUALITY = '128'
+
+# İndirme profilleri
+DOWNLOAD_PROFILE_SPEECH = "speech" # Konuşma için yeterli en küçük ses, kapsayıcısı korunur (yeniden kodlama yok)
+DOWNLOAD_PROFILE_QUALITY = "quality" # En iyi ses, m4a'ya yeniden kodlanır
+DOWNLOAD_PROFILES = (DOWNLOAD_PROFILE_SPEECH, DOWNLOAD_PROFILE_QUALITY)
+DEFAULT_DOWNLOAD_PROFILE = DOWNLOAD_PROFILE_SPEECH
+# Whisper sesi zaten 16 kHz mono'ya indirir; bunun üstündeki bit hızı yalnızca indirme süresini uzatır
+SPEECH_MIN_ABR = 48 # kbit/s
+SPEECH_MIN_ASR = 16000 # Hz
+# Tabana uyan biçimler arasında "en iyi" = en düşük bit hızı / en küçük dosya (sıralama +abr, +size).
+# Önce dil: çok dilli videolarda orijinal ses, daha küçük dublaj izine tercih edilir.
+SPEECH_AUDIO_FORMAT = (f'bestaudio[abr>={SPEECH_MIN_ABR}][asr>={SPEECH_MIN_ASR}]'
+                       f'/bestaudio[asr>={SPEECH_MIN_ASR}]/bestaudio/best')
+SPEECH_FORMAT_SORT = ('lang', '+abr', '+size')
+CONCURRENT_FRAGMENTS = 4 # DASH/HLS parçalarının eşzamanlı indirilme sayısı
+
+# youtube.com/watch?v=ID, youtu.be/ID, /shorts/ID, /embed/ID, /live/ID biçimleri
+_VIDEO_ID_RE = re.compile(r'(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([0-9A-Za-z_-]{11})')
+
+def extract_video_id(url):
+    """URL'den 11 karakterlik YouTube video ID'sini çıkarır; bulunamazsa None."""
+    match = _VIDEO_ID_RE.search(url or "")
+    return match.group(1) if match else None
+
+def audio_cache_params(profile=DEFAULT_DOWNLOAD_PROFILE):
+    """Ses önbelleği anahtarı için indirme parametreleri."""
+    if profile == DOWNLOAD_PROFILE_SPEECH:
+        return {"profile": profile, "format": SPEECH_AUDIO_FORMAT, "sort": list(SPEECH_FORMAT_SORT)}
+    return {"format": AUDIO_FORMAT, "codec": AUDIO_CODEC, "quality": AUDIO_QUALITY}
+
+def _download_options(profile):
+    """Profile göre yt-dlp biçim seçimi ve son işlem ayarları."""
+    if profile == DOWNLOAD_PROFILE_SPEECH:
+        # Son işlem yok: ffmpeg/Whisper webm/opus ve m4a'yı doğrudan okur
+        return {'format': SPEECH_AUDIO_FORMAT, 'format_sort': list(SPEECH_FORMAT_SORT)}
+    return {
+        'format': AUDIO_FORMAT,
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': AUDIO_CODEC, # Tercihen m4a, yoksa yt-dlp en iyisini seçer
+            'preferredquality': AUDIO_QUALITY, # Kalite (isteğe bağlı)
+        }],
+    }
+
+class _DownloadProgress:
+    """yt-dlp progress_hooks: ilerlemeyi ve indirilen bayt sayısını ölçüm katmanına bildirir."""
+
+    def __init__(self):
+        self.bytes = 0
+        self._last_fraction = -1.0
+
+    def __call__(self, d):
+        if d['status'] == 'downloading':
+            total = d.get('total_bytes') or d.get('total_bytes_estimate')
+            done = d.get('downloaded_bytes') or 0
+            # Olay seli olmaması için en az %1'lik değişimlerde bildir
+            if total and done / total - self._last_fraction >= 0.01:
+                self._last_fraction = done / total
+                metrics.progress(done / total, downloaded_bytes=done, speed=d.get('speed'))
+        elif d['status'] == 'finished':
+            self.bytes += d.get('total_bytes') or d.get('downloaded_bytes') or 0
+
+def download_audio_yt_dlp(url, output_path="temp_audio", on_info=None, profile=DEFAULT_DOWNLOAD_PROFILE,
+                          on_downloaded=None):
     """
     YouTube videosunun sesini yt-dlp kullanarak indirir.
     Belirtilen output_path klasörüne '{video_id}.{ext}' formatında kaydeder.
     Başarılı olursa indirilen dosyanın tam yolunu döndürür.
+    on_info(info_dict) verilirse video bilgileriyle (başlık, süre) çağrılır.
+    profile: DOWNLOAD_PROFILE_SPEECH (en küçük yeterli ses, yeniden kodlama yok)
+    veya DOWNLOAD_PROFILE_QUALITY (en iyi ses, m4a'ya dönüştürülür).
+    on_downloaded(bayt, saniye) verilirse indirme bitince çağrılır.
     """
+    import yt_dlp
     if not os.path.exists(output_path):
         try:
             os.makedirs(output_path)
@@ -28,28 +106,31 @@ def download_audio_yt_dlp(url, output_path="temp_audio"):
     output_template = os.path.join(output_path, '%(id)s.%(ext)s')
 
     ydl_opts = {
-        'format': 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best', # Öncelikli formatlar
         'outtmpl': output_template,
         'noplaylist': True, # Sadece tek video indir
         'quiet': True, # Konsol çıktısını azalt
         'no_warnings': True, # Uyarıları gizle
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'm4a', # Tercihen m4a, yoksa yt-dlp en iyisini seçer
-            'preferredquality': '128', # Kalite (isteğe bağlı)
-        }],
+        'continuedl': True, # Aynı klasörde kalan .part dosyasından indirmeye devam et
+        'nopart': False, # Yarım indirme .part dosyasında tutulur (kesilirse yeniden başlamaz)
+        'concurrent_fragment_downloads': CONCURRENT_FRAGMENTS,
         'logger': logging.getLogger('yt_dlp'), # yt-dlp loglarını yakala
          # 'verbose': True, # Daha detaylı hata ayıklama için açılabilir
     }
+    ydl_opts.update(_download_options(profile))
+    progress = _DownloadProgress()
+    ydl_opts['progress_hooks'] = [progress]
 
     downloaded_file_path = None
     error_message = None
 
     try:
         logging.info(f"yt-dlp ile ses indiriliyor: {url}")
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        started = time.perf_counter()
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl, metrics.span("ytdlp_download", profile=profile):
             # extract_info ile hem bilgi alıp hem indirebiliriz
             info_dict = ydl.extract_info(url, download=True)
+            if on_info:
+                on_info(info_dict)
             # İndirme sonrası dosya yolunu kesin olarak alalım
             # prepare_filename, şablona göre dosya adını oluşturur
             downloaded_file_path = ydl.prepare_filename(info_dict)
@@ -57,7 +138,8 @@ def download_audio_yt_dlp(url, output_path="temp_audio"):
             # Dosyanın gerçekten var olduğunu kontrol et
             if not os.path.exists(downloaded_file_path):
                  # Bazen uzantı değişebilir, klasördeki dosyayı bulmayı dene
-                 possible_files = [os.path.join(output_path, f) for f in os.listdir(output_path) if f.startswith(info_dict['id'])]
+                 possible_files = [os.path.join(output_path, f) for f in os.listdir(output_path)
+                                   if f.startswith(info_dict['id']) and not f.endswith(('.part', '.ytdl'))]
                  if possible_files:
                       downloaded_file_path = max(possible_files, key=os.path.getctime) # en yenisi
                       if not os.path.exists(downloaded_file_path):
@@ -66,7 +148,15 @@ def download_audio_yt_dlp(url, output_path="temp_audio"):
                      downloaded_file_path = None
 
             if downloaded_file_path:
-                logging.info(f"Ses başarıyla indirildi: {downloaded_file_path}")
+                elapsed = time.perf_counter() - started
+                logging.info(f"Ses başarıyla indirildi: {downloaded_file_path} "
+                             f"({progress.bytes / (1024 * 1024):.2f} MB, {elapsed:.1f} sn, profil: {profile})")
+                metrics.incr("download_bytes_total", progress.bytes)
+                metrics.observe("download_bytes", progress.bytes, profile=profile)
+                if elapsed > 0:
+                    metrics.observe("download_throughput_bytes_per_second", progress.bytes / elapsed)
+                if on_downloaded:
+                    on_downloaded(progress.bytes, elapsed)
             else:
                 error_message = f"İndirme sonrası dosya bulunamadı. Video ID: {info_dict.get('id', 'N/A')}"
                 logging.error(error_message)
@@ -78,4 +168,289 @@ def download_audio_yt_dlp(url, output_path="temp_audio"):
         error_message = f"Ses indirme sırasında beklenmedik hata: {e}"
         logging.error(error_message, exc_info=True)
 
-    return downloaded_file_path, error_message
\ No newline at end of file
+    return downloaded_file_path, error_message
+
+
+# --- Altyazı (caption) öncelikli transkript ---
+
+# Transkript kaynağı politikası
+CAPTION_POLICY_ONLY = "captions-only" # Yalnızca altyazı; yoksa hata
+CAPTION_POLICY_PREFER = "prefer-captions" # Yeterli altyazı varsa kullan, yoksa Whisper
+CAPTION_POLICY_WHISPER = "always-whisper" # Her zaman ses indir + Whisper
+CAPTION_POLICIES = (CAPTION_POLICY_PREFER, CAPTION_POLICY_ONLY, CAPTION_POLICY_WHISPER)
+
+CAPTION_FORMATS = ('vtt', 'srv3', 'srv2', 'srv1') # Tercih sırası
+MIN_CAPTION_WORDS_PER_MINUTE = 30 # Bunun altındaki altyazılar "yetersiz" sayılır
+
+_VTT_TIMING_RE = re.compile(r'^(\S+)\s+-->\s+(\S+)')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+def caption_cache_params():
+    """Altyazıdan gelen transkriptler için önbellek anahtarı parametreleri."""
+    return {"source": "captions"}
+
+def _vtt_time(value):
+    """'00:01:02.345' veya '01:02.345' biçimindeki zamanı saniyeye çevirir."""
+    parts = value.replace(',', '.').split(':')
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def parse_vtt(content):
+    """
+    WebVTT altyazısını [(başlangıç, bitiş, metin), ...] listesine çevirir.
+    Otomatik altyazılardaki kayan (tekrarlanan) satırlar ayıklanır.
+    """
+    segments = []
+    previous_lines = []
+    start = end = None
+    for block in re.split(r'\r?\n\s*\r?\n', content):
+        lines = [line.strip() for line in block.strip().splitlines()]
+        timing_index = next((i for i, line in enumerate(lines) if _VTT_TIMING_RE.match(line)), None)
+        if timing_index is None:
+            continue # WEBVTT başlığı, NOTE, STYLE blokları
+        match = _VTT_TIMING_RE.match(lines[timing_index])
+        start, end = _vtt_time(match.group(1)), _vtt_time(match.group(2))
+        cue_lines = []
+        for line in lines[timing_index + 1:]:
+            text = html.unescape(_TAG_RE.sub('', line)).strip()
+            # Bir önceki ipucunda zaten görünen satırlar (kayan altyazı) atlanır
+            if text and text not in previous_lines:
+                cue_lines.append(text)
+        previous_lines = [html.unescape(_TAG_RE.sub('', line)).strip() for line in lines[timing_index + 1:]]
+        if cue_lines:
+            segments.append((start, end, " ".join(cue_lines)))
+    return segments
+
+def parse_srv(content):
+    """
+    YouTube'un XML altyazı biçimlerini (srv1/srv2/srv3) [(başlangıç, bitiş, metin), ...]
+    listesine çevirir. srv1 saniye (start/dur), srv2/srv3 milisaniye (t/d) kullanır.
+    """
+    segments = []
+    root = ET.fromstring(content)
+    for elem in root.iter():
+        if elem.tag == 'text' and 'start' in elem.attrib:
+            start = float(elem.attrib['start'])
+            end = start + float(elem.attrib.get('dur', 0))
+        elif elem.tag == 'p' and 't' in elem.attrib:
+            start = int(elem.attrib['t']) / 1000
+            end = start + int(elem.attrib.get('d', 0)) / 1000
+        else:
+            continue
+        text = html.unescape(" ".join("".join(elem.itertext()).split()))
+        if text:
+            segments.append((start, end, text))
+    return segments
+
+def _pick_track(tracks, language):
+    """
+    Dil koduna en uygun altyazı izini ve biçimini seçer.
+    Dönüş: (dil_kodu, iz_sözlüğü) veya (None, None)
+    """
+    if not tracks:
+        return None, None
+    codes = [code for code in tracks if code != 'live_chat']
+    if language:
+        # Tam eşleşme, otomatik altyazıların orijinal dili (-orig), sonra ön ek eşleşmesi (en-US)
+        ordered = [c for c in codes if c == language] + \
+                  [c for c in codes if c == f"{language}-orig"] + \
+                  [c for c in codes if c.split('-')[0] == language]
+    else:
+        # Dil bilinmiyorsa yalnızca orijinal dildeki otomatik iz ya da tek elle yüklenmiş iz;
+        # birden çok iz varsa hangisinin çeviri olduğu bilinemez, Whisper'a bırakılır
+        ordered = [c for c in codes if c.endswith('-orig')] or (codes if len(codes) == 1 else [])
+    for code in ordered:
+        by_ext = {t.get('ext'): t for t in tracks[code] if t.get('url')}
+        for ext in CAPTION_FORMATS:
+            if ext in by_ext:
+                return code, by_ext[ext]
+    return None, None
+
+def fetch_captions(url, on_info=None, on_segments=None):
+    """
+    Videonun mevcut altyazılarını (önce yükleyicinin eklediği, yoksa otomatik
+    altyazılar) videonun kendi dilinde indirir ve düz metne çevirir.
+    Dönüş: (transkript, dil, kaynak, hata). kaynak: 'manual' veya 'auto'.
+    Altyazı yoksa veya süreye göre çok seyrekse transkript None döner.
+    on_info(info_dict) video bilgileriyle, on_segments(segmentler) kullanılan
+    altyazının zaman damgalı (başlangıç, bitiş, metin) satırlarıyla çağrılır.
+    """
+    import yt_dlp
+    ydl_opts = {
+        'noplaylist': True,
+        'quiet': True,
+        'no_warnings': True,
+        'skip_download': True,
+        'logger': logging.getLogger('yt_dlp'),
+    }
+    try:
+        logging.info(f"Altyazılar kontrol ediliyor: {url}")
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info_dict = ydl.extract_info(url, download=False)
+            language = info_dict.get('language')
+            if on_info:
+                on_info(info_dict)
+
+            for source, tracks in (('manual', info_dict.get('subtitles')),
+                                   ('auto', info_dict.get('automatic_captions'))):
+                code, track = _pick_track(tracks, language)
+                if not track:
+                    continue
+                content = ydl.urlopen(track['url']).read().decode('utf-8', errors='replace')
+                segments = parse_vtt(content) if track['ext'] == 'vtt' else parse_srv(content)
+                transcript = " ".join(text for _, _, text in segments).strip()
+                if not transcript:
+                    continue
+
+                # Yeterlilik kontrolü: dakika başına kelime sayısı
+                duration = info_dict.get('duration')
+                words = len(transcript.split())
+                if duration and words / (duration / 60) < MIN_CAPTION_WORDS_PER_MINUTE:
+                    logging.info(f"Altyazı ({source}, {code}) çok seyrek: {words} kelime / {duration} sn")
+                    continue
+
+                detected_language = (language or code).split('-')[0]
+                logging.info(f"Altyazı kullanılacak: {source} ({code}), {words} kelime")
+                if on_segments:
+                    on_segments(segments)
+                return transcript, detected_language, source, None
+
+        return None, None, None, "Videoda kullanılabilir altyazı bulunamadı."
+
+    except yt_dlp.utils.DownloadError as e:
+        error_message = f"yt-dlp Altyazı Hatası: {e}"
+        logging.error(error_message, exc_info=True)
+    except Exception as e:
+        error_message = f"Altyazı alınırken beklenmedik hata: {e}"
+        logging.error(error_message, exc_info=True)
+    return None, None, None, error_message
+
+
+# --- Oynatma listesi / kanal genişletme ---
+
+def _flatten_entries(info_dict):
+    """İç içe oynatma listesi girdilerini (örn. kanal sekmeleri) düz video URL listesine çevirir."""
+    urls = []
+    for entry in info_dict.get('entries') or []:
+        if not entry:
+            continue
+        if entry.get('_type') == 'playlist' or entry.get('entries'):
+            urls.extend(_flatten_entries(entry))
+            continue
+        url = entry.get('url') or entry.get('webpage_url')
+        if entry.get('id') and (not url or not url.startswith('http')):
+            url = f"https://www.youtube.com/watch?v={entry['id']}"
+        if url:
+            urls.append(url)
+    return urls
+
+def expand_playlist(url):
+    """
+    Oynatma listesi veya kanal URL'sini içindeki video URL'lerine genişletir
+    (videolar indirilmez, yalnızca liste okunur). Tek video URL'si olduğu gibi döner.
+    Dönüş: (url_listesi, hata)
+    """
+    import yt_dlp
+    ydl_opts = {
+        'extract_flat': 'in_playlist', # Liste elemanlarının ayrıntılarını çekme
+        'quiet': True,
+        'no_warnings': True,
+        'logger': logging.getLogger('yt_dlp'),
+    }
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info_dict = ydl.extract_info(url, download=False)
+        if info_dict.get('_type') == 'playlist' or info_dict.get('entries') is not None:
+            urls = _flatten_entries(info_dict)
+            logging.info(f"Oynatma listesi genişletildi: {len(urls)} video ({url})")
+            return urls, None
+        return [url], None
+    except yt_dlp.utils.DownloadError as e:
+        error_message = f"yt-dlp Liste Hatası: {e}"
+        logging.error(error_message, exc_info=True)
+    except Exception as e:
+        error_message = f"Oynatma listesi okunurken beklenmedik hata: {e}"
+        logging.error(error_message, exc_info=True)
+    return [], error_message
+
+
+# --- Akış (streaming) modu: indirilen baytlar doğrudan ffmpeg'e ---
+
+# Parça parça (Range) indirilebilen, DASH/HLS olmayan ses formatları
+STREAM_FORMAT = 'bestaudio[protocol=https]/bestaudio[protocol=http]/bestaudio'
+STREAM_CHUNK_BYTES = 1024 * 1024 # YouTube tek seferlik büyük isteklerde hızı düşürür; 1 MB'lık Range istekleri
+
+def _feed_download(ydl, info_dict, stream, chunk_bytes):
+    """Ses baytlarını Range istekleriyle indirip ffmpeg'in stdin'ine yazar (arka plan thread'i)."""
+    import yt_dlp
+    from yt_dlp.networking import Request
+    from yt_dlp.networking.exceptions import HTTPError
+
+    headers = dict(info_dict.get('http_headers') or {})
+    offset = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            request = Request(info_dict['url'], headers={**headers, 'Range': f'bytes={offset}-{offset + chunk_bytes - 1}'})
+            try:
+                with ydl.urlopen(request) as response:
+                    data = response.read()
+                    partial = response.status == 206
+            except HTTPError as e:
+                if e.status == 416: # Dosyanın sonu aşıldı
+                    break
+                raise
+            if not data or not stream.feed(data):
+                break
+            offset += len(data)
+            # Sunucu Range'i yok saydıysa (200) tüm dosya zaten geldi
+            if not partial or len(data) < chunk_bytes:
+                break
+        logging.info(f"Akış indirmesi tamamlandı: {offset / (1024 * 1024):.1f} MB")
+        metrics.incr("download_bytes_total", offset)
+        metrics.observe("download_throughput_bytes_per_second", offset / max(1e-6, time.perf_counter() - started))
+    except Exception as e:
+        # Kesik transkript başarı sayılıp önbelleğe yazılmasın diye hata akışa işlenir (PcmStream.wait)
+        stream.feed_error = f"{e} ({offset / (1024 * 1024):.1f} MB indirildikten sonra)"
+        logging.error(f"Akış indirmesi sırasında hata: {e}", exc_info=True)
+    finally:
+        stream.close_input()
+        ydl.close()
+
+def stream_audio_yt_dlp(url, chunk_bytes=STREAM_CHUNK_BYTES):
+    """
+    Videonun sesini diske yazmadan indirir ve tek bir ffmpeg sürecinden
+    16 kHz mono float32 PCM olarak akıtır. İndirme arka planda sürerken
+    dönen akıştan bloklar okunabilir (ilk pencereler hemen yazıya dökülebilir).
+    Dönüş: (PcmStream, info_dict, hata)
+    """
+    import yt_dlp
+    from audio_stream import PcmStream
+
+    ydl_opts = {
+        'format': STREAM_FORMAT,
+        'noplaylist': True,
+        'quiet': True,
+        'no_warnings': True,
+        'logger': logging.getLogger('yt_dlp'),
+    }
+    try:
+        logging.info(f"yt-dlp ile ses akışı başlatılıyor: {url}")
+        ydl = yt_dlp.YoutubeDL(ydl_opts)
+        info_dict = ydl.extract_info(url, download=False)
+        if not info_dict.get('url'):
+            ydl.close()
+            return None, info_dict, "Akışa uygun ses formatı bulunamadı."
+        stream = PcmStream()
+        threading.Thread(target=_feed_download, args=(ydl, info_dict, stream, chunk_bytes),
+                         daemon=True).start()
+        return stream, info_dict, None
+    except yt_dlp.utils.DownloadError as e:
+        error_message = f"yt-dlp Akış Hatası: {e}"
+        logging.error(error_message, exc_info=True)
+    except Exception as e:
+        error_message = f"Ses akışı başlatılırken beklenmedik hata: {e}"
+        logging.error(error_message, exc_info=True)
+    return None, None, error_message
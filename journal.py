@@ -0,0 +1,89 @@
+# journal.py
+import os
+import json
+import logging
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class TranscriptJournal:
+    """
+    Bir videonun transkript ilerlemesini JSONL dosyasına yazan kontrol noktası
+    günlüğü. İlk satır, ilerlemenin hangi ayarlarla üretildiğini tutan başlıktır;
+    sonraki her satır tamamlanmış bir birimdir (pencere veya parça): segmentler
+    (metin, zaman damgaları), dil ve birime özgü konum. Her satır yazıldıktan
+    sonra diske işlenir; süreç çökerse en fazla yarım kalan son satır kaybolur.
+    Başlık mevcut ayarlarla uyuşmazsa eski ilerleme atılır.
+    """
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            logging.warning(f"Transkript günlüğü okunamadı ({self.path}): {e}")
+            return []
+        try:
+            header = json.loads(lines[0]) if lines else None
+        except ValueError:
+            header = None
+        if header != {"header": self.header}:
+            logging.info(f"Transkript günlüğü farklı ayarlarla oluşturulmuş, yeniden başlanacak: {self.path}")
+            self.discard()
+            return []
+        for line in lines[1:]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Çökme sırasında yarım yazılmış son satır; yeni satırlar ona eklenmesin diye atılır
+                self._rewrite(entries)
+                break
+        return entries
+
+    def _rewrite(self, entries):
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for item in [{"header": self.header}] + entries:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Transkript günlüğü onarılamadı ({self.path}): {e}")
+
+    def record(self, **entry):
+        """Tamamlanan bir birimi günlüğe ekler."""
+        try:
+            new_file = not os.path.exists(self.path)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if new_file:
+                    f.write(json.dumps({"header": self.header}, ensure_ascii=False) + "\n")
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            # Kontrol noktası yazılamaması transkripti durdurmaz; yalnızca devam edilemez
+            logging.warning(f"Transkript günlüğüne yazılamadı ({self.path}): {e}")
+            return
+        self.entries.append(entry)
+
+    def segments(self):
+        """Günlükteki tüm segmentler (kayıt sırasıyla)."""
+        return [seg for entry in self.entries for seg in entry.get("segments", [])]
+
+    def discard(self):
+        """Günlüğü siler (transkript tamamlandığında veya ayarlar değiştiğinde)."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"Transkript günlüğü silinemedi ({self.path}): {e}")
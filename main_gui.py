@@ -1,37 +1,317 @@
 # main_gui.py
+import time
+_PROCESS_STARTED = time.perf_counter() # Açılış süresi ölçümü için (mümkün olan en erken an)
+
 import customtkinter as ctk
 from tkinter import messagebox, PhotoImage
 import threading
+import queue
 import os
 import sys
 import logging
 import subprocess
-
-# Modülleri içe aktar
-from downloader import download_audio_yt_dlp
-from transcriber import transcribe_audio
-from summarizer import summarize_text, save_summary
+import webbrowser
+import multiprocessing
+
+# Modülleri içe aktar (torch/whisper, google.generativeai, numpy ve yt_dlp bu modüllerde ilk
+# kullanımda yüklenir; pencere açıldıktan sonra warm_up() ile arka planda ısıtılır)
+from downloader import CAPTION_POLICIES, CAPTION_POLICY_PREFER, DOWNLOAD_PROFILE_SPEECH, extract_video_id
+from model_registry import preload_model
+from transcriber import resolve_engine, shutdown_chunk_pools
+from summarizer import save_summary
+from result_cache import ResultCache
+from video_store import VideoStore, export_text, format_timestamp, timestamp_url
+from pipeline import STAGE_DOWNLOAD, STAGE_TRANSCRIBE, STAGE_SUMMARIZE, STATUS_FAILED
+from scheduler import JobScheduler, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from remote import RemoteScheduler, SERVER_URL_ENV
+from metrics import metrics
 
 # Logger kurulumu
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Varsayılan Whisper modeli (açılışta arka planda önceden yüklenir)
+WHISPER_MODEL = "base"
+PRELOAD_WHISPER_MODEL = True # False: açılışta yalnızca kütüphaneler ısıtılır, model ilk işte yüklenir
+# Uzun seslerde parçalı (çok çekirdekli) transkript; kısa seslerde otomatik olarak sıralı çalışır.
+# "batched": tek süreçte pencereler yığın halinde çözümlenir (daha az bellek, bağlamsız pencereler)
+WHISPER_MODE = "chunked"
+WHISPER_WORKERS = None # None: çekirdek sayısının yarısı
+WHISPER_CHUNK_SECONDS = 300
+WHISPER_BATCH_SIZE = 8 # WHISPER_MODE = "batched" ise birlikte çözümlenen 30 sn'lik pencere sayısı
+# CPU çıkarım ön ayarı (transcriber.ENGINE_PRESETS): "int8" / "fast" daha hızlı, doğruluk biraz düşebilir
+WHISPER_ENGINE = "default"
+WHISPER_VAD = False # True: sessizlik/müzik bölümleri yazıya dökülmeden atlanır (eşikler: transcriber.VAD_DEFAULTS)
+# Gemini'ye gönderilmeden önce transkriptin yerelde indirileceği token bütçesi (None: kapalı)
+SUMMARY_COMPRESS_TOKENS = None
+# "speech": Whisper için yeterli en küçük ses biçimi, yeniden kodlamadan; "quality": en iyi ses, m4a'ya dönüştürülür
+DOWNLOAD_PROFILE = DOWNLOAD_PROFILE_SPEECH
+# Ayarlıysa (OZETLE_SERVER=http://127.0.0.1:8770) işler server.py servisine gönderilir; model
+# yerelde yüklenmez, API anahtarı boş bırakılırsa servisin anahtarı kullanılır
+SERVER_URL = os.environ.get(SERVER_URL_ENV)
+
+# Önbellek, arşiv ve zamanlayıcı build_services() ile (freeze_support'tan sonra) kurulur; modül
+# içe aktarılırken kurulmaz, böylece spawn ile başlayan işçi süreçleri bunları yeniden açmaz
+result_cache = None # İndirilen ses, transkript ve özetler için disk önbelleği (video ID ile anahtarlanır)
+video_store = None # Biten işlerin transkript, özet ve aşama süreleri (tam metin aranabilir)
+scheduler = None
+
+# Arka plan ısınması bitince ayarlanır; zamanlayıcıdaki işler başlamadan bunu bekler
+warmup_done = threading.Event()
+
+def warm_up(preload_whisper=PRELOAD_WHISPER_MODEL):
+    """
+    Ağır kütüphaneleri (torch/whisper, google.generativeai, numpy, yt_dlp) arka planda içe aktarır
+    ve isteğe bağlı olarak varsayılan Whisper modelini yükler. Hata olursa iş
+    yine de başlar; eksik modül ilk kullanımda (ve orada hata olarak) yüklenir.
+    """
+    try:
+        with metrics.span("warmup", preload=preload_whisper):
+            import yt_dlp
+            import numpy
+            import whisper # torch ve numba'yı da içe aktarır
+            import google.generativeai
+            if preload_whisper:
+                preload_model(WHISPER_MODEL, precision=resolve_engine(WHISPER_ENGINE)[0])
+        logging.info("Arka plan ısınması tamamlandı.")
+    except Exception as e:
+        logging.warning(f"Arka plan ısınması başarısız oldu (ilk işte yeniden denenecek): {e}")
+    finally:
+        warmup_done.set()
+
+def _record_startup():
+    """Pencerenin ilk kez çizildiği ana kadar geçen açılış süresini kaydeder."""
+    startup_seconds = time.perf_counter() - _PROCESS_STARTED
+    metrics.observe("gui_startup_seconds", startup_seconds)
+    logging.info(f"Arayüz {startup_seconds:.2f} sn'de açıldı.")
+
+# Kuyruk panelinde gösterilen aşama ve iş durumu adları
+STAGE_LABELS = {
+    STAGE_DOWNLOAD: "İndirme",
+    STAGE_TRANSCRIBE: "Transkript",
+    STAGE_SUMMARIZE: "Özetleme",
+}
+JOB_STATE_LABELS = {
+    JOB_QUEUED: "Kuyrukta",
+    JOB_RUNNING: "Çalışıyor",
+    JOB_DONE: "Tamamlandı",
+    JOB_FAILED: "Başarısız",
+    JOB_CANCELLED: "İptal edildi",
+}
+PROGRESS_TICK_MS = 1000 # Tahmine dayalı ilerleme/ETA'nın yenilenme aralığı
+SEARCH_DEBOUNCE_MS = 200 # Arşiv araması, yazma durduktan bu kadar sonra çalışır
+ARCHIVE_VIEW = "archive" # selected_job_id bu değerdeyse özet alanında arşivden bir video gösteriliyor
+SUMMARY_DRAIN_MS = 50 # Akışla gelen özet parçalarının metin kutusuna aktarılma aralığı
+
 # --- GUI İşlemleri ve Yardımcı Fonksiyonlar ---
 
-# GUI'yi farklı thread'den güvenli bir şekilde güncellemek için
+# Durum mesajları da ölçüm olayı olarak yayınlanır; etiket on_metrics_event ile güncellenir
 def update_status(message):
-    # Use after(0, ...) for safe thread updates
+    metrics.emit("status", message=message)
+
+def _format_eta(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 60} dk {seconds % 60:02d} sn" if seconds >= 60 else f"{seconds} sn"
+
+
+class JobRow:
+    """
+    Kuyruk panelindeki bir işin satırı: başlık, durum/aşama, ilerleme çubuğu ve
+    düğmeler. Yalnızca ana thread'den güncellenir.
+    """
+
+    def __init__(self, parent, scheduled, row):
+        self.scheduled = scheduled
+        self.stage = None
+        self.fraction = 0.0
+        self.deadline = None # ETA'nın dolacağı an (time.monotonic)
+        self.estimate = None # (başlangıç, beklenen süre) — ilerleme bildirmeyen işlemler için
+        self.message = ""
+
+        self.frame = ctk.CTkFrame(parent)
+        self.frame.grid(row=row, column=0, sticky="ew", padx=2, pady=2)
+        self.frame.grid_columnconfigure(1, weight=1)
+        title = scheduled.job.video_id or scheduled.url
+        self.title_label = ctk.CTkLabel(self.frame, text=f"#{scheduled.id} {title}", anchor="w", width=150)
+        self.title_label.grid(row=0, column=0, padx=(8, 5), sticky="w")
+        self.progress_bar = ctk.CTkProgressBar(self.frame)
+        self.progress_bar.set(0)
+        self.progress_bar.grid(row=0, column=1, padx=5, sticky="ew")
+        self.show_button = ctk.CTkButton(self.frame, text="Göster", width=60,
+                                         command=lambda: show_job(self.scheduled.id))
+        self.show_button.grid(row=0, column=2, padx=2)
+        self.cancel_button = ctk.CTkButton(self.frame, text="İptal", width=60,
+                                           command=lambda: scheduler.cancel(self.scheduled.id))
+        self.cancel_button.grid(row=0, column=3, padx=(2, 8))
+        self.status_label = ctk.CTkLabel(self.frame, text="", anchor="w")
+        self.status_label.grid(row=1, column=0, columnspan=4, padx=8, sticky="ew")
+        self.render()
+
+    def apply_event(self, event):
+        """İşe ait bir ölçüm olayını satır durumuna yansıtır."""
+        kind = event["type"]
+        stage = (event.get("context") or {}).get("stage")
+        if kind == "status":
+            self.message = event["message"]
+        elif kind == "span_start" and event["span"] == "stage":
+            self.stage, self.fraction, self.deadline, self.estimate = stage, 0.0, None, None
+        elif kind == "progress" and stage:
+            self.fraction = event["fraction"]
+            self.estimate = None # Gerçek ilerleme, tahmini geçersiz kılar
+            eta = event.get("eta_seconds")
+            self.deadline = time.monotonic() + eta if eta is not None else None
+        elif kind == "estimate" and stage and event.get("expected_seconds"):
+            self.estimate = (time.monotonic(), event["expected_seconds"])
+            self.deadline = time.monotonic() + event["expected_seconds"]
+        elif kind == "stage_status" and event["status"] != STATUS_FAILED:
+            self.stage, self.fraction, self.deadline, self.estimate = event["stage"], 1.0, None, None
+        else:
+            return
+        self.render()
+
+    def needs_tick(self):
+        return self.deadline is not None or self.estimate is not None
+
+    def render(self):
+        scheduled = self.scheduled
+        finished = scheduled.state in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+        if finished:
+            self.deadline = self.estimate = None
+        now = time.monotonic()
+        if self.estimate:
+            # İlerleme bildirmeyen işlemlerde (örn. sıralı Whisper) geçmiş RTF tahmininden
+            started, expected = self.estimate
+            self.fraction = min(0.99, (now - started) / expected)
+
+        text = JOB_STATE_LABELS.get(scheduled.state, scheduled.state)
+        if scheduled.state == JOB_RUNNING and scheduled.stage:
+            stage_label = STAGE_LABELS.get(scheduled.stage, scheduled.stage)
+            if scheduled.waiting:
+                text = f"{stage_label}: sıra bekleniyor"
+            else:
+                text = f"{stage_label}: %{self.fraction * 100:.0f}"
+                if self.deadline is not None:
+                    text += f" — kalan ~{_format_eta(max(0, self.deadline - now))}"
+        if scheduled.state == JOB_FAILED:
+            text += f" — {scheduled.error}"
+        elif self.message and not finished:
+            text += f" — {self.message}"
+        self.status_label.configure(text=text)
+        self.progress_bar.set(1.0 if scheduled.state == JOB_DONE else self.fraction)
+        self.cancel_button.configure(state=ctk.DISABLED if finished else ctk.NORMAL)
+
+
+# İş kimliği -> JobRow (yalnızca ana thread'de değiştirilir)
+job_rows = {}
+selected_job_id = None # Özeti gösterilen iş
+# Akışla gelen özet parçaları: iş thread'leri kuyruğa ekler, ana thread zamanlayıcıyla boşaltır
+summary_chunks = queue.Queue()
+partial_summaries = {} # İş kimliği -> o ana kadar gelen özet metni (yalnızca ana thread)
+search_after_id = None # Bekleyen arşiv araması (debounce)
+archive_selection = None # Arşivden gösterilen (video_id, saniye)
+
+def on_metrics_event(event):
+    """Ölçüm dinleyicisi: olaylar iş thread'lerinden gelir, ana thread'de işlenir."""
     if root: # Pencere kapatıldıysa hata vermemesi için kontrol
-        root.after(0, lambda: status_label.configure(text=f"Durum: {message}"))
-
-def update_summary_text(summary_content):
+        root.after(0, lambda: _apply_metrics_event(event))
+
+def _apply_metrics_event(event):
+    job_id = (event.get("context") or {}).get("job")
+    if job_id is not None:
+        row = job_rows.get(job_id)
+        if row:
+            row.apply_event(event)
+    elif event["type"] == "status":
+        status_label.configure(text=f"Durum: {event['message']}")
+
+def on_job_update(scheduled):
+    """Zamanlayıcı bildirimi: iş durumu değişti (iş thread'inden çağrılır)."""
     if root:
-        def update_widget():
+        root.after(0, lambda: _refresh_job(scheduled))
+
+def _refresh_job(scheduled):
+    row = job_rows.get(scheduled.id)
+    if row is None:
+        row = job_rows[scheduled.id] = JobRow(queue_frame, scheduled, len(job_rows))
+    row.render()
+    if scheduled.state != JOB_RUNNING:
+        partial_summaries.pop(scheduled.id, None) # Bitince yerini nihai özet alır
+    if scheduled.state == JOB_DONE and selected_job_id in (None, scheduled.id):
+        show_job(scheduled.id)
+    _render_queue_summary()
+
+def _render_queue_summary():
+    counts = {}
+    for row in job_rows.values():
+        counts[row.scheduled.state] = counts.get(row.scheduled.state, 0) + 1
+    parts = [f"{JOB_STATE_LABELS[state]}: {counts[state]}" for state in JOB_STATE_LABELS if counts.get(state)]
+    queue_label.configure(text="İş Kuyruğu — " + (", ".join(parts) if parts else "boş"))
+
+def _tick_progress():
+    """Tahmini ilerleme ve ETA'yı yeni olay gelmese de düzenli yeniler."""
+    for row in job_rows.values():
+        if row.needs_tick():
+            row.render()
+    root.after(PROGRESS_TICK_MS, _tick_progress)
+
+def on_summary_chunk(scheduled, text):
+    """Zamanlayıcı bildirimi: özet parçası geldi (iş thread'inden çağrılır)."""
+    summary_chunks.put((scheduled.id, text))
+
+def _drain_summary_chunks():
+    """Kuyruktaki özet parçalarını (tek seferde toplu) seçili işin metin kutusuna ekler."""
+    pending = {}
+    while True:
+        try:
+            job_id, text = summary_chunks.get_nowait()
+        except queue.Empty:
+            break
+        pending[job_id] = pending.get(job_id, "") + text
+    for job_id, text in pending.items():
+        scheduled = scheduler.get(job_id)
+        if scheduled is None or scheduled.state != JOB_RUNNING:
+            continue # İş bittiyse nihai özet zaten gösterilir
+        first = job_id not in partial_summaries
+        partial_summaries[job_id] = partial_summaries.get(job_id, "") + text
+        if first and selected_job_id in (None, job_id):
+            show_job(job_id) # Yer tutucu metni kaldırır
+        elif job_id == selected_job_id:
             summary_text.configure(state=ctk.NORMAL)
-            summary_text.delete("1.0", ctk.END)
-            summary_text.insert(ctk.END, summary_content)
+            summary_text.insert(ctk.END, text)
+            summary_text.see(ctk.END)
             summary_text.configure(state=ctk.DISABLED)
+    root.after(SUMMARY_DRAIN_MS, _drain_summary_chunks)
+
+def show_job(job_id):
+    """Seçilen işin özetini (veya durumunu/hatasını) özet alanında gösterir."""
+    global selected_job_id
+    selected_job_id = job_id
+    scheduled = scheduler.get(job_id)
+    if scheduled is None:
+        return
+    if scheduled.state == JOB_DONE:
+        content = scheduled.summary
+        if scheduled.job.source:
+            content += f"\n\n(Transkript kaynağı: {scheduled.job.source})"
+    elif scheduled.state == JOB_FAILED:
+        content = f"İş başarısız oldu:\n{scheduled.error}"
+    elif job_id in partial_summaries:
+        content = partial_summaries[job_id] # Özet hâlâ akıyor
+    else:
+        content = f"{JOB_STATE_LABELS.get(scheduled.state, scheduled.state)}..."
+    summary_label.configure(text=f"Video Özeti (#{scheduled.id} {scheduled.job.video_id or scheduled.url}):")
+    # Ana thread'deyiz; sonradan eklenecek akış parçalarıyla sıralama bozulmasın diye doğrudan yazılır
+    _set_summary_text(content)
+
+def _set_summary_text(summary_content):
+    summary_text.configure(state=ctk.NORMAL)
+    summary_text.delete("1.0", ctk.END)
+    summary_text.insert(ctk.END, summary_content)
+    summary_text.configure(state=ctk.DISABLED)
+
+def update_summary_text(summary_content):
+    if root:
         # Use after(0, ...) for safe thread updates
-        root.after(0, update_widget)
+        root.after(0, lambda: _set_summary_text(summary_content))
 
 # These already use root.after(0, ...) which is correct
 def show_error_async(title, message):
@@ -45,135 +325,142 @@ def show_info_async(title, message):
         root.after(0, lambda: messagebox.showinfo(title, message))
 
 
-# Ana işlem fonksiyonu (Thread içinde çalışacak)
-def run_processing(url, api_key):
-    audio_file = None
-    try:
-        # 1. Adım: Ses İndirme
-        update_status("Video sesi indiriliyor (yt-dlp)...")
-        temp_dir = "temp_audio_yt"
-        os.makedirs(temp_dir, exist_ok=True)
-        audio_file, error = download_audio_yt_dlp(url, output_path=temp_dir)
-
-        if error or not audio_file:
-            msg = f"Ses indirilemedi: {error}" if error else "Ses indirilemedi (bilinmeyen hata)."
-            logging.error(msg)
-            show_error_async("İndirme Hatası", msg)
-            # No need for update_status here, show_error_async already calls it
-            return
-
-        update_status(f"Ses indirildi: {os.path.basename(audio_file)}")
-
-        # 2. Adım: Transkript Oluşturma
-        whisper_model = "base"
-        update_status(f"Transkript oluşturuluyor (Whisper Model: {whisper_model} - Bu işlem uzun sürebilir)...")
-        transcript, lang, error = transcribe_audio(audio_file, model_name=whisper_model, delete_audio=True)
-        # audio_file is now None because delete_audio=True
-
-        if error or not transcript:
-            msg = f"Transkript oluşturulamadı: {error}" if error else "Transkript oluşturulamadı (bilinmeyen hata)."
-            logging.error(msg)
-            show_error_async("Transkript Hatası", msg)
-            # Clean up the potentially undeleted audio file if transcription failed early
-            # Check existence *before* trying to remove
-            if audio_file and os.path.exists(audio_file):
-                 try:
-                     os.remove(audio_file)
-                     logging.info(f"Temizlik: Başarısız transkript sonrası '{audio_file}' silindi.")
-                 except OSError as e:
-                     logging.warning(f"Temizlik: '{audio_file}' silinemedi: {e}")
-            return
+def summary_filename(scheduled):
+    """Her işin özeti ayrı dosyaya yazılır; eşzamanlı işler birbirinin üzerine yazmaz."""
+    return f"video_ozeti_{scheduled.job.video_id or scheduled.id}.txt"
 
-        logging.info(f"Transkript tamamlandı. Algılanan dil: {lang}")
-        update_status(f"Transkript tamamlandı (Algılanan Dil: {lang}). Özetleme başlıyor...")
-
-        # 3. Adım: Özetleme
-        update_status(f"Metin Gemini API ile '{lang}' dilinden Türkçe'ye özetleniyor...")
-        summary, error = summarize_text(transcript, api_key, detected_language=lang)
-
-        if error or not summary:
-            err_msg = f"Metin özetlenemedi.\n\nHata: {error}"
-            logging.error(f"Özetleme hatası: {error}")
-            show_error_async("Özetleme Hatası", err_msg)
-            # No need for update_status here, show_error_async already calls it
-            return
-
-        # 4. Adım: Sonuçları Gösterme ve Kaydetme
-        update_status("Özet GUI'de gösteriliyor...")
-        update_summary_text(summary)
-
-        update_status("Özet dosyaya kaydediliyor...")
-        output_summary_file = "video_ozeti.txt"
-        saved, save_error = save_summary(summary, filename=output_summary_file)
-
-        if save_error:
-            logging.warning(f"Özet kaydedilemedi: {save_error}")
-            # Use show_info_async for consistency
-            show_info_async("Kaydetme Uyarısı", f"Özet başarıyla oluşturuldu ancak '{output_summary_file}' dosyasına kaydedilemedi: {save_error}")
-        else:
-             logging.info(f"Özet başarıyla kaydedildi: {output_summary_file}")
-             show_info_async("Başarılı", f"Video özeti başarıyla oluşturuldu ve '{output_summary_file}' dosyasına kaydedildi.")
-
-        update_status("İşlem başarıyla tamamlandı!")
+# Zamanlayıcı bildirimi: iş bitti (iş thread'inde çalışır)
+def save_job_summary(scheduled):
+    if scheduled.job.transcript or scheduled.summary:
+        video_store.put(scheduled.job.store_record()) # Arşive toplu yazılır; pencereyi bekletmez
+    if not scheduled.summary:
+        return
+    output_summary_file = summary_filename(scheduled)
+    saved, save_error = save_summary(scheduled.summary, filename=output_summary_file)
+    if save_error:
+        logging.warning(f"Özet kaydedilemedi: {save_error}")
+        show_info_async("Kaydetme Uyarısı", f"Özet başarıyla oluşturuldu ancak '{output_summary_file}' dosyasına kaydedilemedi: {save_error}")
+    else:
+        logging.info(f"Özet başarıyla kaydedildi: {output_summary_file}")
+        update_status(f"#{scheduled.id} tamamlandı, özet '{output_summary_file}' dosyasına kaydedildi.")
+
+
+def build_services():
+    """
+    Önbelleği, arşivi (SQLite + yazıcı thread) ve zamanlayıcıyı kurar.
+    İşler aşamalarına göre sınırlanarak eşzamanlı çalışır: indirmeler ve Gemini
+    çağrıları paralel, Whisper işleri çekirdek sayısıyla sınırlı. İlk iş arka
+    plan ısınmasını bekler.
+    """
+    global result_cache, video_store, scheduler
+    result_cache = ResultCache()
+    video_store = VideoStore()
+    if SERVER_URL:
+        scheduler = RemoteScheduler(SERVER_URL, on_update=on_job_update, on_finished=save_job_summary,
+                                    on_summary_chunk=on_summary_chunk, on_event=on_metrics_event)
+        return
+    scheduler = JobScheduler(
+        result_cache,
+        whisper_options={"mode": WHISPER_MODE, "workers": WHISPER_WORKERS, "chunk_seconds": WHISPER_CHUNK_SECONDS,
+                         "batch_size": WHISPER_BATCH_SIZE, "engine": WHISPER_ENGINE, "vad": WHISPER_VAD},
+        on_update=on_job_update,
+        on_finished=save_job_summary,
+        on_summary_chunk=on_summary_chunk,
+        summary_options={"compress_tokens": SUMMARY_COMPRESS_TOKENS},
+        download_profile=DOWNLOAD_PROFILE,
+        ready=warmup_done,
+    )
+
+
+# --- Arşiv araması ---
+def on_search_key(event=None):
+    global search_after_id
+    if search_after_id:
+        root.after_cancel(search_after_id)
+    search_after_id = root.after(SEARCH_DEBOUNCE_MS, run_search)
+
+def run_search():
+    """Arşivde arar ve eşleşmeleri (başlık, zaman, metin parçası) listeler."""
+    global search_after_id
+    search_after_id = None
+    for widget in search_results_frame.winfo_children():
+        widget.destroy()
+    text = search_entry.get().strip()
+    if not text:
+        return
+    hits = video_store.search(text)
+    for i, hit in enumerate(hits):
+        when = format_timestamp(hit["start"]) if hit["start"] is not None else "özet"
+        button = ctk.CTkButton(search_results_frame, text=f"{hit['title'] or hit['video_id']} [{when}] {hit['snippet']}",
+                               anchor="w", fg_color="transparent", border_width=0,
+                               command=lambda hit=hit: show_archived(hit["video_id"], hit["start"]))
+        button.grid(row=i, column=0, sticky="ew", padx=2)
+    search_label.configure(text=f"Arşivde Ara — {len(hits)} eşleşme")
+
+def show_archived(video_id, start=None):
+    """Arşivdeki videoyu (özet + zaman damgalı transkript) gösterir ve verilen zamana kaydırır."""
+    global selected_job_id, archive_selection
+    video = video_store.get(video_id)
+    if video is None:
+        return
+    selected_job_id = ARCHIVE_VIEW # Biten işler arşiv görünümünün yerine geçmesin
+    archive_selection = (video_id, start or 0)
+    content = export_text(video)
+    summary_label.configure(text=f"Arşiv: {video['title'] or video_id}")
+    _set_summary_text(content)
+    if start is None:
+        return
+    prefix = f"[{format_timestamp(start)}] "
+    for line_number, line in enumerate(content.split("\n"), start=1):
+        if line.startswith(prefix):
+            summary_text.tag_remove("hit", "1.0", ctk.END)
+            summary_text.tag_add("hit", f"{line_number}.0", f"{line_number}.end")
+            summary_text.tag_config("hit", background="#3a5f8f")
+            summary_text.see(f"{line_number}.0")
+            break
+
+def open_archive_timestamp():
+    """Arşivden seçilen anı YouTube'da açar (işlem hattı yeniden çalıştırılmaz)."""
+    if archive_selection:
+        webbrowser.open(timestamp_url(*archive_selection))
+
+def export_archived():
+    """Arşivden seçilen videoyu düz metin olarak dışa aktarır."""
+    if not archive_selection:
+        return
+    video_id = archive_selection[0]
+    filename = f"video_ozeti_{video_id}.txt"
+    saved, save_error = save_summary(export_text(video_store.get(video_id)), filename=filename)
+    update_status(f"Dışa aktarılamadı: {save_error}" if save_error else f"'{filename}' dosyasına aktarıldı.")
 
-    except Exception as e:
-        logging.error(f"Ana işlem sırasında beklenmedik hata: {e}", exc_info=True)
-        show_error_async("Genel Hata", f"Beklenmedik bir hata oluştu: {e}")
-        # No need for update_status here, show_error_async already calls it
 
-    finally:
-        # Re-enable button using after(0, ...)
-        if root:
-            # Ensure the button is re-enabled on the main thread
-            root.after(0, lambda: process_button.configure(state=ctk.NORMAL)) # CORRECTED LINE
-
-        # Clean up audio file if it still exists
-        # Check existence *before* trying to remove
-        if audio_file and os.path.exists(audio_file):
-            try:
-                os.remove(audio_file)
-                logging.info(f"Temizlik: İşlem sonu artık '{audio_file}' silindi.")
-            except OSError as e:
-                logging.warning(f"Temizlik: İşlem sonu '{audio_file}' silinemedi: {e}")
-
-        # Clean up temp directory if empty
-        temp_dir = "temp_audio_yt"
-        # Check existence and listdir
-        if os.path.exists(temp_dir) and os.path.isdir(temp_dir) and not os.listdir(temp_dir):
-             try:
-                 os.rmdir(temp_dir)
-                 logging.info(f"Temizlik: Boş geçici dizin '{temp_dir}' silindi.")
-             except OSError as e:
-                 logging.warning(f"Temizlik: Geçici dizin '{temp_dir}' silinemedi: {e}")
-
-
-# Butona basılınca çalışacak fonksiyon
-def start_processing_thread():
-    url = url_entry.get().strip()
+# Butona basılınca çalışacak fonksiyon: girilen URL'leri kuyruğa ekler
+def submit_jobs():
+    urls = url_entry.get().split() # Boşlukla ayrılmış birden çok URL girilebilir
     api_key = api_key_entry.get().strip()
 
-    if not url:
+    if not urls:
         # Use show_error_async for consistency, it handles the status update
         show_error_async("Giriş Hatası", "Lütfen geçerli bir YouTube video URL'si girin.")
         return
-    if not ("youtube.com/watch?v=" in url or "youtu.be/" in url):
-         show_error_async("Giriş Hatası", "Geçersiz YouTube URL formatı.")
+    invalid = [url for url in urls if not extract_video_id(url)]
+    if invalid:
+         show_error_async("Giriş Hatası", f"Geçersiz YouTube URL formatı: {invalid[0]}")
          return
 
-    if not api_key:
+    if not api_key and not SERVER_URL: # Servis modunda servisin anahtarı kullanılabilir
          # Use show_error_async, but also provide specific status
          update_status("Lütfen Gemini API anahtarınızı girin.")
          show_error_async("Giriş Hatası", "Lütfen Google Gemini API anahtarınızı girin.")
          return
 
-    # Inform user and disable button
-    update_status("İşlem başlatılıyor...")
-    update_summary_text("İşleniyor...") # Clear summary box and inform
-    process_button.configure(state=ctk.DISABLED)
-
-    # Start processing in a separate thread
-    thread = threading.Thread(target=run_processing, args=(url, api_key), daemon=True)
-    thread.start()
+    caption_policy = caption_policy_menu.get()
+    stream_audio = bool(stream_audio_checkbox.get())
+    for url in urls:
+        scheduler.submit(url, api_key, caption_policy=caption_policy, whisper_model=WHISPER_MODEL,
+                         stream_audio=stream_audio)
+    url_entry.delete(0, ctk.END)
+    update_status(f"{len(urls)} video kuyruğa eklendi.")
 
 # --- Theme Switching ---
 def toggle_theme():
@@ -226,73 +513,131 @@ def check_ffmpeg():
 
 # --- GUI Kurulumu ---
 
-ctk.set_appearance_mode("Dark")
-ctk.set_default_color_theme("blue")
-
-root = ctk.CTk()
-root.title("YouTube Video Özetleyici (yt-dlp & Whisper & Gemini)")
-root.geometry("700x650")
-
-# Center the window
-window_width = 700
-window_height = 650
-screen_width = root.winfo_screenwidth()
-screen_height = root.winfo_screenheight()
-center_x = int(screen_width/2 - window_width / 2)
-center_y = int(screen_height/2 - window_height / 2)
-root.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
-
-# Configure grid layout
-root.grid_columnconfigure(0, weight=1)
-root.grid_rowconfigure(3, weight=1)
-
-# --- Top Frame for Theme Switch ---
-top_frame = ctk.CTkFrame(root, corner_radius=0)
-top_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 0))
-top_frame.grid_columnconfigure(0, weight=1)
-
-theme_button = ctk.CTkButton(top_frame, text="Temayı Değiştir", command=toggle_theme, width=150)
-theme_button.grid(row=0, column=1, padx=5, pady=5, sticky="e")
-
-
-# --- Input Frame ---
-input_frame = ctk.CTkFrame(root)
-input_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=5)
-input_frame.grid_columnconfigure(1, weight=1)
-
-url_label = ctk.CTkLabel(input_frame, text="YouTube Video URL:")
-url_label.grid(row=0, column=0, padx=(10, 5), pady=5, sticky="w")
-url_entry = ctk.CTkEntry(input_frame, placeholder_text="https://www.youtube.com/watch?v=...")
-url_entry.grid(row=0, column=1, padx=(0, 10), pady=5, sticky="ew")
-
-api_key_label = ctk.CTkLabel(input_frame, text="Gemini API Anahtarı:")
-api_key_label.grid(row=1, column=0, padx=(10, 5), pady=5, sticky="w")
-api_key_entry = ctk.CTkEntry(input_frame, placeholder_text="API Anahtarınızı buraya girin", show="*")
-api_key_entry.grid(row=1, column=1, padx=(0, 10), pady=5, sticky="ew")
-
-# --- Process Button ---
-process_button = ctk.CTkButton(root, text="Video Özeti Çıkar", command=start_processing_thread, height=40)
-process_button.grid(row=2, column=0, padx=10, pady=10)
-
-# --- Summary Area ---
-summary_frame = ctk.CTkFrame(root)
-summary_frame.grid(row=3, column=0, sticky="nsew", padx=10, pady=(0, 5))
-summary_frame.grid_rowconfigure(1, weight=1)
-summary_frame.grid_columnconfigure(0, weight=1)
-
-summary_label = ctk.CTkLabel(summary_frame, text="Video Özeti:", anchor="w")
-summary_label.grid(row=0, column=0, padx=10, pady=(10, 2), sticky="w")
-
-summary_text = ctk.CTkTextbox(summary_frame, wrap=ctk.WORD, state=ctk.DISABLED, corner_radius=5)
-summary_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
-
-# --- Status Label ---
-status_label = ctk.CTkLabel(root, text="Durum: Bekleniyor...", anchor="w")
-status_label.grid(row=4, column=0, sticky="ew", padx=10, pady=(5, 10))
+# Widget'lar build_gui() içinde oluşturulur; böylece modül işçi süreçlerinde
+# (multiprocessing spawn) yeniden içe aktarıldığında pencere açılmaz.
+root = None
+
+def build_gui():
+    global root, url_entry, api_key_entry, caption_policy_menu, stream_audio_checkbox, process_button, summary_text, status_label
+    global queue_frame, queue_label, summary_label, search_entry, search_label, search_results_frame
+
+    ctk.set_appearance_mode("Dark")
+    ctk.set_default_color_theme("blue")
+
+    root = ctk.CTk()
+    root.title("YouTube Video Özetleyici (yt-dlp & Whisper & Gemini)")
+    root.geometry("760x900")
+
+    # Center the window
+    window_width = 760
+    window_height = 900
+    screen_width = root.winfo_screenwidth()
+    screen_height = root.winfo_screenheight()
+    center_x = int(screen_width/2 - window_width / 2)
+    center_y = int(screen_height/2 - window_height / 2)
+    root.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
+
+    # Configure grid layout
+    root.grid_columnconfigure(0, weight=1)
+    root.grid_rowconfigure(5, weight=1)
+
+    # --- Top Frame for Theme Switch ---
+    top_frame = ctk.CTkFrame(root, corner_radius=0)
+    top_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 0))
+    top_frame.grid_columnconfigure(0, weight=1)
+
+    theme_button = ctk.CTkButton(top_frame, text="Temayı Değiştir", command=toggle_theme, width=150)
+    theme_button.grid(row=0, column=1, padx=5, pady=5, sticky="e")
+
+
+    # --- Input Frame ---
+    input_frame = ctk.CTkFrame(root)
+    input_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=5)
+    input_frame.grid_columnconfigure(1, weight=1)
+
+    url_label = ctk.CTkLabel(input_frame, text="YouTube Video URL(ler):")
+    url_label.grid(row=0, column=0, padx=(10, 5), pady=5, sticky="w")
+    url_entry = ctk.CTkEntry(input_frame, placeholder_text="https://www.youtube.com/watch?v=... (birden çok URL boşlukla ayrılabilir)")
+    url_entry.grid(row=0, column=1, padx=(0, 10), pady=5, sticky="ew")
+
+    api_key_label = ctk.CTkLabel(input_frame, text="Gemini API Anahtarı:")
+    api_key_label.grid(row=1, column=0, padx=(10, 5), pady=5, sticky="w")
+    api_key_entry = ctk.CTkEntry(input_frame, placeholder_text="API Anahtarınızı buraya girin", show="*")
+    api_key_entry.grid(row=1, column=1, padx=(0, 10), pady=5, sticky="ew")
+
+    caption_policy_label = ctk.CTkLabel(input_frame, text="Transkript Kaynağı:")
+    caption_policy_label.grid(row=2, column=0, padx=(10, 5), pady=5, sticky="w")
+    caption_policy_menu = ctk.CTkOptionMenu(input_frame, values=list(CAPTION_POLICIES))
+    caption_policy_menu.set(CAPTION_POLICY_PREFER)
+    caption_policy_menu.grid(row=2, column=1, padx=(0, 10), pady=5, sticky="w")
+
+    # Akış modu: ses diske yazılmadan indirilirken yazıya dökülür (ilk metin birkaç saniyede gelir)
+    stream_audio_checkbox = ctk.CTkCheckBox(input_frame, text="Akış modu (indirirken yazıya dök)")
+    stream_audio_checkbox.grid(row=3, column=1, padx=(0, 10), pady=5, sticky="w")
+
+    # --- Process Button ---
+    process_button = ctk.CTkButton(root, text="Kuyruğa Ekle", command=submit_jobs, height=40)
+    process_button.grid(row=2, column=0, padx=10, pady=10)
+
+    # --- Job Queue Panel ---
+    queue_container = ctk.CTkFrame(root)
+    queue_container.grid(row=3, column=0, sticky="ew", padx=10, pady=(0, 5))
+    queue_container.grid_columnconfigure(0, weight=1)
+
+    queue_label = ctk.CTkLabel(queue_container, text="İş Kuyruğu — boş", anchor="w")
+    queue_label.grid(row=0, column=0, padx=10, pady=(5, 0), sticky="w")
+    queue_frame = ctk.CTkScrollableFrame(queue_container, height=180)
+    queue_frame.grid(row=1, column=0, sticky="ew", padx=5, pady=(0, 5))
+    queue_frame.grid_columnconfigure(0, weight=1)
+
+    # --- Archive Search Panel ---
+    search_container = ctk.CTkFrame(root)
+    search_container.grid(row=4, column=0, sticky="ew", padx=10, pady=(0, 5))
+    search_container.grid_columnconfigure(1, weight=1)
+
+    search_label = ctk.CTkLabel(search_container, text=f"Arşivde Ara ({video_store.count()} video)", anchor="w")
+    search_label.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+    search_entry = ctk.CTkEntry(search_container, placeholder_text="Başlık, özet veya transkriptte ara...")
+    search_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+    search_entry.bind("<KeyRelease>", on_search_key)
+    ctk.CTkButton(search_container, text="YouTube'da Aç", width=110,
+                  command=open_archive_timestamp).grid(row=0, column=2, padx=2)
+    ctk.CTkButton(search_container, text="Dışa Aktar", width=90,
+                  command=export_archived).grid(row=0, column=3, padx=(2, 10))
+    search_results_frame = ctk.CTkScrollableFrame(search_container, height=110)
+    search_results_frame.grid(row=1, column=0, columnspan=4, sticky="ew", padx=5, pady=(0, 5))
+    search_results_frame.grid_columnconfigure(0, weight=1)
+
+    # --- Summary Area ---
+    summary_frame = ctk.CTkFrame(root)
+    summary_frame.grid(row=5, column=0, sticky="nsew", padx=10, pady=(0, 5))
+    summary_frame.grid_rowconfigure(1, weight=1)
+    summary_frame.grid_columnconfigure(0, weight=1)
+
+    summary_label = ctk.CTkLabel(summary_frame, text="Video Özeti:", anchor="w")
+    summary_label.grid(row=0, column=0, padx=10, pady=(10, 2), sticky="w")
+
+    summary_text = ctk.CTkTextbox(summary_frame, wrap=ctk.WORD, state=ctk.DISABLED, corner_radius=5)
+    summary_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
+
+    # --- Status Label ---
+    status_label = ctk.CTkLabel(root, text="Durum: Bekleniyor...", anchor="w")
+    status_label.grid(row=6, column=0, sticky="ew", padx=10, pady=(5, 10))
+
+    # Kuyruk satırları (aşama ilerlemesi, ETA) ve durum etiketi ölçüm olaylarından beslenir
+    metrics.add_listener(on_metrics_event)
+    root.after(PROGRESS_TICK_MS, _tick_progress)
+    root.after(SUMMARY_DRAIN_MS, _drain_summary_chunks)
 
 
 # --- Ana Döngüyü Başlat ---
 if __name__ == "__main__":
+    # PyInstaller paketinde parçalı transkript işçi süreçleri için gerekli
+    multiprocessing.freeze_support()
+
+    build_services()
+    build_gui()
+
     # Set console encoding (best effort)
     try:
         # Check if stdout/stderr are connected to a terminal (isatty)
@@ -307,7 +652,16 @@ if __name__ == "__main__":
         logging.warning(f"Konsol kodlaması ayarlanamadı: {e}")
         print(f"Warning: Could not set console encoding: {e}", file=sys.stderr) # Print to stderr
 
-    # Check for FFmpeg after root is created but before mainloop
-    check_ffmpeg() # It uses root.after internally if root exists
-
-    root.mainloop()
\ No newline at end of file
+    root.after(0, _record_startup)
+    if SERVER_URL:
+        # Model ve ffmpeg servisin işçilerinde; yerelde ısınma gerekmez
+        update_status(f"İşler {SERVER_URL} servisine gönderilecek.")
+    else:
+        # Ağır kütüphaneleri ve varsayılan Whisper modelini arka planda yükle; pencere beklemez
+        threading.Thread(target=warm_up, daemon=True).start()
+        # ffmpeg kontrolü bir alt süreç çalıştırır; pencere çizildikten sonra yapılır
+        root.after(200, lambda: threading.Thread(target=check_ffmpeg, daemon=True).start())
+
+    root.mainloop()
+    video_store.flush() # Kuyrukta bekleyen arşiv kayıtları kaybolmasın
+    shutdown_chunk_pools()
@@ -0,0 +1,223 @@
+# metrics.py
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+import logging
+from contextlib import contextmanager
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Ortam değişkenleriyle etkinleştirilebilen çıktılar
+EVENTS_JSONL_ENV = "OZETLE_EVENTS_JSONL" # Her olay bir JSON satırı olarak bu dosyaya eklenir
+PROMETHEUS_FILE_ENV = "OZETLE_METRICS_PROM" # Prometheus metin biçiminde sayaç/özet dosyası
+
+METRIC_PREFIX = "ozetle_"
+# Her video/iş için ayrı seri üretmemek adına süre özetlerine eklenmeyen etiketler
+HIGH_CARDINALITY_LABELS = ("video", "job")
+
+# Mevcut thread/bağlamdaki açık span'ler (iç içe); olaylar en içteki span'e bağlanır
+_span_stack = contextvars.ContextVar("ozetle_span_stack", default=())
+
+
+class Span:
+    """Süresi ölçülen bir işlem aralığı (örn. bir aşama, bir indirme)."""
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.id = uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def progress(self, fraction, **fields):
+        """
+        İlerlemeyi (0-1) bildirir; geçen süreye göre kalan süre (ETA) tahmini
+        olaya eklenir.
+        """
+        fraction = max(0.0, min(1.0, fraction))
+        elapsed = self.elapsed()
+        eta = elapsed * (1 - fraction) / fraction if fraction > 0 else None
+        self.registry.emit("progress", span=self.name, span_id=self.id, fraction=round(fraction, 4),
+                           elapsed_seconds=round(elapsed, 3),
+                           eta_seconds=round(eta, 1) if eta is not None else None, **fields)
+
+
+class Metrics:
+    """
+    Küçük ölçüm katmanı: span'ler (süre), sayaçlar ve özetler (toplam/adet).
+    Her ölçüm aynı zamanda yapılandırılmış bir olay (dict) olarak dinleyicilere
+    iletilir; GUI durum çubuğu, JSONL dosyası ve Prometheus çıktısı aynı
+    olaylardan beslenir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._counters = {} # (ad, etiketler) -> değer
+        self._summaries = {} # (ad, etiketler) -> [toplam, adet]
+        self._prometheus_path = None
+
+    # --- Dinleyiciler ---
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def emit(self, event_type, **fields):
+        """Olayı (açık span etiketleriyle birlikte) tüm dinleyicilere iletir."""
+        event = {"ts": round(time.time(), 3), "type": event_type}
+        stack = _span_stack.get()
+        if stack:
+            labels = {}
+            for span in stack:
+                labels.update(span.labels)
+            event["context"] = labels
+        event.update(fields)
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logging.warning(f"Ölçüm dinleyicisi hatası: {e}")
+
+    # --- Ölçümler ---
+    def incr(self, name, value=1, **labels):
+        """Sayaç artırır (örn. indirilen bayt, yeniden deneme sayısı)."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self.emit("counter", name=name, value=value, labels=labels)
+
+    def observe(self, name, value, **labels):
+        """Bir gözlemi özete ekler (örn. gecikme, token sayısı)."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            total = self._summaries.setdefault(key, [0.0, 0])
+            total[0] += value
+            total[1] += 1
+        self.emit("observation", name=name, value=round(value, 6), labels=labels)
+
+    def counter(self, name, **labels):
+        """Bir sayacın şu anki değeri (hiç artırılmadıysa 0)."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def average(self, name, **labels):
+        """Bir özetin ortalaması; gözlem yoksa None (örn. geçmiş RTF'den ETA tahmini için)."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            total = self._summaries.get(key)
+        return total[0] / total[1] if total and total[1] else None
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Süresi ölçülen aralık. Bitişte '<ad>_seconds' özetine eklenir ve
+        span_end olayı (durum ve süreyle) yayınlanır.
+        """
+        span = Span(self, name, labels)
+        token = _span_stack.set(_span_stack.get() + (span,))
+        self.emit("span_start", span=name, span_id=span.id)
+        status = "ok"
+        try:
+            yield span
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            duration = span.elapsed()
+            _span_stack.reset(token)
+            self.emit("span_end", span=name, span_id=span.id, status=status,
+                      duration_seconds=round(duration, 3), labels=labels)
+            self.observe(f"{name}_seconds", duration,
+                         **{k: v for k, v in labels.items() if k not in HIGH_CARDINALITY_LABELS})
+            self._write_prometheus()
+
+    def current_span(self):
+        """Bu bağlamdaki en içteki açık span (yoksa None)."""
+        stack = _span_stack.get()
+        return stack[-1] if stack else None
+
+    def progress(self, fraction, **fields):
+        """En içteki açık span için ilerleme bildirir (span yoksa yok sayılır)."""
+        span = self.current_span()
+        if span:
+            span.progress(fraction, **fields)
+
+    # --- Çıktılar ---
+    def enable_jsonl(self, path):
+        """Tüm olayları verilen dosyaya JSON satırları olarak ekler."""
+        lock = threading.Lock()
+
+        def write(event):
+            with lock:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+        self.add_listener(write)
+        return write
+
+    def enable_prometheus(self, path):
+        """Her span bitiminde sayaçları Prometheus metin biçiminde dosyaya yazar."""
+        self._prometheus_path = path
+
+    def prometheus_text(self):
+        """Sayaç ve özetlerin Prometheus metin gösterimi."""
+        def fmt_labels(labels):
+            if not labels:
+                return ""
+            inner = ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in labels)
+            return "{" + inner + "}"
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            summaries = sorted(self._summaries.items())
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}{name}"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{fmt_labels(labels)} {value}")
+        for (name, labels), (total, count) in summaries:
+            metric = f"{METRIC_PREFIX}{name}"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} summary")
+                seen.add(metric)
+            lines.append(f"{metric}_sum{fmt_labels(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{fmt_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def _write_prometheus(self):
+        if not self._prometheus_path:
+            return
+        tmp_path = f"{self._prometheus_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, self._prometheus_path) # Okuyucular yarım dosya görmesin
+        except OSError as e:
+            logging.warning(f"Prometheus dosyası yazılamadı: {e}")
+
+
+# Süreç genelinde paylaşılan ölçüm kaydı
+metrics = Metrics()
+
+if os.environ.get(EVENTS_JSONL_ENV):
+    metrics.enable_jsonl(os.environ[EVENTS_JSONL_ENV])
+if os.environ.get(PROMETHEUS_FILE_ENV):
+    metrics.enable_prometheus(os.environ[PROMETHEUS_FILE_ENV])
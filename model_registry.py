@@ -0,0 +1,263 @@
+# model_registry.py
+import time
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from metrics import metrics
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Yüklü modellerin toplam bellek bütçesi (MB). Aşılırsa en uzun süredir
+# kullanılmayan model bellekten çıkarılır.
+DEFAULT_MEMORY_BUDGET_MB = 4096
+
+
+def _resolve_device(device):
+    """Cihaz belirtilmemişse GPU varsa 'cuda', yoksa 'cpu' döndürür."""
+    if device:
+        return device
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def resolve_precision(precision, device=None):
+    """
+    Cihazda çalışabilecek hassasiyeti döndürür: CPU'da half (fp16) çekirdekleri
+    olmadığından fp16 istekleri fp32'ye düşürülür. Model aynı hassasiyetle
+    yüklendiğinden transkript tarafı da bu değeri kullanmalıdır.
+    """
+    if precision == "fp16" and _resolve_device(device) == "cpu":
+        logging.warning("fp16 yalnızca GPU'da desteklenir; CPU'da fp32 kullanılacak.")
+        return "fp32"
+    return precision
+
+
+def _model_size_bytes(model):
+    """
+    Modelin ağırlıklarının bellekte kapladığı yaklaşık boyut. state_dict
+    kullanılır; int8 nicemlenmiş katmanların paketlenmiş ağırlıkları
+    parameters() içinde görünmez.
+    """
+    size = 0
+    for value in model.state_dict().values():
+        for tensor in (value if isinstance(value, tuple) else (value,)):
+            if hasattr(tensor, "element_size"):
+                size += tensor.numel() * tensor.element_size()
+    return size
+
+
+def _quantize_int8(model):
+    """
+    Whisper'ın Linear katmanlarına torch dinamik int8 nicemlemesi uygular
+    (yalnızca CPU). whisper.model.Linear, nn.Linear'ın alt sınıfı olduğundan
+    quantize_dynamic tarafından tanınmaz; önce aynı ağırlıkları paylaşan düz
+    nn.Linear ile değiştirilir.
+    """
+    import torch
+    from torch import nn
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+                plain = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, name, plain)
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class _ModelPool:
+    """Aynı anahtarın yüklü kopyaları: boşta olanlar ve kullanımdaki sayısı."""
+
+    def __init__(self, size):
+        self.size = size # Kopya başına bayt
+        self.free = []
+        self.busy = 0
+
+    @property
+    def count(self):
+        return self.busy + len(self.free)
+
+
+class ModelRegistry:
+    """
+    Whisper modellerini süreç boyunca bellekte tutan kayıt defteri.
+    Modeller (model adı, cihaz, hassasiyet) anahtarıyla saklanır; bellek
+    bütçesi aşıldığında en uzun süredir kullanılmayan (LRU) boştaki model çıkarılır.
+    Whisper çözümleme sırasında KV önbellek kancalarını modelin modüllerine
+    taktığından bir model kopyası aynı anda yalnızca bir transkriptte
+    kullanılabilir: use() boştaki bir kopyayı ödünç verir; hepsi kullanımdaysa ve
+    max_instances'a ulaşılmadıysa yeni kopya yükler, ulaşıldıysa kopya boşalana
+    kadar bekler. Aynı kopya eşzamanlı işler tarafından asla iki kez yüklenmez.
+    """
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, max_instances=1):
+        self.memory_budget_mb = memory_budget_mb
+        self.max_instances = max(1, max_instances) # Anahtar başına en fazla kopya (eşzamanlı transkript)
+        self._models = OrderedDict() # anahtar -> _ModelPool
+        self._loading = {} # anahtar -> yüklenmekte olan kopya sayısı
+        self._cond = threading.Condition() # _models ve _loading için
+
+    def _key(self, model_name, device, precision):
+        device = _resolve_device(device)
+        precision = resolve_precision(precision, device)
+        if precision == "int8":
+            device = "cpu" # Dinamik nicemleme yalnızca CPU'da çalışır
+        return (model_name, device, precision)
+
+    def _load(self, model_name, device, precision):
+        """Modeli diskten yükler ve istenen hassasiyete (fp32, fp16, int8) çevirir."""
+        import whisper # openai-whisper (torch ile birlikte) ilk yüklemede içe aktarılır
+        model = whisper.load_model(model_name, device=device)
+        if precision == "fp16":
+            model = model.half()
+        elif precision == "int8":
+            model = _quantize_int8(model)
+        return model
+
+    def _acquire(self, model_name, device, precision):
+        """Anahtarın boştaki bir kopyasını ödünç alır (gerekirse yükler). Dönüş: (anahtar, model)"""
+        key = self._key(model_name, device, precision)
+        waited = False
+        with self._cond:
+            while True:
+                pool = self._models.get(key)
+                if pool and pool.free:
+                    self._models.move_to_end(key)
+                    pool.busy += 1
+                    metrics.incr("whisper_model_cache_total", result="hit", model=model_name)
+                    return key, pool.free.pop()
+                loading = self._loading.get(key, 0)
+                if (pool.count if pool else 0) + loading < self.max_instances:
+                    self._loading[key] = loading + 1
+                    break
+                if not waited:
+                    logging.info(f"Whisper modelinin tüm kopyaları kullanımda, bekleniyor: {key}")
+                    waited = True
+                self._cond.wait()
+
+        # Yükleme kilit dışında yapılır; başka anahtarların kullanımı beklemez
+        try:
+            logging.info(f"Whisper modeli yükleniyor: {key}")
+            metrics.incr("whisper_model_cache_total", result="miss", model=model_name)
+            started = time.perf_counter()
+            model = self._load(*key)
+            metrics.observe("whisper_model_load_seconds", time.perf_counter() - started, model=model_name)
+            size = _model_size_bytes(model)
+            logging.info(f"Whisper modeli yüklendi: {key} (~{size / (1024 * 1024):.0f} MB)")
+        except BaseException:
+            with self._cond:
+                self._loading[key] -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._loading[key] -= 1
+            pool = self._models.setdefault(key, _ModelPool(size))
+            pool.busy += 1
+            self._models.move_to_end(key)
+            self._evict_locked(keep=key)
+        return key, model
+
+    def _release(self, key, model):
+        with self._cond:
+            pool = self._models.get(key)
+            if pool is not None:
+                pool.busy -= 1
+                pool.free.append(model)
+                self._evict_locked() # Kullanımdayken aşılan bütçe kopya boşalınca uygulanır
+            self._cond.notify_all()
+
+    @contextmanager
+    def use(self, model_name, device=None, precision="fp32"):
+        """
+        Modelin bir kopyasını blok boyunca yalnızca bu iş için ödünç verir.
+        Bellekte boşta kopya yoksa yükler (max_instances'a kadar) veya bekler.
+        """
+        key, model = self._acquire(model_name, device, precision)
+        try:
+            yield model
+        finally:
+            self._release(key, model)
+
+    def get(self, model_name, device=None, precision="fp32"):
+        """
+        Modeli yükler (yoksa) ve bir kopyasını döndürür. Kopya ödünç tutulmaz;
+        yalnızca modeli tek thread'den kullanan süreçler (örn. parçalı mod
+        işçileri) içindir. Eşzamanlı transkriptler use() kullanmalıdır.
+        """
+        with self.use(model_name, device=device, precision=precision) as model:
+            return model
+
+    def preload(self, model_name, device=None, precision="fp32"):
+        """Modeli önceden yükler (örn. uygulama açılışında). Hata durumunda False döner."""
+        try:
+            self.get(model_name, device=device, precision=precision)
+            return True
+        except Exception as e:
+            logging.warning(f"Whisper modeli önceden yüklenemedi ({model_name}): {e}")
+            return False
+
+    def set_max_instances(self, max_instances):
+        """Anahtar başına en fazla kopya sayısını değiştirir (örn. eşzamanlı transkript yuvası kadar)."""
+        with self._cond:
+            self.max_instances = max(1, max_instances)
+            self._cond.notify_all()
+
+    def set_memory_budget(self, memory_budget_mb):
+        """Bellek bütçesini değiştirir ve gerekirse hemen model çıkarır."""
+        with self._cond:
+            self.memory_budget_mb = memory_budget_mb
+            self._evict_locked()
+
+    def loaded_models(self):
+        """Bellekteki modellerin anahtarlarını LRU sırasıyla (eskiden yeniye) döndürür."""
+        with self._cond:
+            return list(self._models.keys())
+
+    def clear(self):
+        """Boştaki tüm modelleri bellekten çıkarır (kullanımdakiler iş bitince bırakılır)."""
+        with self._cond:
+            for key in list(self._models.keys()):
+                pool = self._models[key]
+                pool.free.clear()
+                if not pool.busy:
+                    del self._models[key]
+
+    def _evict_locked(self, keep=None):
+        # _cond tutulurken çağrılmalı. Yalnızca boştaki kopyalar çıkarılır.
+        budget_bytes = self.memory_budget_mb * 1024 * 1024
+        total = sum(pool.size * pool.count for pool in self._models.values())
+        for key in list(self._models.keys()):
+            if total <= budget_bytes:
+                break
+            if key == keep:
+                continue
+            pool = self._models[key]
+            while pool.free and total > budget_bytes:
+                pool.free.pop()
+                total -= pool.size
+                logging.info(f"Bellek bütçesi aşıldı, Whisper modeli çıkarıldı: {key}")
+            if not pool.count:
+                del self._models[key]
+
+
+# Süreç genelinde paylaşılan kayıt defteri
+registry = ModelRegistry()
+
+
+def get_model(model_name, device=None, precision="fp32"):
+    """Paylaşılan kayıt defterinden modeli döndürür."""
+    return registry.get(model_name, device=device, precision=precision)
+
+
+def use_model(model_name, device=None, precision="fp32"):
+    """Paylaşılan kayıt defterinden modelin bir kopyasını blok boyunca ödünç alır (bkz. ModelRegistry.use)."""
+    return registry.use(model_name, device=device, precision=precision)
+
+
+def preload_model(model_name, device=None, precision="fp32"):
+    """Paylaşılan kayıt defterine modeli önceden yükler."""
+    return registry.preload(model_name, device=device, precision=precision)
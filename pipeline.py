@@ -0,0 +1,405 @@
+# pipeline.py
+import os
+import time
+import logging
+import functools
+
+from downloader import (download_audio_yt_dlp, stream_audio_yt_dlp, extract_video_id, audio_cache_params, fetch_captions,
+                        caption_cache_params, CAPTION_POLICY_PREFER, CAPTION_POLICY_ONLY,
+                        CAPTION_POLICY_WHISPER, DEFAULT_DOWNLOAD_PROFILE)
+from transcriber import transcribe_audio, transcribe_stream, transcript_cache_params
+from summarizer import summarize_text, summary_cache_params
+from result_cache import STAGE_TRANSCRIPT, STAGE_SUMMARY
+from metrics import metrics
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Aşama adları (zamanlama ve manifest kayıtlarında kullanılır)
+STAGE_DOWNLOAD = "download"
+STAGE_TRANSCRIBE = "transcribe"
+STAGE_SUMMARIZE = "summarize"
+
+# Aşama durumları
+STATUS_DONE = "done"
+STATUS_CACHED = "cached"
+STATUS_SKIPPED = "skipped"
+STATUS_STREAMED = "streamed" # İndirme, transkriptle eşzamanlı akış olarak yapıldı
+STATUS_FAILED = "failed"
+
+
+class VideoJob:
+    """
+    Tek bir videonun indirme -> transkript -> özet aşamalarındaki durumu.
+    GUI, komut satırı ve diğer giriş noktaları aynı aşama fonksiyonlarını
+    bu nesne üzerinden kullanır.
+    """
+
+    def __init__(self, url, caption_policy=CAPTION_POLICY_PREFER, whisper_model="base",
+                 whisper_options=None, workspace="temp_audio_yt", stream_audio=False, summary_options=None,
+                 download_profile=DEFAULT_DOWNLOAD_PROFILE):
+        self.url = url
+        self.video_id = extract_video_id(url)
+        self.caption_policy = caption_policy
+        self.whisper_model = whisper_model
+        self.whisper_options = whisper_options or {} # transcribe_audio'ya ek argümanlar
+        self.workspace = workspace
+        self.stream_audio = stream_audio # Sesi diske yazmadan indirirken yazıya dök
+        self.summary_options = summary_options or {} # summarize_text'e ek argümanlar (örn. compress_tokens)
+        self.download_profile = download_profile # downloader.DOWNLOAD_PROFILES
+
+        self.title = None
+        self.transcript = None
+        self.segments = None # Zaman damgalı transkript: [{"start", "end", "text"}]
+        self.language = None
+        self.source = None # Transkript kaynağı (altyazı / Whisper)
+        self.transcript_params = None
+        self.summary = None
+        self.audio_path = None
+        self.owns_audio = False # Ses önbelleğe alınamadıysa iş bitince silinir
+        self.audio_cache = None # Ses önbellekteyse: iş bitene kadar temizlikten koruyan (pin) önbellek
+        self.download_bytes = None # Ağdan indirilen ses baytı (önbellekten/altyazıdan geldiyse None)
+        self.compression = None # Özet öncesi yerel sıkıştırma istatistikleri (compress_transcript)
+
+        self.stages = {} # aşama -> {"status", "seconds", "error"}
+        self.first_text_seconds = None # Akış modunda ilk metnin gelme süresi
+        self.error = None
+
+    def candidate_transcript_params(self):
+        """Politikaya göre olası transkript kaynaklarının önbellek parametreleri (öncelik sırasıyla)."""
+        whisper_params = self.whisper_cache_params()
+        if self.caption_policy == CAPTION_POLICY_ONLY:
+            return [caption_cache_params()]
+        if self.caption_policy == CAPTION_POLICY_WHISPER:
+            return [whisper_params]
+        return [caption_cache_params(), whisper_params]
+
+    def whisper_cache_params(self):
+        """Bu işin Whisper ayarlarıyla (model, hassasiyet, motor, mod) üretilen transkriptin önbellek parametreleri."""
+        options = self.whisper_options
+        # Akış modu, whisper_options'taki moddan bağımsız olarak pencere pencere çözümler
+        mode = "stream" if self.stream_audio else options.get("mode", "sequential")
+        cuts = {name: options[name] for name in ("chunk_seconds", "overlap_seconds", "batch_size")
+                if options.get(name) is not None}
+        return transcript_cache_params(self.whisper_model, precision=options.get("precision", "fp32"),
+                                       engine=options.get("engine"), vad=options.get("vad", False),
+                                       vad_options=options.get("vad_options"), mode=mode, **cuts)
+
+    def record(self, stage, status, started=None, error=None):
+        """Aşamanın durumunu ve süresini kaydeder."""
+        self.stages[stage] = {
+            "status": status,
+            "seconds": round(time.perf_counter() - started, 3) if started is not None else 0.0,
+            "error": error,
+        }
+        if error:
+            self.error = error
+        metrics.incr("stage_total", stage=stage, status=status)
+        metrics.emit("stage_status", stage=stage, status=status, video=self.video_id,
+                     seconds=self.stages[stage]["seconds"], error=error)
+
+    def on_info(self, info_dict):
+        """yt-dlp video bilgisinden başlığı alır (indirme/altyazı fonksiyonlarına verilir)."""
+        self.title = self.title or (info_dict or {}).get('title')
+
+    def set_segments(self, segments):
+        """Whisper segmentlerini veya (başlangıç, bitiş, metin) altyazı satırlarını ortak biçime çevirir."""
+        self.segments = [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"]} if isinstance(seg, dict)
+            else {"start": seg[0], "end": seg[1], "text": seg[2]}
+            for seg in segments
+        ]
+
+    def store_record(self):
+        """Arşiv (video_store) kaydı."""
+        return {
+            "video_id": self.video_id,
+            "url": self.url,
+            "title": self.title,
+            "language": self.language,
+            "source": self.source,
+            "transcript": self.transcript,
+            "segments": self.segments,
+            "summary": self.summary,
+            "stages": self.stages,
+        }
+
+    def to_dict(self):
+        """Manifest/rapor için özet bilgiler."""
+        return {
+            "url": self.url,
+            "video_id": self.video_id,
+            "status": STATUS_FAILED if self.error else STATUS_DONE,
+            "source": self.source,
+            "language": self.language,
+            "stages": self.stages,
+            "first_text_seconds": self.first_text_seconds,
+            "download_bytes": self.download_bytes,
+            "compression": self.compression,
+            "error": self.error,
+        }
+
+
+def _notify_default(message):
+    logging.info(message)
+
+
+def _stage_span(stage):
+    """Aşama fonksiyonunu, video ve aşama etiketli bir ölçüm span'i içinde çalıştırır."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(job, *args, **kwargs):
+            with metrics.span("stage", stage=stage, video=job.video_id):
+                return fn(job, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def lookup_cached(job, cache, notify=_notify_default):
+    """Önbellekte özet veya transkript varsa işe yükler."""
+    for params in job.candidate_transcript_params():
+        cached_summary = cache.get_json(STAGE_SUMMARY, job.video_id,
+                                        summary_cache_params(params, **job.summary_options))
+        if cached_summary:
+            job.summary, job.source = cached_summary["summary"], cached_summary.get("source")
+            job.title = cached_summary.get("title")
+            job.transcript_params = params
+            for stage in (STAGE_DOWNLOAD, STAGE_TRANSCRIBE, STAGE_SUMMARIZE):
+                job.record(stage, STATUS_CACHED)
+            notify(f"Özet önbellekten alındı (Kaynak: {job.source}).")
+            return
+
+    for params in job.candidate_transcript_params():
+        cached_transcript = cache.get_json(STAGE_TRANSCRIPT, job.video_id, params)
+        if cached_transcript:
+            job.transcript, job.language = cached_transcript["text"], cached_transcript["language"]
+            job.source, job.transcript_params = cached_transcript.get("source"), params
+            job.title = cached_transcript.get("title")
+            if cached_transcript.get("segments"):
+                job.set_segments(cached_transcript["segments"])
+            job.record(STAGE_DOWNLOAD, STATUS_CACHED)
+            job.record(STAGE_TRANSCRIBE, STATUS_CACHED)
+            notify(f"Transkript önbellekten alındı (Kaynak: {job.source}, Algılanan Dil: {job.language}).")
+            return
+
+
+@_stage_span(STAGE_DOWNLOAD)
+def fetch_stage(job, cache, notify=_notify_default):
+    """
+    Ağ aşaması: politika izin veriyorsa altyazıyı dener, gerekirse sesi indirir
+    (veya önbellekten alır). Dönüş: hata mesajı veya None.
+    """
+    if job.summary is not None or job.transcript is not None:
+        return None
+    started = time.perf_counter()
+
+    # Altyazı (politika izin veriyorsa ses indirmeden önce denenir)
+    if job.caption_policy != CAPTION_POLICY_WHISPER:
+        notify("Video altyazıları kontrol ediliyor...")
+        transcript, lang, caption_kind, error = fetch_captions(job.url, on_info=job.on_info,
+                                                               on_segments=job.set_segments)
+        if transcript:
+            job.transcript, job.language = transcript, lang
+            job.source = f"Altyazı ({'yükleyici' if caption_kind == 'manual' else 'otomatik'})"
+            job.transcript_params = caption_cache_params()
+            cache.put_json(STAGE_TRANSCRIPT, job.video_id, job.transcript_params,
+                           {"text": transcript, "language": lang, "source": job.source, "title": job.title,
+                            "segments": job.segments})
+            job.record(STAGE_DOWNLOAD, STATUS_DONE, started)
+            job.record(STAGE_TRANSCRIBE, STATUS_SKIPPED)
+            notify(f"Transkript altyazıdan alındı (Kaynak: {job.source}, Dil: {lang}).")
+            return None
+        if job.caption_policy == CAPTION_POLICY_ONLY:
+            error = f"Altyazı kullanılamadı: {error}"
+            job.record(STAGE_DOWNLOAD, STATUS_FAILED, started, error)
+            return error
+        notify("Yeterli altyazı bulunamadı, Whisper kullanılacak...")
+
+    # Ses (önbellekte yoksa indirilir)
+    if job.stream_audio:
+        # İndirme, transkript aşamasında akış olarak yapılır
+        job.record(STAGE_DOWNLOAD, STATUS_STREAMED)
+        return None
+    if not job.video_id:
+        # Önbelleğe alınamayan video: işin kendi klasörüne indirilir
+        os.makedirs(job.workspace, exist_ok=True)
+        return _download_audio(job, cache, job.workspace, started, notify)
+    # İndirme önbellekteki kalıcı klasöre yapılır; kesilirse .part dosyasından devam eder
+    with cache.download_lock(job.video_id):
+        # Kilit beklenirken aynı video başka bir işte indirilmiş olabilir
+        cached_audio = cache.get_audio(job.video_id, audio_cache_params(job.download_profile))
+        if cached_audio:
+            _pin_audio(job, cache, cached_audio)
+            job.record(STAGE_DOWNLOAD, STATUS_CACHED, started)
+            notify(f"Ses önbellekten alındı: {os.path.basename(cached_audio)}")
+            return None
+        download_dir = cache.download_dir(job.video_id)
+        error = _download_audio(job, cache, download_dir, started, notify)
+        if not error and not job.owns_audio:
+            try:
+                os.rmdir(download_dir) # Boşaldıysa; kalan dosyalar eski verilerle birlikte temizlenir
+            except OSError:
+                pass
+    return error
+
+
+def _download_audio(job, cache, output_path, started, notify):
+    """Sesi output_path'e indirir ve önbelleğe taşır. Dönüş: hata mesajı veya None."""
+    notify("Video sesi indiriliyor (yt-dlp)...")
+    def on_downloaded(size, seconds):
+        job.download_bytes = size
+
+    audio_file, error = download_audio_yt_dlp(job.url, output_path=output_path, on_info=job.on_info,
+                                              profile=job.download_profile, on_downloaded=on_downloaded)
+    if error or not audio_file:
+        error = f"Ses indirilemedi: {error}" if error else "Ses indirilemedi (bilinmeyen hata)."
+        job.record(STAGE_DOWNLOAD, STATUS_FAILED, started, error)
+        return error
+
+    # İndirilen sesi önbelleğe taşı; önbelleğe ait dosyalar silinmez
+    audio_path = cache.put_audio(job.video_id, audio_cache_params(job.download_profile), audio_file)
+    job.owns_audio = audio_path == audio_file
+    if job.owns_audio:
+        job.audio_path = audio_path
+    else:
+        _pin_audio(job, cache, audio_path)
+    job.record(STAGE_DOWNLOAD, STATUS_DONE, started)
+    notify(f"Ses indirildi: {os.path.basename(audio_file)} ({(job.download_bytes or 0) / (1024 * 1024):.1f} MB, "
+           f"{job.stages[STAGE_DOWNLOAD]['seconds']:.1f} sn)")
+    return None
+
+
+def _transcribe_streaming(job, notify, is_cancelled=None):
+    """Sesi indirirken yazıya döker; her yeni segmentte ilerlemeyi bildirir."""
+    notify("Ses akışı başlatılıyor (indirme ve transkript eşzamanlı)...")
+    stream, info_dict, error = stream_audio_yt_dlp(job.url)
+    job.on_info(info_dict)
+    if error:
+        return None, None, f"Ses akışı başlatılamadı: {error}"
+
+    duration = (info_dict or {}).get('duration')
+    started = time.perf_counter()
+    segments = []
+
+    def on_segment(segment):
+        segments.append(segment)
+        position = f"{segment['end'] / 60:.1f}" + (f"/{duration / 60:.1f}" if duration else "")
+        if job.first_text_seconds is None:
+            job.first_text_seconds = round(time.perf_counter() - started, 3)
+        notify(f"Transkript (akış): {position} dk işlendi — ...{segment['text'][-60:]}")
+
+    options = job.whisper_options
+    result = transcribe_stream(stream, model_name=job.whisper_model, precision=options.get("precision", "fp32"),
+                               on_segment=on_segment, total_seconds=duration,
+                               engine=options.get("engine"), threads=options.get("threads"),
+                               vad=options.get("vad", False), vad_options=options.get("vad_options"),
+                               is_cancelled=is_cancelled)
+    job.set_segments(segments)
+    return result
+
+
+@_stage_span(STAGE_TRANSCRIBE)
+def transcribe_stage(job, cache, notify=_notify_default, is_cancelled=None):
+    """
+    CPU aşaması: indirilen sesi Whisper ile yazıya döker. is_cancelled() verilirse
+    pencere/parça/yığın aralarında sorulur; True ise aşama hatayla erken biter.
+    Dönüş: hata mesajı veya None.
+    """
+    if job.summary is not None or job.transcript is not None:
+        return None
+    started = time.perf_counter()
+    if job.stream_audio:
+        transcript, lang, error = _transcribe_streaming(job, notify, is_cancelled)
+    else:
+        if not job.audio_path or not os.path.exists(job.audio_path):
+            # Aynı önbelleği kullanan başka bir süreç (pin'i görmeyen) sesi silmiş olabilir
+            error = "Ses dosyası bulunamadı (önbellekten silinmiş olabilir); işi yeniden başlatın."
+            job.record(STAGE_TRANSCRIBE, STATUS_FAILED, started, error)
+            return error
+        notify(f"Transkript oluşturuluyor (Whisper Model: {job.whisper_model} - Bu işlem uzun sürebilir)...")
+        # Önbellekteki ses silinmez; önbelleğe alınamayan geçici ses silinir
+        # Kontrol noktası günlüğü: yarıda kalan transkript sonraki çalıştırmada kaldığı yerden sürer
+        journal_path = cache.journal_path(job.video_id, job.whisper_cache_params())
+        transcript, lang, error = transcribe_audio(job.audio_path, model_name=job.whisper_model,
+                                                   delete_audio=job.owns_audio, journal_path=journal_path,
+                                                   on_segments=job.set_segments, is_cancelled=is_cancelled,
+                                                   **job.whisper_options)
+    if error or not transcript:
+        error = f"Transkript oluşturulamadı: {error}" if error else "Transkript oluşturulamadı (bilinmeyen hata)."
+        job.record(STAGE_TRANSCRIBE, STATUS_FAILED, started, error)
+        return error
+
+    job.transcript, job.language = transcript, lang
+    job.source = f"Whisper ({job.whisper_model})"
+    job.transcript_params = job.whisper_cache_params()
+    cache.put_json(STAGE_TRANSCRIPT, job.video_id, job.transcript_params,
+                   {"text": transcript, "language": lang, "source": job.source, "title": job.title,
+                    "segments": job.segments})
+    job.record(STAGE_TRANSCRIBE, STATUS_DONE, started)
+    notify(f"Transkript tamamlandı (Algılanan Dil: {lang}).")
+    return None
+
+
+@_stage_span(STAGE_SUMMARIZE)
+def summarize_stage(job, cache, api_key, notify=_notify_default, on_chunk=None):
+    """
+    API aşaması: transkripti Gemini ile Türkçe özetler. on_chunk(parça) verilirse
+    özet metni üretildikçe iletilir. Dönüş: hata mesajı veya None.
+    """
+    if job.summary is not None:
+        return None
+    started = time.perf_counter()
+    notify(f"Metin Gemini API ile '{job.language}' dilinden Türkçe'ye özetleniyor...")
+    def on_compressed(stats):
+        job.compression = stats
+
+    summary, error = summarize_text(job.transcript, api_key, detected_language=job.language,
+                                    on_chunk=on_chunk, on_compressed=on_compressed, **job.summary_options)
+    if error or not summary:
+        error = f"Metin özetlenemedi: {error}"
+        job.record(STAGE_SUMMARIZE, STATUS_FAILED, started, error)
+        return error
+
+    job.summary = summary
+    if job.compression:
+        # Özet süresiyle aynı olayda: sıkıştırmanın token kazancı ve maliyeti birlikte görünür
+        stats = job.compression
+        metrics.emit("summary_compression", video=job.video_id, input_tokens=stats["input_tokens"],
+                     output_tokens=stats["output_tokens"], kept_sentences=stats["kept_sentences"],
+                     sentences=stats["sentences"], compress_seconds=stats["seconds"],
+                     summary_seconds=round(time.perf_counter() - started, 3))
+    cache.put_json(STAGE_SUMMARY, job.video_id, summary_cache_params(job.transcript_params, **job.summary_options),
+                   {"summary": summary, "source": job.source, "title": job.title})
+    job.record(STAGE_SUMMARIZE, STATUS_DONE, started)
+    return None
+
+
+def _pin_audio(job, cache, path):
+    """Önbellekteki sesi işe verir ve iş bitene (cleanup_job) kadar LRU temizliğinden korur."""
+    job.audio_path = path
+    job.audio_cache = cache
+    cache.pin(path)
+
+
+def cleanup_job(job, remove_workspace=True):
+    """
+    Önbellekteki sesin korumasını kaldırır; önbelleğe alınamayan geçici ses
+    dosyasını ve boş çalışma klasörünü siler. Klasör başka işlerle
+    paylaşılıyorsa remove_workspace=False verilmelidir.
+    """
+    if job.audio_cache:
+        job.audio_cache.unpin(job.audio_path)
+        job.audio_cache = None
+    if job.owns_audio and job.audio_path and os.path.exists(job.audio_path):
+        try:
+            os.remove(job.audio_path)
+            logging.info(f"Temizlik: İşlem sonu artık '{job.audio_path}' silindi.")
+        except OSError as e:
+            logging.warning(f"Temizlik: İşlem sonu '{job.audio_path}' silinemedi: {e}")
+
+    if remove_workspace and os.path.isdir(job.workspace) and not os.listdir(job.workspace):
+        try:
+            os.rmdir(job.workspace)
+            logging.info(f"Temizlik: Boş geçici dizin '{job.workspace}' silindi.")
+        except OSError as e:
+            logging.warning(f"Temizlik: Geçici dizin '{job.workspace}' silinemedi: {e}")
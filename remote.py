@@ -0,0 +1,175 @@
+# remote.py
+import json
+import threading
+import logging
+import urllib.request
+import urllib.error
+
+from downloader import CAPTION_POLICY_PREFER
+from pipeline import VideoJob
+from scheduler import JOB_QUEUED, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SERVER_URL_ENV = "OZETLE_SERVER" # Ayarlıysa arayüz işleri bu servise gönderir (örn. http://127.0.0.1:8770)
+REQUEST_TIMEOUT_SECONDS = 10
+EVENTS_TIMEOUT_SECONDS = 60 # Servis SSE_KEEPALIVE_SECONDS aralığıyla yorum satırı gönderir
+
+_FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+class RemoteJob:
+    """
+    Servisteki bir işin istemci tarafı kopyası. ScheduledJob ile aynı alanları
+    taşır; iş bitince 'job' alanı servisin gönderdiği video kaydıyla doldurulur.
+    """
+
+    def __init__(self, job_id, url):
+        self.id = job_id
+        self.job = VideoJob(url)
+        self.state = JOB_QUEUED
+        self.stage = None
+        self.waiting = False
+        self.error = None
+
+    @property
+    def url(self):
+        return self.job.url
+
+    @property
+    def summary(self):
+        return self.job.summary
+
+    def apply_record(self, record):
+        job = self.job
+        for field in ("video_id", "title", "language", "source", "transcript", "segments", "summary"):
+            if record.get(field) is not None:
+                setattr(job, field, record[field])
+        job.stages = record.get("stages") or {}
+
+
+class RemoteScheduler:
+    """
+    JobScheduler ile aynı arayüze (submit/get/jobs/cancel ve on_* bildirimleri)
+    sahip HTTP istemcisi: işler server.py servisinde, modeli yüklü işçilerde
+    çalışır. Her iş için olay akışı (SSE) ayrı bir thread'de okunur; ölçüm
+    olayları on_event'e (yerel metrics dinleyicisi gibi) iletilir.
+    """
+
+    def __init__(self, url, on_update=None, on_finished=None, on_summary_chunk=None, on_event=None):
+        self.url = url.rstrip("/")
+        self.on_update = on_update
+        self.on_finished = on_finished
+        self.on_summary_chunk = on_summary_chunk
+        self.on_event = on_event
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._failed_ids = 0 # Servise ulaşamayan işler için yerel (negatif) kimlikler
+
+    def _request(self, method, path, payload=None):
+        """Dönüş: (JSON yanıt, hata)"""
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+                return json.loads(response.read()), None
+        except urllib.error.HTTPError as e:
+            try:
+                return None, json.loads(e.read()).get("error") or str(e)
+            except ValueError:
+                return None, str(e)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            return None, f"Servise ulaşılamadı ({self.url}): {e}"
+
+    def health(self):
+        """Dönüş: (servis durumu, hata)"""
+        return self._request("GET", "/health")
+
+    def submit(self, url, api_key, caption_policy=CAPTION_POLICY_PREFER, whisper_model="base",
+               stream_audio=False):
+        """İşi servise gönderir ve hemen döner. Dönüş: RemoteJob (gönderilemezse başarısız durumda)."""
+        data, error = self._request("POST", "/jobs", {"url": url, "api_key": api_key or None,
+                                                      "caption_policy": caption_policy,
+                                                      "whisper_model": whisper_model,
+                                                      "stream_audio": stream_audio})
+        if error:
+            with self._lock:
+                self._failed_ids -= 1
+                remote = RemoteJob(self._failed_ids, url)
+                self._jobs[remote.id] = remote
+            remote.state, remote.error = JOB_FAILED, error
+            logging.error(f"İş servise gönderilemedi ({url}): {error}")
+            self._notify(remote)
+            return remote
+        remote = RemoteJob(data["id"], url)
+        with self._lock:
+            self._jobs[remote.id] = remote
+        self._notify(remote)
+        threading.Thread(target=self._follow, args=(remote,), name=f"remote-job-{remote.id}", daemon=True).start()
+        return remote
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        remote = self.get(job_id)
+        if remote and remote.state not in _FINISHED_STATES:
+            data, error = self._request("POST", f"/jobs/{job_id}/cancel")
+            if error:
+                logging.warning(f"İptal isteği başarısız (#{job_id}): {error}")
+        return remote
+
+    def _notify(self, remote):
+        if self.on_update:
+            try:
+                self.on_update(remote)
+            except Exception as e:
+                logging.warning(f"İş güncelleme bildirimi başarısız: {e}")
+
+    # --- Olay akışı ---
+    def _follow(self, remote):
+        """İşin olay akışını iş bitene kadar okur."""
+        try:
+            with urllib.request.urlopen(f"{self.url}/jobs/{remote.id}/events",
+                                        timeout=EVENTS_TIMEOUT_SECONDS) as response:
+                data_lines = []
+                for raw in response:
+                    line = raw.decode("utf-8").rstrip("\r\n")
+                    if line.startswith("data:"):
+                        data_lines.append(line[5:].strip())
+                    elif not line and data_lines:
+                        self._handle(remote, json.loads("\n".join(data_lines)))
+                        data_lines = []
+                    # 'event:' satırı veriyle tekrar eder; ':' ile başlayanlar bağlantı canlı tutma yorumları
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            logging.error(f"İş olay akışı kesildi (#{remote.id}): {e}")
+        if remote.state not in _FINISHED_STATES:
+            remote.state, remote.stage, remote.waiting = JOB_FAILED, None, False
+            remote.error = "Servisle bağlantı koptu."
+            self._notify(remote)
+
+    def _handle(self, remote, event):
+        kind = event["type"]
+        if kind == "job":
+            remote.state, remote.stage, remote.waiting = event["state"], event["stage"], event["waiting"]
+            remote.error = event["error"]
+            if remote.state in (JOB_DONE, JOB_FAILED) and self.on_finished:
+                try:
+                    self.on_finished(remote)
+                except Exception as e:
+                    logging.warning(f"İş bitiş işlemi başarısız ({remote.url}): {e}")
+            self._notify(remote)
+        elif kind == "result":
+            remote.apply_record(event["record"])
+        elif kind == "summary_chunk":
+            if self.on_summary_chunk:
+                self.on_summary_chunk(remote, event["text"])
+        elif self.on_event and "context" in event:
+            self.on_event(event)
@@ -0,0 +1,262 @@
+# result_cache.py
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from collections import Counter
+
+from filelock import FileLock
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_CACHE_DIR = "ozetle_cache"
+DEFAULT_MAX_SIZE_MB = 2048 # Önbelleğin toplam boyut sınırı
+
+# Önbellek aşamaları: indirilen ses, transkript, özet
+STAGE_AUDIO = "audio"
+STAGE_TRANSCRIPT = "transcript"
+STAGE_SUMMARY = "summary"
+# Yarım kalan işlerin devam verisi: indirme (.part) klasörleri ve transkript günlükleri
+STAGE_PARTIAL = "partial"
+STAGE_JOURNAL = "journal"
+STALE_RESUME_SECONDS = 7 * 24 * 3600 # Bu süredir dokunulmayan devam verisi silinir
+
+
+class ResultCache:
+    """
+    YouTube video ID'si ve aşama parametreleriyle anahtarlanan disk önbelleği.
+    Girdiler geçici dosyaya yazılıp os.replace ile yerine taşınır (atomik);
+    böylece eşzamanlı iki iş bir girdiyi asla yarım bırakamaz. Toplam boyut
+    sınırı aşıldığında en uzun süredir kullanılmayan girdiler silinir (LRU);
+    bir işin kullandığı (pin ile işaretlenmiş) girdiler silinmez.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        self.cache_dir = cache_dir
+        self.max_size_mb = max_size_mb
+        os.makedirs(cache_dir, exist_ok=True)
+        # Temizlik işleminin aynı anda tek süreçte çalışması için
+        self._lock = FileLock(os.path.join(cache_dir, ".lock"))
+        self._pins = Counter() # yol -> onu kullanan iş sayısı (bu süreçte)
+        self._pins_lock = threading.Lock()
+
+    # --- Anahtar ve yol yardımcıları ---
+    def _key(self, video_id, params):
+        """Video ID ve parametrelerden (sıralı JSON) kararlı bir anahtar üretir."""
+        raw = json.dumps({"id": video_id, "params": params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _stage_dir(self, stage):
+        path = os.path.join(self.cache_dir, stage)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _touch(self, path):
+        # LRU için son kullanım zamanı = dosyanın mtime değeri
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _atomic_place(self, tmp_path, final_path):
+        """Geçici dosyayı atomik olarak yerine taşır; başarısızsa geçici dosyayı siler."""
+        try:
+            os.replace(tmp_path, final_path)
+            return True
+        except OSError as e:
+            # Windows'ta hedef başka bir işte açıksa değiştirilemez; mevcut girdi geçerlidir
+            logging.warning(f"Önbellek girdisi yazılamadı ({final_path}): {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    # --- Ses dosyaları ---
+    def get_audio(self, video_id, params):
+        """Önbellekteki ses dosyasının yolunu döndürür; yoksa None."""
+        if not video_id:
+            return None
+        key = self._key(video_id, params)
+        stage_dir = self._stage_dir(STAGE_AUDIO)
+        for name in os.listdir(stage_dir):
+            if name.startswith(key + ".") and ".tmp-" not in name:
+                path = os.path.join(stage_dir, name)
+                self._touch(path)
+                logging.info(f"Önbellek isabeti (ses): {video_id}")
+                return path
+        return None
+
+    def put_audio(self, video_id, params, source_path):
+        """
+        İndirilen ses dosyasını önbelleğe taşır ve önbellekteki yolunu döndürür.
+        Taşıma başarısız olursa kaynak yol döndürülür.
+        """
+        if not video_id or not source_path or not os.path.exists(source_path):
+            return source_path
+        key = self._key(video_id, params)
+        ext = os.path.splitext(source_path)[1]
+        final_path = os.path.join(self._stage_dir(STAGE_AUDIO), key + ext)
+        tmp_path = f"{final_path}.tmp-{uuid.uuid4().hex}"
+        try:
+            shutil.move(source_path, tmp_path) # Farklı disklerde kopyalar
+        except OSError as e:
+            logging.warning(f"Ses önbelleğe alınamadı: {e}")
+            return source_path
+        if not self._atomic_place(tmp_path, final_path) and not os.path.exists(final_path):
+            return None
+        self._touch(final_path) # taşınan dosya indirme zamanını korur
+        self.evict(keep=final_path)
+        return final_path
+
+    # --- Yarım kalan işlerin devam verisi ---
+    def download_dir(self, video_id):
+        """
+        Videonun indirme klasörü. yt-dlp'nin .part dosyaları burada kalır;
+        kesilen indirme aynı klasöre yeniden başlatıldığında kaldığı yerden sürer.
+        """
+        path = os.path.join(self._stage_dir(STAGE_PARTIAL), video_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def download_lock(self, video_id):
+        """Aynı videonun .part dosyasına iki işin birden yazmasını önleyen kilit."""
+        return FileLock(os.path.join(self._stage_dir(STAGE_PARTIAL), video_id + ".lock"))
+
+    def journal_path(self, video_id, params):
+        """Transkript kontrol noktası günlüğünün yolu (transkript parametreleriyle anahtarlanır)."""
+        if not video_id:
+            return None
+        return os.path.join(self._stage_dir(STAGE_JOURNAL), self._key(video_id, params) + ".jsonl")
+
+    def _remove_stale_resume_data(self):
+        """Uzun süredir devam ettirilmeyen indirme klasörlerini ve günlükleri siler."""
+        now = time.time()
+        for stage in (STAGE_PARTIAL, STAGE_JOURNAL):
+            stage_dir = os.path.join(self.cache_dir, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for name in os.listdir(stage_dir):
+                path = os.path.join(stage_dir, name)
+                try:
+                    # Klasörün mtime'ı içindeki .part dosyası büyüdükçe değişmez; en yeni dosyaya bakılır
+                    paths = [path] + ([os.path.join(path, f) for f in os.listdir(path)] if os.path.isdir(path) else [])
+                    if now - max(os.path.getmtime(p) for p in paths) <= STALE_RESUME_SECONDS:
+                        continue
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                    logging.info(f"Eski devam verisi silindi: {path}")
+                except OSError:
+                    pass # Başka bir işte kullanılıyor olabilir
+
+    # --- JSON girdileri (transkript, özet) ---
+    def get_json(self, stage, video_id, params):
+        """Önbellekteki JSON girdisini döndürür; yoksa veya okunamazsa None."""
+        if not video_id:
+            return None
+        path = os.path.join(self._stage_dir(stage), self._key(video_id, params) + ".json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Önbellek girdisi okunamadı ({path}): {e}")
+            return None
+        self._touch(path)
+        logging.info(f"Önbellek isabeti ({stage}): {video_id}")
+        return data
+
+    def put_json(self, stage, video_id, params, data):
+        """JSON girdisini atomik olarak yazar."""
+        if not video_id:
+            return False
+        final_path = os.path.join(self._stage_dir(stage), self._key(video_id, params) + ".json")
+        tmp_path = f"{final_path}.tmp-{uuid.uuid4().hex}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        except OSError as e:
+            logging.warning(f"Önbellek girdisi yazılamadı ({final_path}): {e}")
+            return False
+        placed = self._atomic_place(tmp_path, final_path)
+        self.evict(keep=final_path)
+        return placed
+
+    # --- Kullanımdaki girdiler ---
+    def pin(self, path):
+        """
+        Girdiyi kullanım bitene kadar temizlikten korur (örn. ses, Whisper
+        sırası beklerken). Son kullanım zamanı da güncellenir; başka süreçlerin
+        LRU temizliği de onu en son siler.
+        """
+        if not path:
+            return
+        with self._pins_lock:
+            self._pins[os.path.abspath(path)] += 1
+        self._touch(path)
+
+    def unpin(self, path):
+        if not path:
+            return
+        path = os.path.abspath(path)
+        with self._pins_lock:
+            self._pins[path] -= 1
+            if self._pins[path] <= 0:
+                del self._pins[path]
+
+    def _pinned(self, path):
+        with self._pins_lock:
+            return self._pins[os.path.abspath(path)] > 0
+
+    # --- LRU temizliği ---
+    def evict(self, keep=None):
+        """
+        Toplam boyut sınırı aşılmışsa en eski kullanılan girdileri siler.
+        keep: az önce yazılan ve silinmemesi gereken girdinin yolu.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for stage in (STAGE_AUDIO, STAGE_TRANSCRIPT, STAGE_SUMMARY):
+                stage_dir = os.path.join(self.cache_dir, stage)
+                if not os.path.isdir(stage_dir):
+                    continue
+                for name in os.listdir(stage_dir):
+                    path = os.path.join(stage_dir, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    if ".tmp-" in name:
+                        # Çöken işlerden kalan bir saatten eski geçici dosyalar
+                        if time.time() - st.st_mtime > 3600:
+                            try:
+                                os.remove(path)
+                            except OSError:
+                                pass
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+                    total += st.st_size
+
+            limit = self.max_size_mb * 1024 * 1024
+            for _, size, path in sorted(entries):
+                if total <= limit:
+                    break
+                if path == keep or self._pinned(path):
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    logging.info(f"Önbellek sınırı aşıldı, girdi silindi: {path}")
+                except OSError as e:
+                    # Başka bir işte açık olabilir; bir sonraki temizlikte tekrar denenir
+                    logging.warning(f"Önbellek girdisi silinemedi ({path}): {e}")
+            self._remove_stale_resume_data()
@@ -0,0 +1,241 @@
+# scheduler.py
+import os
+import shutil
+import tempfile
+import threading
+import itertools
+import logging
+
+from downloader import CAPTION_POLICY_PREFER, DEFAULT_DOWNLOAD_PROFILE
+from metrics import metrics
+from model_registry import registry
+from pipeline import (VideoJob, lookup_cached, fetch_stage, transcribe_stage, summarize_stage, cleanup_job,
+                      STAGE_DOWNLOAD, STAGE_TRANSCRIBE, STAGE_SUMMARIZE)
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Varsayılan eşzamanlılık sınırları
+DEFAULT_DOWNLOAD_SLOTS = 3 # Ağ ağırlıklı; çekirdek sayısından bağımsız
+DEFAULT_GEMINI_SLOTS = 4 # API ağırlıklı
+CORES_PER_WHISPER_JOB = 4 # Bir transkript işine ayrılan en az çekirdek
+
+# İş durumları
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+_ACQUIRE_POLL_SECONDS = 0.2 # Sıra beklerken iptalin ne sıklıkla kontrol edileceği
+
+
+def default_whisper_slots():
+    """
+    Aynı anda çalışabilecek transkript işi sayısı (çekirdekleri aşmayacak şekilde).
+    Her yuva model kayıt defterinden kendi model kopyasını ödünç alır.
+    """
+    return max(1, (os.cpu_count() or 1) // CORES_PER_WHISPER_JOB)
+
+
+class JobCancelled(Exception):
+    """İş, kullanıcı tarafından iptal edildi."""
+
+
+class ScheduledJob:
+    """
+    Zamanlayıcıdaki tek bir iş: VideoJob'a ek olarak kimlik, durum, o anki
+    aşama ve iptal işareti taşır. Her işin kendine ait geçici çalışma klasörü vardır.
+    """
+
+    def __init__(self, job_id, video_job, api_key):
+        self.id = job_id
+        self.job = video_job
+        self.api_key = api_key
+        self.state = JOB_QUEUED
+        self.stage = None # O an çalışan veya sırası beklenen aşama
+        self.waiting = False # Aşama için boş yer bekleniyor mu
+        self.error = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def url(self):
+        return self.job.url
+
+    @property
+    def summary(self):
+        return self.job.summary
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """
+        İptal ister. Sıra bekleyen iş hemen durur; Whisper aşaması bir sonraki
+        pencere/parça/yığından önce, diğer aşamalar ise bittiklerinde (bir
+        sonraki aşamaya geçmeden) durur.
+        """
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+
+class JobScheduler:
+    """
+    Aşamaya duyarlı iş zamanlayıcısı. Her iş kendi thread'inde aşamalarını
+    sırayla yürütür; aşamalar ayrı semaforlarla sınırlanır: indirmeler ve
+    Gemini çağrıları eşzamanlı ilerlerken CPU ağırlıklı Whisper işleri
+    çekirdek sayısıyla sınırlı kalır. on_update(scheduled_job) her durum
+    değişikliğinde (iş thread'inden) çağrılır.
+    """
+
+    def __init__(self, cache, download_slots=DEFAULT_DOWNLOAD_SLOTS, whisper_slots=None,
+                 gemini_slots=DEFAULT_GEMINI_SLOTS, whisper_options=None, on_update=None, ready=None,
+                 on_finished=None, on_summary_chunk=None, summary_options=None,
+                 download_profile=DEFAULT_DOWNLOAD_PROFILE):
+        self.cache = cache
+        self.whisper_slots = whisper_slots or default_whisper_slots()
+        self._download_slots = threading.Semaphore(max(1, download_slots))
+        self._whisper_slots = threading.Semaphore(self.whisper_slots)
+        self._gemini_slots = threading.Semaphore(max(1, gemini_slots))
+        # Bir model kopyası aynı anda tek transkriptte kullanılabilir; her Whisper yuvasına bir kopya
+        registry.set_max_instances(max(registry.max_instances, self.whisper_slots))
+        self.whisper_options = dict(whisper_options or {})
+        if self.whisper_options.get("mode") == "chunked" and not self.whisper_options.get("workers"):
+            # Eşzamanlı transkript işleri çekirdekleri paylaşır
+            self.whisper_options["workers"] = max(1, (os.cpu_count() or 1) // self.whisper_slots)
+        # Aynı süreçteki eşzamanlı transkriptlerin torch thread'leri de çekirdekleri paylaşır
+        self.whisper_options.setdefault("threads", max(1, (os.cpu_count() or 1) // self.whisper_slots))
+        self.summary_options = dict(summary_options or {})
+        self.download_profile = download_profile
+        self.on_update = on_update
+        self.on_finished = on_finished # on_finished(scheduled_job): iş bittiğinde (başarılı/başarısız)
+        # on_summary_chunk(scheduled_job, parça): özet metni akış olarak geldikçe (iş thread'inden)
+        self.on_summary_chunk = on_summary_chunk
+        self.ready = ready # Verilirse işler başlamadan önce beklenir (örn. arka plan ısınması)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, url, api_key, caption_policy=CAPTION_POLICY_PREFER, whisper_model="base",
+               stream_audio=False, job_id=None):
+        """
+        İşi kuyruğa ekler ve hemen döner. job_id verilmezse sıradaki kimlik
+        atanır (birden çok zamanlayıcıyı yöneten servis kendi kimliklerini verir).
+        Dönüş: ScheduledJob.
+        """
+        workspace = tempfile.mkdtemp(prefix="ozetle_job_")
+        video_job = VideoJob(url, caption_policy=caption_policy, whisper_model=whisper_model,
+                             whisper_options=self.whisper_options, workspace=workspace,
+                             stream_audio=stream_audio, summary_options=self.summary_options,
+                             download_profile=self.download_profile)
+        scheduled = ScheduledJob(job_id if job_id is not None else next(self._ids), video_job, api_key)
+        with self._lock:
+            self._jobs[scheduled.id] = scheduled
+        self._notify(scheduled)
+        threading.Thread(target=self._run, args=(scheduled,), name=f"job-{scheduled.id}", daemon=True).start()
+        return scheduled
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Tüm işler (eklenme sırasıyla)."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        scheduled = self.get(job_id)
+        if scheduled:
+            scheduled.cancel()
+        return scheduled
+
+    def _notify(self, scheduled):
+        if self.on_update:
+            try:
+                self.on_update(scheduled)
+            except Exception as e:
+                logging.warning(f"İş güncelleme bildirimi başarısız: {e}")
+
+    def _chunk_forwarder(self, scheduled):
+        if not self.on_summary_chunk:
+            return None
+        return lambda text: self.on_summary_chunk(scheduled, text)
+
+    def _acquire(self, scheduled, semaphore, stage):
+        """Aşama için yer bekler; beklerken iptal edilirse JobCancelled fırlatır."""
+        scheduled.stage, scheduled.waiting = stage, True
+        self._notify(scheduled)
+        while not semaphore.acquire(timeout=_ACQUIRE_POLL_SECONDS):
+            scheduled.check_cancelled()
+        scheduled.waiting = False
+        self._notify(scheduled)
+
+    def _run_stage(self, scheduled, semaphore, stage, fn):
+        scheduled.check_cancelled()
+        self._acquire(scheduled, semaphore, stage)
+        try:
+            scheduled.check_cancelled()
+            return fn()
+        finally:
+            semaphore.release()
+
+    def _run(self, scheduled):
+        job = scheduled.job
+        cache = self.cache
+
+        def notify(message):
+            metrics.emit("status", message=message)
+
+        # İşin tüm ölçüm olayları 'job' etiketini taşır (GUI satırı bu etiketle eşleşir)
+        with metrics.span("job", job=scheduled.id):
+            try:
+                while self.ready and not self.ready.wait(_ACQUIRE_POLL_SECONDS):
+                    scheduled.check_cancelled()
+                scheduled.check_cancelled()
+                scheduled.state = JOB_RUNNING
+                self._notify(scheduled)
+
+                lookup_cached(job, cache, notify=notify)
+                # Önbellekten veya altyazıdan tamamlanan aşamalar için yer beklenmez
+                needs_transcript = lambda: job.summary is None and job.transcript is None
+                stages = (
+                    (self._download_slots, STAGE_DOWNLOAD, needs_transcript,
+                     lambda: fetch_stage(job, cache, notify=notify)),
+                    (self._whisper_slots, STAGE_TRANSCRIBE, needs_transcript,
+                     lambda: transcribe_stage(job, cache, notify=notify,
+                                              is_cancelled=lambda: scheduled.cancelled)),
+                    (self._gemini_slots, STAGE_SUMMARIZE, lambda: job.summary is None,
+                     lambda: summarize_stage(job, cache, scheduled.api_key, notify=notify,
+                                             on_chunk=self._chunk_forwarder(scheduled))),
+                )
+                for semaphore, stage, needed, fn in stages:
+                    if not needed():
+                        continue
+                    error = self._run_stage(scheduled, semaphore, stage, fn)
+                    if error:
+                        scheduled.check_cancelled() # İptalle yarıda kalan aşama hata değil iptal sayılır
+                        raise RuntimeError(error)
+                scheduled.state = JOB_DONE
+            except JobCancelled:
+                scheduled.state = JOB_CANCELLED
+                notify("İş iptal edildi.")
+            except Exception as e:
+                scheduled.state = JOB_FAILED
+                scheduled.error = job.error or str(e)
+                logging.error(f"İş başarısız ({job.url}): {scheduled.error}")
+            finally:
+                scheduled.stage, scheduled.waiting = None, False
+                cleanup_job(job, remove_workspace=False)
+                # Klasör yalnızca bu işe ait; içinde kalan her şey silinebilir
+                shutil.rmtree(job.workspace, ignore_errors=True)
+            if self.on_finished and scheduled.state in (JOB_DONE, JOB_FAILED):
+                try:
+                    self.on_finished(scheduled)
+                except Exception as e:
+                    logging.warning(f"İş bitiş işlemi başarısız ({job.url}): {e}")
+        self._notify(scheduled)
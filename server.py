@@ -0,0 +1,495 @@
+# server.py
+"""
+Arayüzsüz HTTP servis modu: Whisper modelleri kalıcı işçi süreçlerinde
+yüklü kalır; masaüstü arayüzü (OZETLE_SERVER ortam değişkeniyle) veya başka
+istemciler işleri bu servise gönderir.
+
+Örnekler:
+    python server.py --port 8770 --workers 2
+    python server.py --fake-gemini        # Gemini yerine yerel sahte sunucu (test için)
+
+API:
+    POST /jobs                 {"url", "api_key"?, "caption_policy"?, "whisper_model"?, "stream_audio"?}
+    GET  /jobs                 tüm işler
+    GET  /jobs/<id>            durum, aşama, ilerleme, kısmi/nihai özet (?transcript=1: transkript dahil)
+    GET  /jobs/<id>/events     ilerleme, özet parçaları ve sonuç (server-sent events)
+    POST /jobs/<id>/cancel     iptal
+    GET  /health               işçi süreçlerinin durumu
+"""
+import os
+import re
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import itertools
+import logging
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from downloader import CAPTION_POLICIES, CAPTION_POLICY_PREFER, DOWNLOAD_PROFILES, DEFAULT_DOWNLOAD_PROFILE
+from scheduler import (JobScheduler, default_whisper_slots, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED,
+                       JOB_CANCELLED)
+from summarizer import GEMINI_ENDPOINT_ENV
+from transcriber import ENGINE_PRESETS, DEFAULT_ENGINE, DEFAULT_BATCH_SIZE
+from result_cache import DEFAULT_CACHE_DIR
+from metrics import metrics
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8770
+JOBS_PER_WORKER = 3 # Bir işçide aynı anda yürüyen iş (indirme/Gemini, Whisper ile örtüşsün diye)
+SSE_KEEPALIVE_SECONDS = 15 # Olay gelmezse bağlantının kapanmaması için gönderilen yorum satırı aralığı
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+# İşçiden servise iletilen ölçüm olayları (GUI kuyruk satırının kullandıkları)
+FORWARDED_EVENTS = ("status", "span_start", "progress", "estimate", "stage_status")
+
+_JOB_PATH_RE = re.compile(r"^/jobs/(?P<id>\d+)(?P<action>/events|/cancel)?$")
+
+
+# --- İşçi süreci ---
+
+def _job_state(scheduled):
+    return {"type": "job", "state": scheduled.state, "stage": scheduled.stage, "waiting": scheduled.waiting,
+            "error": scheduled.error}
+
+
+def _worker_main(index, tasks, commands, events, options):
+    """
+    İşçi süreci: modeli bir kez yükler, görev kuyruğundan iş alır ve kendi
+    zamanlayıcısında yürütür. Durum değişiklikleri, ölçüm olayları, özet
+    parçaları ve sonuçlar (iş_kimliği, olay) olarak olay kuyruğuna yazılır.
+    """
+    from result_cache import ResultCache
+    from model_registry import preload_model
+    from transcriber import resolve_engine
+
+    capacity = threading.Semaphore(JOBS_PER_WORKER)
+    released = set()
+    ready = threading.Event()
+
+    def warm_up():
+        try:
+            import google.generativeai
+            preload_model(options["whisper_model"],
+                          precision=resolve_engine(options["whisper_options"].get("engine"))[0])
+            logging.info(f"İşçi {index}: model yüklendi ({options['whisper_model']}).")
+        except Exception as e:
+            logging.warning(f"İşçi {index}: ısınma başarısız (ilk işte yeniden denenecek): {e}")
+        finally:
+            ready.set()
+            events.put((None, {"type": "worker_ready", "worker": index}))
+
+    def on_metrics(event):
+        job_id = (event.get("context") or {}).get("job")
+        if job_id is not None and event["type"] in FORWARDED_EVENTS:
+            events.put((job_id, event))
+
+    def on_update(scheduled):
+        events.put((scheduled.id, _job_state(scheduled)))
+        if scheduled.state in FINISHED_STATES and scheduled.id not in released:
+            released.add(scheduled.id)
+            capacity.release()
+
+    def on_finished(scheduled):
+        events.put((scheduled.id, {"type": "result", "record": scheduled.job.store_record()}))
+
+    def on_summary_chunk(scheduled, text):
+        events.put((scheduled.id, {"type": "summary_chunk", "text": text}))
+
+    def read_commands():
+        while True:
+            command, job_id = commands.get()
+            if command == "cancel":
+                scheduler.cancel(job_id)
+
+    metrics.add_listener(on_metrics)
+    scheduler = JobScheduler(ResultCache(options["cache_dir"]), whisper_slots=1,
+                             whisper_options=options["whisper_options"],
+                             download_profile=options["download_profile"], on_update=on_update,
+                             on_finished=on_finished, on_summary_chunk=on_summary_chunk, ready=ready)
+    threading.Thread(target=warm_up, daemon=True).start()
+    threading.Thread(target=read_commands, daemon=True).start()
+    while True:
+        capacity.acquire()
+        task = tasks.get()
+        if task is None:
+            break
+        scheduler.submit(task["url"], task["api_key"], caption_policy=task["caption_policy"],
+                         whisper_model=task["whisper_model"], stream_audio=task["stream_audio"],
+                         job_id=task["id"])
+        # Zamanlayıcıya eklendikten sonra bildirilir; bekleyen iptal komutu işi bulabilsin
+        events.put((task["id"], {"type": "accepted", "worker": index}))
+
+
+# --- Servis (HTTP sürecinde) ---
+
+class ServerJob:
+    """Servisteki bir işin son bilinen durumu ve olay geçmişi (SSE'ye sonradan bağlananlar için)."""
+
+    def __init__(self, job_id, request):
+        self.id = job_id
+        self.url = request["url"]
+        self.created = time.time()
+        self.state = JOB_QUEUED
+        self.stage = None
+        self.waiting = False
+        self.error = None
+        self.worker = None
+        self.cancel_requested = False
+        self.progress = None # Son ilerleme olayı (oran, kalan süre)
+        self.message = None
+        self.partial_summary = ""
+        self.record = None # Bitince: video kaydı (başlık, özet, transkript, aşama süreleri)
+        self.history = []
+        self.subscribers = []
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    def to_dict(self, include_transcript=False):
+        data = {
+            "id": self.id,
+            "url": self.url,
+            "state": self.state,
+            "stage": self.stage,
+            "waiting": self.waiting,
+            "error": self.error,
+            "progress": self.progress,
+            "message": self.message,
+            "partial_summary": self.partial_summary if self.state == JOB_RUNNING else None,
+        }
+        if self.record:
+            record = dict(self.record)
+            if not include_transcript:
+                record.pop("transcript", None)
+                record.pop("segments", None)
+            data.update(record)
+        return data
+
+
+class JobService:
+    """
+    HTTP isteklerini işçi süreç havuzuna bağlar. İşler ortak görev kuyruğuna
+    yazılır; boşta kapasitesi olan işçi alır. İşçilerden gelen olaylar tek bir
+    thread'de işlerin durumuna uygulanır ve SSE abonelerine dağıtılır.
+    """
+
+    def __init__(self, workers=1, whisper_model="base", whisper_options=None, cache_dir=DEFAULT_CACHE_DIR,
+                 api_key=None, download_profile=DEFAULT_DOWNLOAD_PROFILE):
+        self.whisper_model = whisper_model
+        self.api_key = api_key
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._ready_workers = set()
+        context = multiprocessing.get_context("spawn") # torch ile fork güvenli değil
+        self._tasks = context.Queue()
+        self._events = context.Queue()
+        self._commands = [context.Queue() for _ in range(workers)]
+        options = {"whisper_model": whisper_model, "whisper_options": dict(whisper_options or {}),
+                   "cache_dir": cache_dir, "download_profile": download_profile}
+        # daemon=False: parçalı transkript modu işçinin içinde kendi süreç havuzunu açabilir
+        self._processes = [context.Process(target=_worker_main, name=f"ozetle-worker-{i}",
+                                           args=(i, self._tasks, self._commands[i], self._events, options))
+                           for i in range(workers)]
+        for process in self._processes:
+            process.start()
+        threading.Thread(target=self._pump_events, name="job-events", daemon=True).start()
+
+    # --- İş yönetimi ---
+    def submit(self, request):
+        """İşi kuyruğa ekler. Dönüş: (ServerJob, hata)"""
+        url = (request.get("url") or "").strip()
+        if not url:
+            return None, "'url' alanı gerekli."
+        caption_policy = request.get("caption_policy") or CAPTION_POLICY_PREFER
+        if caption_policy not in CAPTION_POLICIES:
+            return None, f"Geçersiz caption_policy: {caption_policy}"
+        api_key = request.get("api_key") or self.api_key
+        if not api_key:
+            return None, "Gemini API anahtarı gerekli ('api_key' alanı veya sunucunun --api-key ayarı)."
+        with self._lock:
+            job = ServerJob(next(self._ids), {"url": url})
+            self._jobs[job.id] = job
+        self._tasks.put({"id": job.id, "url": url, "api_key": api_key, "caption_policy": caption_policy,
+                         "whisper_model": request.get("whisper_model") or self.whisper_model,
+                         "stream_audio": bool(request.get("stream_audio"))})
+        self._publish(job, {"type": "job", "state": job.state, "stage": None, "waiting": False, "error": None})
+        return job, None
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        with self._lock:
+            job.cancel_requested = True
+            worker = job.worker
+        if worker is not None:
+            self._commands[worker].put(("cancel", job_id))
+        else:
+            # Henüz hiçbir işçi almadı: hemen iptal sayılır; alındığında işçiye iptal komutu gider
+            self._publish(job, {"type": "job", "state": JOB_CANCELLED, "stage": None, "waiting": False,
+                                "error": None}, state=JOB_CANCELLED)
+        return job
+
+    def health(self):
+        return {"workers": len(self._processes),
+                "alive": sum(1 for process in self._processes if process.is_alive()),
+                "ready": len(self._ready_workers),
+                "jobs": {state: sum(1 for job in self.jobs() if job.state == state)
+                         for state in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED)}}
+
+    # --- Olaylar ---
+    def subscribe(self, job):
+        """İşin olay kuyruğu; önce geçmiş olaylar, iş bittiyse sonunda None gelir."""
+        subscriber = queue.Queue()
+        with self._lock:
+            for event in job.history:
+                subscriber.put(event)
+            if job.finished:
+                subscriber.put(None)
+            else:
+                job.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, job, subscriber):
+        with self._lock:
+            if subscriber in job.subscribers:
+                job.subscribers.remove(subscriber)
+
+    def _publish(self, job, event, state=None):
+        with self._lock:
+            if state is not None:
+                job.state, job.stage, job.waiting = state, None, False
+            job.history.append(event)
+            for subscriber in job.subscribers:
+                subscriber.put(event)
+            if job.finished:
+                for subscriber in job.subscribers:
+                    subscriber.put(None) # Akışın sonu
+                job.subscribers.clear()
+
+    def _apply(self, job, event):
+        kind = event["type"]
+        if kind == "accepted":
+            with self._lock:
+                job.worker = event["worker"]
+                cancel = job.cancel_requested
+            if cancel:
+                self._commands[job.worker].put(("cancel", job.id))
+        elif kind == "job":
+            job.state, job.stage, job.waiting = event["state"], event["stage"], event["waiting"]
+            job.error = event["error"]
+        elif kind == "progress":
+            job.progress = {"fraction": event["fraction"], "eta_seconds": event.get("eta_seconds")}
+        elif kind == "span_start":
+            job.progress = None
+        elif kind == "status":
+            job.message = event["message"]
+        elif kind == "summary_chunk":
+            job.partial_summary += event["text"]
+        elif kind == "result":
+            job.record = event["record"]
+
+    def _pump_events(self):
+        while True:
+            try:
+                job_id, event = self._events.get()
+            except (EOFError, OSError):
+                break # Servis kapanıyor
+            if job_id is None:
+                if event["type"] == "worker_ready":
+                    self._ready_workers.add(event["worker"])
+                continue
+            job = self.get(job_id)
+            if job is None:
+                continue
+            if job.finished:
+                # Kabul edilmeden iptal edilen iş: işçiye iptal gönderilir, sonraki olayları yok sayılır
+                if event["type"] == "accepted":
+                    self._apply(job, event)
+                continue
+            self._apply(job, event)
+            self._publish(job, event)
+
+    def close(self, timeout=5):
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+
+# --- HTTP ---
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ozetle"
+
+    def log_message(self, format, *args):
+        logging.debug(f"HTTP {self.address_string()} {format % args}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _route(self):
+        path = urlparse(self.path).path.rstrip("/")
+        match = _JOB_PATH_RE.match(path)
+        if not match:
+            return path, None, None
+        return path, self.server.service.get(int(match.group("id"))), match.group("action")
+
+    def do_GET(self):
+        service = self.server.service
+        path, job, action = self._route()
+        if path == "/health":
+            self._send_json(200, service.health())
+        elif path == "/jobs":
+            self._send_json(200, {"jobs": [job.to_dict() for job in service.jobs()]})
+        elif job is None:
+            self._send_json(404, {"error": f"Bulunamadı: {path}"})
+        elif action == "/events":
+            self._stream_events(job)
+        elif action is None:
+            query = parse_qs(urlparse(self.path).query)
+            self._send_json(200, job.to_dict(include_transcript=query.get("transcript") == ["1"]))
+        else:
+            self._send_json(405, {"error": "Yalnızca POST desteklenir."})
+
+    def do_POST(self):
+        service = self.server.service
+        path, job, action = self._route()
+        if path == "/jobs":
+            request = self._read_json()
+            if request is None:
+                self._send_json(400, {"error": "Geçersiz JSON gövdesi."})
+                return
+            job, error = service.submit(request)
+            if error:
+                self._send_json(400, {"error": error})
+            else:
+                self._send_json(202, job.to_dict())
+        elif job is not None and action == "/cancel":
+            self._send_json(202, service.cancel(job.id).to_dict())
+        else:
+            self._send_json(404, {"error": f"Bulunamadı: {path}"})
+
+    def _stream_events(self, job):
+        """İşin olaylarını server-sent events olarak akıtır; iş bitince bağlantı kapanır."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        subscriber = self.server.service.subscribe(job)
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    break
+                data = json.dumps(event, ensure_ascii=False)
+                self.wfile.write(f"event: {event['type']}\ndata: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass # İstemci ayrıldı
+        finally:
+            self.server.service.unsubscribe(job, subscriber)
+
+
+class OzetleServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, _Handler)
+        self.service = service
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Özetle HTTP servisi (kalıcı Whisper işçileri ve iş API'si)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=default_whisper_slots(),
+                        help="Whisper modelini bellekte tutan işçi süreci sayısı")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"),
+                        help="İstekte 'api_key' verilmezse kullanılacak Gemini API anahtarı")
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--whisper-mode", choices=("sequential", "batched", "chunked", "long"), default="batched",
+                        help="batched/sequential: model işçide yüklü kalır; chunked her işte ayrı süreçler açar")
+    parser.add_argument("--whisper-batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--whisper-engine", choices=list(ENGINE_PRESETS), default=DEFAULT_ENGINE)
+    parser.add_argument("--whisper-threads", type=int, default=None,
+                        help="İşçi başına torch thread sayısı (varsayılan: çekirdek / işçi)")
+    parser.add_argument("--vad", action="store_true")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--download-profile", choices=DOWNLOAD_PROFILES, default=DEFAULT_DOWNLOAD_PROFILE)
+    parser.add_argument("--fake-gemini", action="store_true",
+                        help="Gemini yerine yerel sahte sunucuyu kullan (benchmarks/fake_gemini.py; test için)")
+    args = parser.parse_args(argv)
+
+    if args.fake_gemini:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+        from fake_gemini import start_fake_gemini
+        fake = start_fake_gemini()
+        # Ortam değişkeni işçi süreçleri başlatılmadan önce ayarlanır (spawn ile aktarılır)
+        os.environ[GEMINI_ENDPOINT_ENV] = fake.url
+        args.api_key = args.api_key or "yerel-test-anahtari"
+        logging.info(f"Sahte Gemini sunucusu: {fake.url}")
+
+    whisper_options = {"mode": args.whisper_mode, "batch_size": args.whisper_batch_size,
+                       "engine": args.whisper_engine, "vad": args.vad,
+                       "threads": args.whisper_threads or max(1, (os.cpu_count() or 1) // max(1, args.workers))}
+    service = JobService(workers=max(1, args.workers), whisper_model=args.whisper_model,
+                         whisper_options=whisper_options, cache_dir=args.cache_dir, api_key=args.api_key,
+                         download_profile=args.download_profile)
+    server = OzetleServer((args.host, args.port), service)
+    logging.info(f"Özetle servisi: {server.url} ({args.workers} işçi, model: {args.whisper_model})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
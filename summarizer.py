@@ -1,97 +1,843 @@
 # summarizer.py
-import google.generativeai as genai
 import logging
 import os
+import re
+import time
+import random
+import asyncio
+import threading
+import contextlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# numpy ve google.generativeai kullanan fonksiyonlarda içe aktarılır (arayüz açılışı)
+from metrics import metrics
 
 # Logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Fonksiyon imzasına 'detected_language' parametresini ekleyin
-def summarize_text(text_to_summarize, api_key, detected_language):
+# Kullanılacak model (Hata alırsanız 'gemini-1.0-pro' deneyin)
+GEMINI_MODEL = 'gemini-2.0-flash'
+# Prompt metni değiştiğinde artırılmalı; önbellekteki eski özetler geçersiz olur
+PROMPT_VERSION = 2
+
+def summary_cache_params(transcript_params, compress_tokens=None):
     """
-    Verilen metni (kaynak dili belirtilerek) Google Gemini API kullanarak
-    Türkçe olarak özetler.
+    Özet önbelleği anahtarı: Gemini modeli, prompt sürümü ve transkriptin kaynağı.
+    Yerel ön sıkıştırma açıksa token bütçesi de anahtara girer (Gemini'ye giden metni değiştirir).
+    """
+    params = {"model": GEMINI_MODEL, "prompt_version": PROMPT_VERSION, "transcript": transcript_params}
+    if compress_tokens:
+        params["compress_tokens"] = compress_tokens
+    return params
+
+# gemini-2.0-flash liste fiyatı (USD / 1M token); maliyet ölçümü için
+GEMINI_PRICE_PER_MILLION_TOKENS = {"input": 0.10, "output": 0.40}
+
+def estimate_cost(prompt_tokens, response_tokens):
+    """Token sayılarından tahmini istek maliyeti (USD)."""
+    return (prompt_tokens * GEMINI_PRICE_PER_MILLION_TOKENS["input"]
+            + response_tokens * GEMINI_PRICE_PER_MILLION_TOKENS["output"]) / 1e6
+
+# Gemini uç noktası bu ortam değişkeniyle değiştirilebilir (örn. yerel sahte sunucu:
+# http://127.0.0.1:8765). Boşsa Google'ın varsayılan uç noktası kullanılır.
+GEMINI_ENDPOINT_ENV = "GEMINI_API_ENDPOINT"
+
+def _configure_options(api_key, endpoint=None):
+    """genai yapılandırma ayarları; özel uç noktalar (http dahil) yalnızca REST taşıması ile desteklenir."""
+    if endpoint:
+        return {"api_key": api_key, "transport": "rest", "client_options": {"api_endpoint": endpoint}}
+    return {"api_key": api_key}
+
+def _client_manager(api_key, endpoint=None):
+    """
+    API anahtarına (ve varsa özel uç noktaya) bağlı genai bağlantı yöneticisi;
+    farklı anahtarlı istemciler aynı anda çalışabilsin diye her istemci kendi
+    bağlantılarını kurar. Bu genai'nin iç API'sidir (_ClientManager): SDK
+    sürümünde yoksa None döner ve istemci genai.configure yoluna düşer.
+    """
+    try:
+        from google.generativeai.client import _ClientManager
+        manager = _ClientManager()
+        manager.configure(**_configure_options(api_key, endpoint))
+    except (ImportError, AttributeError, TypeError):
+        return None
+    return manager if hasattr(manager, "make_client") else None
+
+
+class _SharedConfiguration:
+    """
+    genai.configure ile süreç genelinde tek anahtar (genai iç API'si yoksa
+    kullanılır). Aynı anahtarlı istekler birlikte yürür; başka bir anahtara
+    geçiş, önceki anahtarın açık istekleri bitene kadar bekler.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._active = None # (API anahtarı, uç nokta)
+        self._in_flight = 0
+
+    @contextlib.contextmanager
+    def model(self, api_key, endpoint, model_name):
+        """Etkin yapılandırmayla yeni bir model; blok bitene kadar anahtar değiştirilmez."""
+        import google.generativeai as genai
+        key = (api_key, endpoint)
+        with self._condition:
+            while self._active != key and self._in_flight:
+                self._condition.wait()
+            if self._active != key:
+                genai.configure(**_configure_options(api_key, endpoint))
+                self._active = key
+            self._in_flight += 1
+        try:
+            # Model bağlantısını ilk istekte varsayılan yapılandırmadan alır; bu yüzden her blokta yenisi
+            yield genai.GenerativeModel(model_name)
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+_shared_configuration = _SharedConfiguration()
+
+# Map-reduce özetleme eşikleri (token, tiktoken ile ölçülür)
+MAP_REDUCE_THRESHOLD_TOKENS = 12000 # Bunun altındaki metinler tek istekte özetlenir
+CHUNK_TOKENS = 4000 # Map aşamasında her parçanın en fazla token sayısı
+REDUCE_INPUT_TOKENS = 8000 # Bir reduce isteğine girebilecek ara özetlerin toplam token sayısı
+MAX_CONCURRENT_REQUESTS = 4 # Aynı anda en fazla kaç Gemini isteği açık olabilir
+
+# Cümle sonu: . ! ? … (ardından boşluk) veya satır sonu
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?…])\s+|\n+')
+
+# Kaynak dil kodu -> Türkçe dil adı
+SOURCE_LANG_NAME_MAP = {
+    'en': 'İngilizce',
+    'tr': 'Türkçe',
+    'de': 'Almanca',
+    'fr': 'Fransızca',
+    'es': 'İspanyolca',
+    # Diğer yaygın dilleri ekleyebilirsiniz
+}
+
+_encoding = None
+
+def _get_encoding():
+    """tiktoken kodlayıcısını bir kez yükler; yüklenemezse (örn. çevrimdışı) None döner."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logging.warning(f"tiktoken yüklenemedi, token sayısı yaklaşık hesaplanacak: {e}")
+            _encoding = False
+    return _encoding or None
+
+def count_tokens(text):
     """
+    Metnin yaklaşık token sayısı. Gemini'nin kendi tokenizer'ı yerel olarak
+    bulunmadığından cl100k_base kullanılır (eşik kontrolü için yeterince yakın).
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+def split_into_chunks(text, max_tokens=CHUNK_TOKENS):
+    """
+    Metni cümle sınırlarından bölerek her biri en fazla max_tokens token olan
+    parçalara ayırır. Tek başına sınırı aşan çok uzun cümleler kelime
+    sınırlarından bölünür (Whisper bazen noktalama koymaz).
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(" ".join(current))
+        current, current_tokens = [], 0
+
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        tokens = count_tokens(sentence)
+        if tokens > max_tokens:
+            flush()
+            words = sentence.split()
+            # Kelime başına ortalama token sayısına göre yaklaşık eşit dilimler
+            per_piece = max(1, int(len(words) * max_tokens / tokens))
+            for i in range(0, len(words), per_piece):
+                chunks.append(" ".join(words[i:i + per_piece]))
+            continue
+        if current_tokens + tokens > max_tokens:
+            flush()
+        current.append(sentence)
+        current_tokens += tokens
+    flush()
+    return chunks
+
+# Yerel çıkarımsal (extractive) ön sıkıştırma: TF-IDF cümle vektörleri üzerinde TextRank
+EXTRACTIVE_DAMPING = 0.85 # PageRank sönümleme katsayısı
+EXTRACTIVE_MAX_ITERATIONS = 50
+EXTRACTIVE_TOLERANCE = 1e-6
+EXTRACTIVE_SENTENCE_TOKENS = 80 # Noktalamasız uzun bölümler bu uzunlukta cümlelere bölünür
+EXTRACTIVE_MIN_WORDS = 4 # Daha kısa cümleler ("evet.", "tamam, şey.") seçilmez
+EXTRACTIVE_DUPLICATE_SIMILARITY = 0.8 # Seçilmiş bir cümleye bundan benzer cümleler tekrar sayılır
+
+_WORD_RE = re.compile(r'\w+')
+
+def _split_sentences(text, max_tokens=EXTRACTIVE_SENTENCE_TOKENS):
+    """Metni cümlelere ayırır; çok uzun cümleleri kelime sınırlarından böler. Dönüş: (cümleler, token sayıları)"""
+    import numpy as np
+    sentences, tokens = [], []
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        count = count_tokens(sentence)
+        if count > max_tokens:
+            words = sentence.split()
+            per_piece = max(1, int(len(words) * max_tokens / count))
+            for i in range(0, len(words), per_piece):
+                piece = " ".join(words[i:i + per_piece])
+                sentences.append(piece)
+                tokens.append(count_tokens(piece))
+            continue
+        sentences.append(sentence)
+        tokens.append(count)
+    return sentences, np.array(tokens, dtype=np.int64)
+
+def _tfidf(sentences):
+    """
+    Cümle-terim TF-IDF matrisi seyrek (satır, sütun, değer) dizileri olarak;
+    her satır birim uzunluğa normalize edilir (iç çarpım = kosinüs benzerliği).
+    """
+    import numpy as np
+    vocabulary = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for word in _WORD_RE.findall(sentence.lower()):
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+    n, v = len(sentences), max(1, len(vocabulary))
+    pairs, tf = np.unique(np.array(rows, dtype=np.int64) * v + np.array(cols, dtype=np.int64), return_counts=True)
+    rows, cols = pairs // v, pairs % v
+    df = np.bincount(cols, minlength=v)
+    idf = np.log((1 + n) / (1 + df)) + 1
+    values = (1 + np.log(tf)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n))
+    values /= np.where(norms > 0, norms, 1)[rows]
+    return rows, cols, values, v
+
+def _textrank(rows, cols, values, n, v):
+    """
+    Kosinüs benzerlik grafiğinde PageRank. Benzerlik matrisi (n x n) hiç
+    kurulmaz: S·x = X(Xᵀx) seyrek çarpımlarla hesaplanır, bellek O(kelime sayısı) kalır.
+    """
+    import numpy as np
+    self_similarity = np.bincount(rows, weights=values ** 2, minlength=n)
+
+    def similarity_dot(x):
+        projected = np.bincount(cols, weights=values * x[rows], minlength=v)
+        return np.bincount(rows, weights=values * projected[cols], minlength=n) - self_similarity * x
+
+    degree = similarity_dot(np.ones(n))
+    degree[degree <= 0] = 1.0
+    scores = np.full(n, 1.0 / n)
+    for _ in range(EXTRACTIVE_MAX_ITERATIONS):
+        updated = (1 - EXTRACTIVE_DAMPING) / n + EXTRACTIVE_DAMPING * similarity_dot(scores / degree)
+        converged = np.abs(updated - scores).sum() < EXTRACTIVE_TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+def compress_transcript(text, token_budget):
+    """
+    Transkripti Gemini'ye gönderilmeden önce yerelde token_budget tokena
+    indirir: cümleler TextRank ile puanlanır, en önemlilerden başlanarak bütçe
+    dolana kadar seçilir; çok kısa (dolgu) cümleler ve seçilmiş bir cümlenin
+    neredeyse aynısı olan tekrarlar atlanır. Seçilen cümleler orijinal
+    sırasıyla birleştirilir. Metin zaten bütçe içindeyse değiştirilmez.
+    Dönüş: (metin, istatistikler)
+    """
+    import numpy as np
+    started = time.perf_counter()
+    input_tokens = count_tokens(text)
+    stats = {"input_tokens": input_tokens, "output_tokens": input_tokens, "sentences": None,
+             "kept_sentences": None, "seconds": 0.0}
+    if not token_budget or input_tokens <= token_budget:
+        return text, stats
+
+    sentences, tokens = _split_sentences(text)
+    n = len(sentences)
+    rows, cols, values, v = _tfidf(sentences)
+    scores = _textrank(rows, cols, values, n, v)
+    word_counts = np.bincount(rows, minlength=n) # Farklı kelime sayısı
+    starts = np.searchsorted(rows, np.arange(n + 1))
+
+    selected = np.zeros(n, dtype=bool)
+    max_similarity = np.zeros(n) # Her cümlenin seçilmiş cümlelere en yüksek benzerliği
+    used = 0
+    for i in np.argsort(-scores, kind="stable"):
+        if word_counts[i] < EXTRACTIVE_MIN_WORDS or used + tokens[i] > token_budget:
+            continue
+        if max_similarity[i] >= EXTRACTIVE_DUPLICATE_SIMILARITY:
+            continue
+        selected[i] = True
+        used += tokens[i]
+        # Seçilen cümlenin tüm cümlelere benzerliği (tek seyrek çarpım)
+        vector = np.zeros(v)
+        vector[cols[starts[i]:starts[i + 1]]] = values[starts[i]:starts[i + 1]]
+        np.maximum(max_similarity, np.bincount(rows, weights=values * vector[cols], minlength=n),
+                   out=max_similarity)
+
+    compressed = " ".join(sentences[i] for i in np.flatnonzero(selected))
+    stats.update(output_tokens=count_tokens(compressed), sentences=n, kept_sentences=int(selected.sum()),
+                 seconds=round(time.perf_counter() - started, 3))
+    metrics.observe("extractive_input_tokens", input_tokens)
+    metrics.observe("extractive_output_tokens", stats["output_tokens"])
+    metrics.observe("extractive_seconds", stats["seconds"])
+    logging.info(f"Yerel ön sıkıştırma: {input_tokens} -> {stats['output_tokens']} token "
+                 f"(%{100 * (1 - stats['output_tokens'] / input_tokens):.0f} azalma), "
+                 f"{stats['kept_sentences']}/{n} cümle, {stats['seconds']:.2f} sn.")
+    return compressed, stats
+
+def _single_prompt(text, source_lang_display):
+    """Kısa metinler için tek istekte özet prompt'u."""
+    return (
+        f"Lütfen aşağıdaki '{source_lang_display}' dilindeki metni alıp, "
+        f"bu metnin ana fikirlerini içeren anlaşılır bir paragraf olarak **Türkçe** dilinde özetle:\n\n"
+        f"--- Kaynak Metin ({source_lang_display}) ---\n"
+        f"{text}\n"
+        f"--- Bitti ---\n\n"
+        f"**Türkçe Özet:**"
+    )
+
+def _map_prompt(chunk, source_lang_display, index, total):
+    """Map aşaması: uzun metnin bir bölümünü ayrıntıları koruyarak özetler."""
+    return (
+        f"Aşağıdaki metin, '{source_lang_display}' dilindeki uzun bir video transkriptinin "
+        f"{index}/{total} numaralı bölümüdür. Bu bölümdeki önemli fikirleri, isimleri, sayıları "
+        f"ve sonuçları kaybetmeden **Türkçe** olarak kısa maddeler halinde özetle:\n\n"
+        f"--- Bölüm {index}/{total} ({source_lang_display}) ---\n"
+        f"{chunk}\n"
+        f"--- Bitti ---\n\n"
+        f"**Türkçe Bölüm Özeti:**"
+    )
+
+def _reduce_prompt(partial_summaries, final):
+    """Reduce aşaması: bölüm özetlerini sırayla birleştirir."""
+    joined = "\n\n".join(f"[Bölüm {i}]\n{part}" for i, part in enumerate(partial_summaries, 1))
+    if final:
+        instruction = ("Aşağıda uzun bir videonun bölüm bölüm çıkarılmış Türkçe özetleri var. "
+                       "Bunları videonun akışını koruyarak, ana fikirleri içeren anlaşılır ve "
+                       "bütünlüklü bir **Türkçe** özet halinde birleştir:")
+    else:
+        instruction = ("Aşağıdaki ardışık Türkçe bölüm özetlerini, önemli ayrıntıları koruyarak "
+                       "tek bir daha kısa **Türkçe** özet halinde birleştir:")
+    return f"{instruction}\n\n{joined}\n\n**Türkçe Özet:**"
+
+# Gemini istek kotası (tüm eşzamanlı işler tarafından paylaşılır). Varsayılanlar
+# gemini-2.0-flash ücretsiz katmanına göredir; ücretli katmanda ortam değişkenleriyle
+# (veya configure_rate_limits ile) yükseltilmelidir. 0: sınırsız.
+GEMINI_RPM_ENV = "GEMINI_RPM"
+GEMINI_TPM_ENV = "GEMINI_TPM"
+DEFAULT_REQUESTS_PER_MINUTE = 15
+DEFAULT_TOKENS_PER_MINUTE = 1000000
+RESPONSE_TOKEN_ESTIMATE = 1024 # Kota hesabında istek başına beklenen yanıt uzunluğu
+BURST_FRACTION = 0.1 # Kotanın beklemeden (ani yük olarak) kullanılabilecek kısmı
+
+# Geçici hatalarda (429/500/503, zaman aşımı) tekrar deneme
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+REQUEST_TIMEOUT_SECONDS = 300
+RETRYABLE_STATUS_CODES = (429, 500, 503)
+
+
+class TokenBucket:
+    """
+    Dakikalık kota için token kovası. Kova kapasitesi (ani yük payı) kotanın
+    BURST_FRACTION kadarıdır ve dolum hızı kalan kısma göre ayarlanır; böylece
+    herhangi bir 60 saniyelik pencerede kota hiçbir zaman aşılmaz. Ayırmalar borç
+    olarak düşülür; istekler sırayla, bekleme süreleri birikerek ilerler.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = max(1.0, per_minute * BURST_FRACTION)
+        self.rate = max(per_minute - self.capacity, 1.0) / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """amount kadar kota ayırır. Dönüş: kotanın kullanılabilmesi için beklenecek süre (sn)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Kovadan büyük istek de tam tutarıyla düşülür; bekleme kapasitenin dolum süresini aşabilir
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class RateLimiter:
+    """İstek/dakika ve token/dakika sınırlarını birlikte uygular (thread ve asyncio güvenli)."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests_per_minute = self.tokens_per_minute = None
+        self.configure(requests_per_minute, tokens_per_minute)
+
+    def configure(self, requests_per_minute=None, tokens_per_minute=None):
+        """Sınırları değiştirir; None verilen sınır korunur, 0 sınırı kaldırır."""
+        if requests_per_minute is not None:
+            self.requests_per_minute = requests_per_minute
+            self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        if tokens_per_minute is not None:
+            self.tokens_per_minute = tokens_per_minute
+            self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def reserve(self, tokens):
+        waits = [0.0]
+        if self._requests:
+            waits.append(self._requests.reserve(1))
+        if self._tokens:
+            waits.append(self._tokens.reserve(tokens))
+        wait = max(waits)
+        if wait > 0:
+            metrics.observe("gemini_rate_limit_wait_seconds", wait)
+        return wait
+
+    def acquire(self, tokens):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        logging.warning(f"{name} ortam değişkeni geçersiz, varsayılan kullanılıyor: {default}")
+        return default
+
+# Süreç genelinde paylaşılan kota
+rate_limiter = RateLimiter(_env_int(GEMINI_RPM_ENV, DEFAULT_REQUESTS_PER_MINUTE),
+                           _env_int(GEMINI_TPM_ENV, DEFAULT_TOKENS_PER_MINUTE))
+
+def configure_rate_limits(requests_per_minute=None, tokens_per_minute=None):
+    """Paylaşılan Gemini kotasını değiştirir (None: değişmez, 0: sınırsız)."""
+    rate_limiter.configure(requests_per_minute, tokens_per_minute)
+
+
+def _is_retryable(error):
+    """429/500/503 ve zaman aşımı hataları geçicidir; diğerleri (örn. geçersiz anahtar) değildir."""
+    from google.api_core import exceptions as core_exceptions
+    if isinstance(error, (core_exceptions.DeadlineExceeded, TimeoutError)):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+def _backoff_delay(attempt):
+    """Tam rastgele (full jitter) üstel bekleme: eşzamanlı işler aynı anda yeniden denemesin."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def _response_text(response):
+    """Yanıttan metni çıkarır ve kullanım ölçümlerini kaydeder. Dönüş: (metin, hata)"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        metrics.incr("gemini_prompt_tokens_total", usage.prompt_token_count or 0)
+        metrics.incr("gemini_response_tokens_total", usage.candidates_token_count or 0)
+        metrics.incr("gemini_cost_usd_total", estimate_cost(usage.prompt_token_count or 0,
+                                                            usage.candidates_token_count or 0))
+    # response.text yerine daha güvenli erişim
+    if response.parts:
+        return "".join(part.text for part in response.parts), None
+    # İçerik filtreleme veya başka bir sorun
+    feedback = response.prompt_feedback
+    return None, f"Gemini API'den geçerli bir özet alınamadı. Geri bildirim: {feedback}"
+
+
+class GeminiClient:
+    """
+    Yapılandırılmış Gemini modelini (ve bağlantısını) işler arasında yeniden
+    kullanan istemci. Her istek paylaşılan kotadan (rate_limiter) yer ayırır,
+    geçici hatalarda rastgele üstel beklemeyle yeniden denenir. generate()
+    thread'lerden, generate_async() asyncio'dan çağrılabilir.
+    """
+
+    def __init__(self, api_key, model_name=GEMINI_MODEL, limiter=None, max_retries=MAX_RETRIES):
+        import google.generativeai as genai # Ağır modül; arayüz açılışını yavaşlatmasın diye burada
+        self.api_key = api_key
+        self.model_name = model_name
+        self.endpoint = os.environ.get(GEMINI_ENDPOINT_ENV)
+        self._clients = _client_manager(api_key, self.endpoint)
+        self.model = genai.GenerativeModel(model_name)
+        if self._clients is not None and hasattr(self.model, "_client") and hasattr(self.model, "_async_client"):
+            # Model, süreç genelindeki varsayılan bağlantı yerine bu anahtarın bağlantısını kullanır;
+            # async bağlantı olay döngüsü içinde ilk kullanımda kurulur (generate_async)
+            self.model._client = self._clients.make_client("generative")
+        else:
+            logging.warning("genai iç bağlantı API'si bulunamadı; anahtarlar genai.configure ile sırayla kullanılacak.")
+            self._clients = None
+        self.limiter = limiter or rate_limiter
+        self.max_retries = max_retries
+        # REST taşımasında (özel uç nokta) genai'nin async istemcisi çalışmaz; thread'e devredilir.
+        # Paylaşılan yapılandırmanın beklemesi de olay döngüsünü bloke etmesin diye thread'de yürür.
+        self._rest = bool(self.endpoint) or self._clients is None
+        # genai'nin kendi yeniden denemesi kapatılır; deneme sayısı ve bekleme burada yönetilir
+        self._request_options = {"retry": None, "timeout": REQUEST_TIMEOUT_SECONDS}
+
+    def _model(self):
+        """İstek boyunca kullanılacak model (kendi bağlantısıyla veya paylaşılan yapılandırmayla)."""
+        if self._clients is not None:
+            return contextlib.nullcontext(self.model)
+        return _shared_configuration.model(self.api_key, self.endpoint, self.model_name)
+
+    def _on_error(self, error, attempt, retry_allowed=True):
+        """Hata sonrası bekleme süresi; yeniden denenmeyecekse None."""
+        if not retry_allowed or attempt >= self.max_retries or not _is_retryable(error):
+            metrics.incr("gemini_requests_total", status="error")
+            return None
+        delay = _backoff_delay(attempt)
+        metrics.incr("gemini_retries_total", reason=getattr(error, "code", None) or type(error).__name__)
+        logging.warning(f"Gemini geçici hatası ({error}); {delay:.1f} sn sonra yeniden denenecek "
+                        f"({attempt + 1}/{self.max_retries}).")
+        return delay
+
+    def _on_success(self, started, response, streamed_text=None):
+        metrics.observe("gemini_latency_seconds", time.perf_counter() - started)
+        metrics.incr("gemini_requests_total", status="ok")
+        text, error = _response_text(response)
+        if streamed_text:
+            return streamed_text, None
+        return text, error
+
+    def generate(self, prompt, on_chunk=None):
+        """
+        Tek bir istek (gerekirse yeniden denenerek). Dönüş: (metin, hata); kalıcı
+        hatalar fırlatılır. on_chunk verilirse yanıt akış olarak istenir ve her
+        metin parçası geldikçe on_chunk(parça) çağrılır. İlk parça iletildikten
+        sonra oluşan hatalar, parçalar tekrarlanmasın diye yeniden denenmez.
+        """
+        logging.debug(f"Gemini API'ye gönderilecek Prompt (ilk 200 karakter):\n{prompt[:200]}...")
+        tokens = count_tokens(prompt) + RESPONSE_TOKEN_ESTIMATE
+        attempt = 0
+        while True:
+            self.limiter.acquire(tokens)
+            started = time.perf_counter()
+            stream = _StreamCollector(on_chunk, started) if on_chunk else None
+            try:
+                with self._model() as model:
+                    response = model.generate_content(prompt, stream=bool(stream),
+                                                      request_options=self._request_options)
+                    if stream:
+                        for chunk in response:
+                            stream.add(chunk)
+            except Exception as e:
+                delay = self._on_error(e, attempt, retry_allowed=not (stream and stream.emitted))
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            return self._on_success(started, response, stream.text if stream else None)
+
+    async def generate_async(self, prompt, on_chunk=None):
+        """generate() ile aynı sözleşme; olay döngüsünü bloke etmez."""
+        if self._rest:
+            return await asyncio.to_thread(self.generate, prompt, on_chunk)
+        if self.model._async_client is None:
+            self.model._async_client = self._clients.make_client("generative_async")
+        tokens = count_tokens(prompt) + RESPONSE_TOKEN_ESTIMATE
+        attempt = 0
+        while True:
+            await self.limiter.acquire_async(tokens)
+            started = time.perf_counter()
+            stream = _StreamCollector(on_chunk, started) if on_chunk else None
+            try:
+                response = await self.model.generate_content_async(prompt, stream=bool(stream),
+                                                                   request_options=self._request_options)
+                if stream:
+                    async for chunk in response:
+                        stream.add(chunk)
+            except Exception as e:
+                delay = self._on_error(e, attempt, retry_allowed=not (stream and stream.emitted))
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            return self._on_success(started, response, stream.text if stream else None)
+
+
+class _StreamCollector:
+    """Akışlı yanıtın parçalarını biriktirir, on_chunk'a iletir ve ilk token süresini ölçer."""
+
+    def __init__(self, on_chunk, started):
+        self.on_chunk = on_chunk
+        self.started = started
+        self.parts = []
+
+    @property
+    def emitted(self):
+        return bool(self.parts)
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def add(self, chunk):
+        text = "".join(part.text for part in chunk.parts) if chunk.parts else ""
+        if not text:
+            return
+        if not self.parts:
+            metrics.observe("gemini_first_token_seconds", time.perf_counter() - self.started)
+        self.parts.append(text)
+        self.on_chunk(text)
+
+
+_clients = {} # (API anahtarı, uç nokta) -> GeminiClient
+_clients_lock = threading.Lock()
+
+def get_client(api_key):
+    """
+    API anahtarı (ve uç nokta) başına paylaşılan istemciyi döndürür. Her istemci
+    kendi anahtarıyla kurulmuş bağlantıyı kullandığından farklı anahtarlı işler
+    aynı anda çalışabilir; kota (rate_limiter) yine ortaktır.
+    """
+    key = (api_key, os.environ.get(GEMINI_ENDPOINT_ENV))
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = GeminiClient(api_key)
+        return _clients[key]
+
+def _generate_all(client, prompts, max_concurrency):
+    """
+    Prompt'ları en fazla max_concurrency eşzamanlı istekle gönderir;
+    sonuçları prompt sırasıyla döndürür. Herhangi biri başarısızsa hata döner.
+    Tamamlanan istekler çağıran thread'deki açık span'e ilerleme olarak bildirilir.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        # Her istek çağıranın ölçüm bağlamının (video/aşama etiketleri) kopyasında çalışır
+        futures = [pool.submit(contextvars.copy_context().run, client.generate, prompt) for prompt in prompts]
+        for done, _ in enumerate(as_completed(futures), start=1):
+            metrics.progress(done / len(futures), requests_done=done, requests_total=len(futures))
+        results = [future.result() for future in futures]
+    for text, error in results:
+        if error:
+            return None, error
+    return [text for text, _ in results], None
+
+async def _generate_all_async(client, prompts, max_concurrency):
+    """_generate_all'ın asyncio karşılığı (eşzamanlılık bir semaforla sınırlanır)."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(prompt):
+        async with semaphore:
+            return await client.generate_async(prompt)
+
+    tasks = [asyncio.ensure_future(run(prompt)) for prompt in prompts]
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        await task
+        metrics.progress(done / len(tasks), requests_done=done, requests_total=len(tasks))
+    results = [task.result() for task in tasks]
+    for text, error in results:
+        if error:
+            return None, error
+    return [text for text, _ in results], None
+
+def _group_partials(partials, reduce_input_tokens):
+    """Ara özetleri, her grup reduce_input_tokens sınırına sığacak şekilde sırayla gruplar."""
+    groups = [[]]
+    group_tokens = 0
+    for part in partials:
+        tokens = count_tokens(part)
+        if groups[-1] and group_tokens + tokens > reduce_input_tokens:
+            groups.append([])
+            group_tokens = 0
+        groups[-1].append(part)
+        group_tokens += tokens
+    return groups
+
+def _map_reduce(client, text, source_lang_display, chunk_tokens, reduce_input_tokens, max_concurrency,
+                on_chunk=None):
+    """
+    Uzun metni parçalara böler, parça özetlerini eşzamanlı ister (map) ve
+    ara özetleri gerekirse birden çok turda birleştirerek (reduce) tek özete indirir.
+    on_chunk verilirse yalnızca son birleştirme isteği akış olarak iletilir.
+    """
+    chunks = split_into_chunks(text, chunk_tokens)
+    logging.info(f"Map-reduce özetleme: {len(chunks)} parça, en fazla {max_concurrency} eşzamanlı istek.")
+    prompts = [_map_prompt(chunk, source_lang_display, i, len(chunks)) for i, chunk in enumerate(chunks, 1)]
+    partials, error = _generate_all(client, prompts, max_concurrency)
+    if error:
+        return None, error
+
+    round_no = 1
+    while True:
+        groups = _group_partials(partials, reduce_input_tokens)
+        logging.info(f"Reduce turu {round_no}: {len(partials)} ara özet -> {len(groups)} grup.")
+        if len(groups) == 1:
+            return client.generate(_reduce_prompt(groups[0], True), on_chunk=on_chunk)
+        merged, error = _generate_all(client, [_reduce_prompt(group, False) for group in groups], max_concurrency)
+        if error:
+            return None, error
+        if len(merged) >= len(partials):
+            # Birleştirme ilerlemiyorsa (her grup tek özet) son turu zorla
+            return client.generate(_reduce_prompt(merged, True), on_chunk=on_chunk)
+        partials = merged
+        round_no += 1
+
+async def _map_reduce_async(client, text, source_lang_display, chunk_tokens, reduce_input_tokens, max_concurrency,
+                            on_chunk=None):
+    """_map_reduce'un asyncio karşılığı."""
+    chunks = split_into_chunks(text, chunk_tokens)
+    logging.info(f"Map-reduce özetleme (async): {len(chunks)} parça, en fazla {max_concurrency} eşzamanlı istek.")
+    prompts = [_map_prompt(chunk, source_lang_display, i, len(chunks)) for i, chunk in enumerate(chunks, 1)]
+    partials, error = await _generate_all_async(client, prompts, max_concurrency)
+    if error:
+        return None, error
+
+    while True:
+        groups = _group_partials(partials, reduce_input_tokens)
+        if len(groups) == 1:
+            return await client.generate_async(_reduce_prompt(groups[0], True), on_chunk=on_chunk)
+        merged, error = await _generate_all_async(client, [_reduce_prompt(group, False) for group in groups],
+                                                  max_concurrency)
+        if error:
+            return None, error
+        if len(merged) >= len(partials):
+            return await client.generate_async(_reduce_prompt(merged, True), on_chunk=on_chunk)
+        partials = merged
+
+def _check_inputs(text_to_summarize, api_key, detected_language):
+    """Özetleme girdilerini doğrular. Dönüş: hata mesajı veya None."""
     if not api_key:
         error_msg = "Gemini API anahtarı girilmedi."
         logging.error(error_msg)
-        return None, error_msg
+        return error_msg
     if not text_to_summarize:
         error_msg = "Özetlenecek metin boş."
         logging.warning(error_msg)
-        return None, error_msg
+        return error_msg
     if not detected_language:
         # Eğer dil algılanamazsa varsayılan olarak İngilizce kabul edilebilir veya hata verilebilir.
         # Şimdilik bir uyarı verip devam edelim, prompt'ta belirtmeyiz.
         logging.warning("Kaynak dil algılanamadı, prompt buna göre ayarlanacak.")
         # Alternatif: error_msg = "Kaynak dil belirtilmedi."; return None, error_msg
+    return None
+
+def _api_error_message(e):
+    """Gemini istisnasını kullanıcıya gösterilecek mesaja çevirir."""
+    error_message = f"Gemini API Hatası: {e}"
+    logging.error(error_message, exc_info=True)
+    # Önceki 404 hatası için spesifik kontrol
+    if "404" in str(e) and "models/" in str(e):
+         error_message = (f"Gemini API Hatası: Belirtilen model ('{GEMINI_MODEL}') bulunamadı veya "
+                          f"API anahtarınızla kullanılamıyor. Lütfen Google Cloud Console'da "
+                          f"'Generative Language API'nin etkin olduğundan ve doğru modeli "
+                          f"kullandığınızdan emin olun.\n\nOrijinal Hata: {e}")
+    elif "API key not valid" in str(e):
+        error_message = "Girilen Gemini API anahtarı geçersiz veya gerekli API (Generative Language API) etkin değil. Lütfen kontrol edin."
+    return error_message
+
+# Fonksiyon imzasına 'detected_language' parametresini ekleyin
+def summarize_text(text_to_summarize, api_key, detected_language,
+                   map_reduce_threshold_tokens=MAP_REDUCE_THRESHOLD_TOKENS, chunk_tokens=CHUNK_TOKENS,
+                   reduce_input_tokens=REDUCE_INPUT_TOKENS, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                   on_chunk=None, compress_tokens=None, on_compressed=None):
+    """
+    Verilen metni (kaynak dili belirtilerek) Google Gemini API kullanarak
+    Türkçe olarak özetler. map_reduce_threshold_tokens değerini aşan metinler
+    parçalara bölünüp eşzamanlı özetlenir ve ardından tek özette birleştirilir;
+    kısa metinler tek istekle özetlenir. İstekler paylaşılan istemci (get_client)
+    üzerinden, ortak kota ve yeniden deneme ile gönderilir. on_chunk(parça)
+    verilirse nihai özet üretilirken gelen metin parçaları anında iletilir
+    (dönüş değeri yine tam özettir). compress_tokens verilirse metin önce
+    yerelde bu token bütçesine sıkıştırılır (compress_transcript);
+    on_compressed(istatistikler) verilirse sıkıştırma istatistikleri iletilir.
+    """
+    error_message = _check_inputs(text_to_summarize, api_key, detected_language)
+    if error_message:
+        return None, error_message
 
     summary = None
-    error_message = None
 
     try:
         # Log mesajına kaynak dili ekle
         logging.info(f"Gemini API ile özetleme işlemi başlatılıyor... (Kaynak Dil: {detected_language or 'Bilinmiyor'})")
-        genai.configure(api_key=api_key)
-
-        # Kullanılacak model (Hata alırsanız 'gemini-1.0-pro' deneyin)
-        # Önceki hatayı gidermek için bunu kullanabilirsiniz:
-        model_name = 'gemini-2.0-flash'
-        # model_name = 'gemini-pro' # Veya bu
-        model = genai.GenerativeModel(model_name)
-        logging.info(f"Kullanılan Gemini Modeli: {model_name}")
-
-        # --- Dinamik Prompt Oluşturma ---
-        # Kaynak dili İngilizce ise prompt'u buna göre ayarla
-        # Diğer diller için de benzer bir mantık kurulabilir
-        source_lang_name_map = {
-            'en': 'İngilizce',
-            'tr': 'Türkçe',
-            'de': 'Almanca',
-            'fr': 'Fransızca',
-            'es': 'İspanyolca',
-            # Diğer yaygın dilleri ekleyebilirsiniz
-        }
-        # Algılanan dil kodunu okunabilir isme çevir, yoksa kodu kullan
-        source_lang_display = source_lang_name_map.get(detected_language, detected_language)
-
-        # Prompt'u oluştururken kaynak dili belirt
-        prompt = (
-            f"Lütfen aşağıdaki '{source_lang_display}' dilindeki metni alıp, "
-            f"bu metnin ana fikirlerini içeren anlaşılır bir paragraf olarak **Türkçe** dilinde özetle:\n\n"
-            f"--- Kaynak Metin ({source_lang_display}) ---\n"
-            f"{text_to_summarize}\n"
-            f"--- Bitti ---\n\n"
-            f"**Türkçe Özet:**"
-        )
-        # ---------------------------------
+        client = get_client(api_key)
+        logging.info(f"Kullanılan Gemini Modeli: {client.model_name}")
 
-        logging.debug(f"Gemini API'ye gönderilecek Prompt (ilk 200 karakter):\n{prompt[:200]}...")
+        # Algılanan dil kodunu okunabilir isme çevir, yoksa kodu kullan
+        source_lang_display = SOURCE_LANG_NAME_MAP.get(detected_language, detected_language)
+        if compress_tokens:
+            text_to_summarize, compression = compress_transcript(text_to_summarize, compress_tokens)
+            if on_compressed:
+                on_compressed(compression)
 
-        response = model.generate_content(prompt)
+        token_count = count_tokens(text_to_summarize)
+        if token_count <= map_reduce_threshold_tokens:
+            # Hızlı yol: tek istek
+            summary, error_message = client.generate(_single_prompt(text_to_summarize, source_lang_display),
+                                                     on_chunk=on_chunk)
+        else:
+            logging.info(f"Metin {token_count} token; map-reduce özetleme kullanılacak.")
+            summary, error_message = _map_reduce(client, text_to_summarize, source_lang_display,
+                                                 chunk_tokens, reduce_input_tokens, max_concurrency,
+                                                 on_chunk=on_chunk)
 
-        # response.text yerine daha güvenli erişim
-        if response.parts:
-             summary = "".join(part.text for part in response.parts)
-             logging.info("Özetleme başarıyla tamamlandı.")
+        if summary:
+            logging.info("Özetleme başarıyla tamamlandı.")
         else:
-             # İçerik filtreleme veya başka bir sorun
-             feedback = response.prompt_feedback
-             error_message = f"Gemini API'den geçerli bir özet alınamadı. Geri bildirim: {feedback}"
-             logging.warning(error_message)
-             summary = None # Hata olarak işaretle
+            logging.warning(error_message)
+            summary = None # Hata olarak işaretle
 
     except Exception as e:
-        error_message = f"Gemini API Hatası: {e}"
-        logging.error(error_message, exc_info=True)
-        # Önceki 404 hatası için spesifik kontrol
-        if "404" in str(e) and "models/" in str(e):
-             error_message = (f"Gemini API Hatası: Belirtilen model ('{model_name}') bulunamadı veya "
-                              f"API anahtarınızla kullanılamıyor. Lütfen Google Cloud Console'da "
-                              f"'Generative Language API'nin etkin olduğundan ve doğru modeli "
-                              f"kullandığınızdan emin olun.\n\nOrijinal Hata: {e}")
-        elif "API key not valid" in str(e):
-            error_message = "Girilen Gemini API anahtarı geçersiz veya gerekli API (Generative Language API) etkin değil. Lütfen kontrol edin."
+        error_message = _api_error_message(e)
+
+    return summary, error_message
+
+async def summarize_text_async(text_to_summarize, api_key, detected_language,
+                               map_reduce_threshold_tokens=MAP_REDUCE_THRESHOLD_TOKENS, chunk_tokens=CHUNK_TOKENS,
+                               reduce_input_tokens=REDUCE_INPUT_TOKENS, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                               on_chunk=None, compress_tokens=None, on_compressed=None):
+    """summarize_text'in asyncio karşılığı (aynı istemci, kota ve dönüş sözleşmesi)."""
+    error_message = _check_inputs(text_to_summarize, api_key, detected_language)
+    if error_message:
+        return None, error_message
+
+    summary = None
+    try:
+        logging.info(f"Gemini API ile özetleme işlemi başlatılıyor (async)... (Kaynak Dil: {detected_language or 'Bilinmiyor'})")
+        client = get_client(api_key)
+        source_lang_display = SOURCE_LANG_NAME_MAP.get(detected_language, detected_language)
+        if compress_tokens:
+            # CPU işi; olay döngüsünü bekletmemesi için thread'de çalışır
+            text_to_summarize, compression = await asyncio.to_thread(compress_transcript, text_to_summarize,
+                                                                     compress_tokens)
+            if on_compressed:
+                on_compressed(compression)
+        if count_tokens(text_to_summarize) <= map_reduce_threshold_tokens:
+            summary, error_message = await client.generate_async(_single_prompt(text_to_summarize, source_lang_display),
+                                                                 on_chunk=on_chunk)
+        else:
+            summary, error_message = await _map_reduce_async(client, text_to_summarize, source_lang_display,
+                                                             chunk_tokens, reduce_input_tokens, max_concurrency,
+                                                             on_chunk=on_chunk)
+        if not summary:
+            logging.warning(error_message)
+            summary = None
+    except Exception as e:
+        error_message = _api_error_message(e)
 
     return summary, error_message
 
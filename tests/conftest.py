@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """
+    benchmarks/fake_gemini.py sunucusunu başlatır ve summarizer'ı ona yönlendirir.
+    Paylaşılan Gemini kotası test boyunca kapatılır. Dönüş: FakeGeminiServer.
+    """
+    monkeypatch.syspath_prepend(BENCHMARKS_DIR)
+    from fake_gemini import start_fake_gemini
+    import summarizer
+
+    server = start_fake_gemini(latency=0.0, stream_chunk_delay=0.0)
+    monkeypatch.setenv(summarizer.GEMINI_ENDPOINT_ENV, server.url)
+    limits = (summarizer.rate_limiter.requests_per_minute, summarizer.rate_limiter.tokens_per_minute)
+    summarizer.configure_rate_limits(0, 0)
+    yield server
+    summarizer.configure_rate_limits(*limits)
+    server.shutdown()
+    server.server_close()
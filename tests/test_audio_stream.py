@@ -0,0 +1,116 @@
+import io
+import shutil
+import threading
+import wave
+
+import numpy as np
+import pytest
+
+from audio_stream import SAMPLE_RATE, PcmStream
+from downloader import _feed_download
+
+
+class _Response:
+    def __init__(self, data, status):
+        self.data = data
+        self.status = status
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def read(self):
+        return self.data
+
+
+class _FakeYdl:
+    """Range isteklerini bellekteki veriden yanıtlar; fail_after istekten sonra bağlantı kopar."""
+
+    def __init__(self, payload, fail_after=None):
+        self.payload = payload
+        self.fail_after = fail_after
+        self.requests = 0
+        self.closed = False
+
+    def urlopen(self, request):
+        self.requests += 1
+        if self.fail_after is not None and self.requests > self.fail_after:
+            raise ConnectionResetError("bağlantı koptu")
+        first, last = request.headers["Range"][len("bytes="):].split("-")
+        return _Response(self.payload[int(first):int(last) + 1], 206)
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeStream:
+    def __init__(self):
+        self.fed = bytearray()
+        self.closed = False
+        self.feed_error = None
+
+    def feed(self, data):
+        self.fed += data
+        return True
+
+    def close_input(self):
+        self.closed = True
+
+
+def test_feed_download_streams_all_ranges():
+    payload = bytes(range(256)) * 10
+    ydl, stream = _FakeYdl(payload), _FakeStream()
+    _feed_download(ydl, {"url": "https://example.invalid/a"}, stream, chunk_bytes=1000)
+    assert bytes(stream.fed) == payload
+    assert stream.feed_error is None
+    assert stream.closed and ydl.closed
+
+
+def test_feed_download_records_broken_download():
+    ydl, stream = _FakeYdl(b"x" * 5000, fail_after=2), _FakeStream()
+    _feed_download(ydl, {"url": "https://example.invalid/a"}, stream, chunk_bytes=1000)
+    assert len(stream.fed) == 2000
+    assert "bağlantı koptu" in stream.feed_error
+    assert stream.closed # ffmpeg girdinin bittiğini görür; wait() hatayı döndürür
+
+
+def _wav_bytes(seconds):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def _feed_in_background(stream, data, error=None):
+    """İndirme thread'i gibi besler; ffmpeg çıkışı okunurken yazıldığından borular tıkanmaz."""
+    def feed():
+        stream.feed(data)
+        stream.feed_error = error
+        stream.close_input()
+    thread = threading.Thread(target=feed, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg yok")
+def test_pcm_stream_reports_feed_error():
+    stream = PcmStream()
+    data = _wav_bytes(3)
+    _feed_in_background(stream, data[:len(data) // 2], error="bağlantı koptu")
+    samples = sum(len(block) for block in stream.iter_blocks(block_seconds=1))
+    assert 0 < samples <= 3 * SAMPLE_RATE
+    assert "bağlantı koptu" in stream.wait()
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg yok")
+def test_pcm_stream_decodes_fed_audio_in_blocks():
+    stream = PcmStream()
+    _feed_in_background(stream, _wav_bytes(2.5))
+    blocks = list(stream.iter_blocks(block_seconds=1))
+    assert [len(block) for block in blocks] == [SAMPLE_RATE, SAMPLE_RATE, SAMPLE_RATE // 2]
+    assert stream.wait() is None
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from transcriber import SAMPLE_RATE, TIME_PRECISION, _segments_from_tokens, _window_cuts, log_mel_batch
+
+
+def test_log_mel_batch_shape_and_zero_padding():
+    rng = np.random.default_rng(0)
+    short = rng.uniform(-0.5, 0.5, 10 * SAMPLE_RATE).astype(np.float32)
+    padded = np.concatenate([short, np.zeros(20 * SAMPLE_RATE, dtype=np.float32)])
+    mel = log_mel_batch([short, padded], n_mels=80)
+    assert mel.shape == (2, 80, 3000) and mel.dtype == np.float32
+    # 30 sn'den kısa pencere sıfırla tamamlanır: elle tamamlanmış pencereyle aynı sonuç
+    np.testing.assert_allclose(mel[0], mel[1])
+
+
+def test_log_mel_batch_clips_to_eight_below_batch_max():
+    rng = np.random.default_rng(1)
+    loud = rng.uniform(-0.5, 0.5, 30 * SAMPLE_RATE).astype(np.float32)
+    mel = log_mel_batch([loud, np.zeros(30 * SAMPLE_RATE, dtype=np.float32)])
+    log_spec = mel * 4.0 - 4.0
+    assert log_spec.min() == pytest.approx(log_spec.max() - 8.0, abs=1e-4)
+    # Sessiz pencere kırpma tabanına oturur
+    assert np.allclose(mel[1], mel[1].min())
+
+
+def test_log_mel_batch_matches_whisper():
+    whisper_audio = pytest.importorskip("whisper.audio")
+    rng = np.random.default_rng(2)
+    audio = rng.uniform(-0.5, 0.5, 30 * SAMPLE_RATE).astype(np.float32)
+    expected = whisper_audio.log_mel_spectrogram(audio).numpy()
+    np.testing.assert_allclose(log_mel_batch([audio])[0], expected, atol=1e-3)
+
+
+def test_window_cuts_fit_whisper_windows_and_land_in_silence():
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, 75 * SAMPLE_RATE).astype(np.float32)
+    audio[int(28.5 * SAMPLE_RATE):int(29 * SAMPLE_RATE)] = 0.0
+    cuts = _window_cuts(audio)
+    assert cuts[0] == 0 and cuts[-1] == len(audio)
+    assert all(0 < b - a <= 30 * SAMPLE_RATE for a, b in zip(cuts, cuts[1:]))
+    assert 28.5 <= cuts[1] / SAMPLE_RATE < 29.0
+
+
+class _Tokenizer:
+    eot = 900
+    timestamp_begin = 1000
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+def _ts(seconds):
+    return _Tokenizer.timestamp_begin + round(seconds / TIME_PRECISION)
+
+
+def test_segments_from_timestamp_tokens():
+    tokens = [_ts(0.0), ord("a"), ord("b"), _ts(2.0), _ts(2.0), ord("c"), _ts(4.5), _Tokenizer.eot]
+    segments = _segments_from_tokens(tokens, _Tokenizer(), offset_seconds=60.0, duration_seconds=30.0)
+    assert segments == [
+        {"start": 60.0, "end": 62.0, "text": "ab"},
+        {"start": 62.0, "end": 64.5, "text": "c"},
+    ]
+
+
+def test_unterminated_segment_ends_at_window_end():
+    tokens = [_ts(1.0), ord("x")]
+    segments = _segments_from_tokens(tokens, _Tokenizer(), offset_seconds=0.0, duration_seconds=12.5)
+    assert segments == [{"start": 1.0, "end": 12.5, "text": "x"}]
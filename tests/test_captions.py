@@ -0,0 +1,75 @@
+import pytest
+
+from downloader import _pick_track, parse_srv, parse_vtt
+
+VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.000 --> 00:00:02.500 align:start position:0%
+hello<00:00:00.500><c> world</c>
+
+00:00:02.500 --> 00:00:02.510
+hello world
+
+00:00:02.510 --> 00:00:05.000
+hello world
+this &amp; that
+
+1:02.000 --> 1:04.000
+<i>last</i> line
+"""
+
+SRV1 = """<?xml version="1.0" encoding="utf-8" ?><transcript>
+<text start="0.5" dur="1.5">first &amp;amp; line</text>
+<text start="2.0" dur="2">second
+line</text>
+<text start="4.0" dur="1"></text>
+</transcript>"""
+
+SRV3 = """<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>
+<p t="1000" d="2500"><s>hello</s><s t="400"> there</s></p>
+<p t="3500" d="500">again</p>
+</body></timedtext>"""
+
+
+def test_parse_vtt_strips_tags_and_rolling_lines():
+    assert parse_vtt(VTT) == [
+        (0.0, 2.5, "hello world"),
+        (2.51, 5.0, "this & that"),
+        (62.0, 64.0, "last line"),
+    ]
+
+
+def test_parse_srv1_uses_seconds():
+    assert parse_srv(SRV1) == [(0.5, 2.0, "first & line"), (2.0, 4.0, "second line")]
+
+
+def test_parse_srv3_uses_milliseconds():
+    assert parse_srv(SRV3) == [(1.0, 3.5, "hello there"), (3.5, 4.0, "again")]
+
+
+def _tracks(*codes, ext="vtt"):
+    return {code: [{"ext": "json3", "url": "u"}, {"ext": ext, "url": f"https://x/{code}"}] for code in codes}
+
+
+@pytest.mark.parametrize("codes, language, expected", [
+    (("en", "tr", "en-orig"), "en", "en"), # Tam eşleşme önce
+    (("tr", "en-orig", "en-US"), "en", "en-orig"), # Sonra orijinal dildeki otomatik iz
+    (("tr", "en-US"), "en", "en-US"), # Sonra ön ek eşleşmesi
+    (("tr", "de"), "en", None), # Videonun dilinde iz yok
+    (("af", "de-orig", "de", "tr"), None, "de-orig"), # Dil bilinmiyor: -orig izi
+    (("fr",), None, "fr"), # Dil bilinmiyor: tek yüklenmiş iz
+    (("af", "de", "tr"), None, None), # Dil bilinmiyor, -orig yok: çeviri olabilir, Whisper'a bırakılır
+    (("live_chat",), None, None),
+])
+def test_pick_track(codes, language, expected):
+    code, track = _pick_track(_tracks(*codes), language)
+    assert code == expected
+    if expected:
+        assert track["ext"] == "vtt"
+
+
+def test_pick_track_prefers_formats_in_order():
+    tracks = {"en": [{"ext": "srv1", "url": "a"}, {"ext": "srv3", "url": "b"}, {"ext": "vtt"}]}
+    assert _pick_track(tracks, "en")[1]["url"] == "b" # URL'siz vtt atlanır
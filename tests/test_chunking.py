@@ -0,0 +1,48 @@
+import numpy as np
+
+from transcriber import SAMPLE_RATE, _find_cut_points, _stitch_segments
+
+
+def _tone_with_gaps(seconds, gaps):
+    """Sabit gürültülü ses; gaps içindeki (başlangıç sn, bitiş sn) aralıkları sessiz."""
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    for start, end in gaps:
+        audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0.0
+    return audio
+
+
+def test_cuts_cover_whole_audio():
+    audio = _tone_with_gaps(95, [])
+    cuts = _find_cut_points(audio, chunk_seconds=30)
+    assert cuts[0] == 0 and cuts[-1] == len(audio)
+    assert cuts == sorted(cuts)
+    assert len(cuts) - 1 == 3 # Son parça yarım parçadan kısa kalmaz
+
+
+def test_cut_lands_in_nearby_silence():
+    audio = _tone_with_gaps(70, [(32.0, 33.0)])
+    cuts = _find_cut_points(audio, chunk_seconds=30, search_seconds=5)
+    assert 32.0 <= cuts[1] / SAMPLE_RATE < 33.0
+
+
+def test_short_audio_is_one_chunk():
+    audio = _tone_with_gaps(10, [])
+    assert _find_cut_points(audio, chunk_seconds=30) == [0, len(audio)]
+
+
+def test_stitch_keeps_segments_owned_by_each_chunk():
+    cuts = [0, 30 * SAMPLE_RATE, 60 * SAMPLE_RATE]
+    # Parçalar kesimin iki yanında 2 sn örtüşür; örtüşmedeki segment iki parçada da çıkar
+    first = [{"start": 0.0, "end": 10.0, "text": " a"}, {"start": 28.0, "end": 31.0, "text": " b"}]
+    second = [{"start": 28.5, "end": 31.0, "text": " b"}, {"start": 31.0, "end": 45.0, "text": " c"}]
+    stitched = _stitch_segments([(1, second), (0, first)], cuts)
+    assert [seg["text"] for seg in stitched] == [" a", " b", " c"]
+
+
+def test_stitch_drops_repeated_boundary_text():
+    cuts = [0, 30 * SAMPLE_RATE, 60 * SAMPLE_RATE]
+    first = [{"start": 27.0, "end": 29.8, "text": " aynı"}]
+    second = [{"start": 29.5, "end": 31.0, "text": "aynı "}, {"start": 31.0, "end": 40.0, "text": " son"}]
+    stitched = _stitch_segments([(0, first), (1, second)], cuts)
+    assert [seg["text"] for seg in stitched] == [" aynı", " son"]
@@ -0,0 +1,30 @@
+import json
+import os
+
+from cli import MANIFEST_NAME, run_batch
+from downloader import caption_cache_params
+from result_cache import ResultCache, STAGE_SUMMARY
+from summarizer import summary_cache_params
+
+VIDEO_IDS = ["aaaaaaaaaaa", "bbbbbbbbbbb"]
+
+
+def test_run_batch_writes_summaries_and_manifest_from_cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    for video_id in VIDEO_IDS:
+        cache.put_json(STAGE_SUMMARY, video_id, summary_cache_params(caption_cache_params()),
+                       {"summary": f"{video_id} özeti", "source": "manual", "title": video_id})
+    urls = [f"https://www.youtube.com/watch?v={video_id}" for video_id in VIDEO_IDS]
+    output_dir = str(tmp_path / "out")
+
+    records = run_batch(urls, api_key=None, output_dir=output_dir, cache=cache)
+
+    assert sorted(record["video_id"] for record in records) == VIDEO_IDS
+    assert all(record["status"] == "done" for record in records)
+    for video_id in VIDEO_IDS:
+        with open(os.path.join(output_dir, f"{video_id}.txt"), encoding="utf-8") as f:
+            assert f.read() == f"{video_id} özeti"
+    with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = [json.loads(line) for line in f]
+    assert sorted(line["video_id"] for line in manifest) == VIDEO_IDS
+    assert all(line["stages"]["summarize"]["status"] == "cached" for line in manifest)
@@ -0,0 +1,66 @@
+import re
+
+from metrics import metrics
+from pipeline import VideoJob, summarize_stage
+from result_cache import ResultCache
+from summarizer import compress_transcript, count_tokens
+
+TOPICS = ["güneş enerjisi paneller elektrik üretimi verim", "yapay zeka modelleri veri eğitim",
+          "deniz kirliliği plastik atık balıklar", "şehir trafiği toplu taşıma metro otobüs"]
+
+
+def _transcript(repeats=6):
+    sentences = []
+    for r in range(repeats):
+        for i, topic in enumerate(TOPICS):
+            sentences.append(f"Cümle {r}-{i}: bu bölümde {topic} konusu {r}. kez ayrıntılı anlatılıyor.")
+        sentences.append("Evet tamam.")
+    return " ".join(sentences)
+
+
+def _sentence_ids(text):
+    return re.findall(r"Cümle (\d+-\d+)", text)
+
+
+def test_text_within_budget_is_unchanged():
+    text = "Kısa bir transkript. Sadece iki cümle var."
+    compressed, stats = compress_transcript(text, token_budget=10_000)
+    assert compressed == text
+    assert stats["input_tokens"] == stats["output_tokens"]
+    assert stats["kept_sentences"] is None
+
+
+def test_compressed_text_fits_budget_and_keeps_order():
+    text = _transcript()
+    budget = count_tokens(text) // 3
+    compressed, stats = compress_transcript(text, token_budget=budget)
+    assert stats["output_tokens"] <= budget
+    assert 0 < stats["kept_sentences"] < stats["sentences"]
+    kept = _sentence_ids(compressed)
+    assert kept and kept == [s for s in _sentence_ids(text) if s in kept] # Orijinal sıra korunur
+    assert "Evet tamam." not in compressed # Dolgu cümleleri seçilmez
+
+
+def test_near_duplicate_sentences_are_kept_once():
+    repeated = "Bu video güneş enerjisi panellerinin verimini anlatıyor."
+    text = " ".join([repeated] * 10 + [f"Ayrıca {topic} konusu ele alınıyor." for topic in TOPICS])
+    compressed, _ = compress_transcript(text, token_budget=count_tokens(text) // 2)
+    assert compressed.count(repeated) <= 1
+
+
+def test_summarize_stage_reports_compression_stats(fake_gemini, tmp_path):
+    job = VideoJob("https://www.youtube.com/watch?v=aaaaaaaaaaa",
+                   summary_options={"compress_tokens": 100})
+    job.transcript, job.language, job.transcript_params = _transcript(), "tr", {"source": "captions"}
+    events = []
+    metrics.add_listener(events.append)
+    try:
+        error = summarize_stage(job, ResultCache(str(tmp_path / "cache")), "ANAHTAR")
+    finally:
+        metrics.remove_listener(events.append)
+
+    assert error is None and job.summary
+    assert job.to_dict()["compression"]["output_tokens"] <= 100
+    event = next(e for e in events if e["type"] == "summary_compression")
+    assert event["input_tokens"] == job.compression["input_tokens"]
+    assert event["summary_seconds"] >= 0
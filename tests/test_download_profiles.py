@@ -0,0 +1,47 @@
+import pytest
+import yt_dlp
+
+from downloader import (DOWNLOAD_PROFILE_QUALITY, DOWNLOAD_PROFILE_SPEECH, _download_options,
+                        audio_cache_params)
+
+
+def _audio(format_id, abr, asr, ext="webm"):
+    return {"format_id": format_id, "url": f"https://example.invalid/{format_id}", "ext": ext,
+            "acodec": "opus" if ext == "webm" else "mp4a.40.2", "vcodec": "none", "abr": abr, "tbr": abr,
+            "asr": asr, "protocol": "https", "filesize": abr * 1000}
+
+
+def _select(profile, formats):
+    """yt-dlp'nin biçim seçimini ağa çıkmadan, hazır biçim listesi üzerinde çalıştırır."""
+    options = dict(_download_options(profile), quiet=True, simulate=True, skip_download=True)
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.process_ie_result({"id": "aaaaaaaaaaa", "title": "t", "formats": formats,
+                                      "extractor": "youtube", "extractor_key": "Youtube",
+                                      "webpage_url": "https://www.youtube.com/watch?v=aaaaaaaaaaa"},
+                                     download=False)
+    return info["format_id"]
+
+
+FORMATS = [_audio("low", 32, 48000), _audio("speech", 50, 48000), _audio("mid", 70, 48000),
+           _audio("best", 130, 44100, ext="m4a")]
+
+
+def test_speech_profile_picks_smallest_adequate_stream():
+    assert _select(DOWNLOAD_PROFILE_SPEECH, FORMATS) == "speech"
+
+
+def test_speech_profile_falls_back_when_nothing_meets_bitrate():
+    assert _select(DOWNLOAD_PROFILE_SPEECH, [_audio("low", 32, 48000), _audio("narrow", 64, 8000)]) == "low"
+
+
+def test_quality_profile_picks_best_and_reencodes():
+    assert _select(DOWNLOAD_PROFILE_QUALITY, FORMATS) == "best"
+    assert _download_options(DOWNLOAD_PROFILE_QUALITY)["postprocessors"][0]["key"] == "FFmpegExtractAudio"
+    assert "postprocessors" not in _download_options(DOWNLOAD_PROFILE_SPEECH)
+
+
+@pytest.mark.parametrize("profile", [DOWNLOAD_PROFILE_SPEECH, DOWNLOAD_PROFILE_QUALITY])
+def test_profiles_use_separate_cache_keys(profile):
+    other = DOWNLOAD_PROFILE_QUALITY if profile == DOWNLOAD_PROFILE_SPEECH else DOWNLOAD_PROFILE_SPEECH
+    assert audio_cache_params(profile) != audio_cache_params(other)
+    assert audio_cache_params(profile) == audio_cache_params(profile)
@@ -0,0 +1,53 @@
+import pytest
+
+from model_registry import resolve_precision
+from transcriber import ENGINE_PRESETS, resolve_engine, transcript_cache_params
+
+
+def test_no_engine_keeps_precision_and_defaults():
+    assert resolve_engine(None, "int8") == ("int8", {})
+
+
+def test_preset_sets_precision_and_decode_options():
+    precision, options = resolve_engine("fast", "fp32")
+    assert precision == "int8"
+    assert options == {"best_of": 1, "temperature": (0.0, 0.5, 1.0)}
+    assert resolve_engine("accurate") == ("fp32", {"beam_size": 5, "best_of": 5})
+
+
+def test_custom_engine_dict_list_temperature_becomes_tuple():
+    precision, options = resolve_engine({"beam_size": 3, "temperature": [0.0, 0.4]}, "fp32")
+    assert precision == "fp32"
+    assert options == {"beam_size": 3, "temperature": (0.0, 0.4)}
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_engine("turbo")
+
+
+@pytest.mark.parametrize("precision, device, expected", [
+    ("fp16", "cpu", "fp32"), # CPU'da half çekirdekleri yok
+    ("fp16", "cuda", "fp16"),
+    ("int8", "cpu", "int8"),
+    ("fp32", "cpu", "fp32"),
+])
+def test_precision_is_resolved_for_device(precision, device, expected):
+    assert resolve_precision(precision, device) == expected
+
+
+def test_engine_and_precision_change_transcript_cache_key():
+    keys = {str(transcript_cache_params("base", precision=ENGINE_PRESETS[name]["precision"], engine=name))
+            for name in ENGINE_PRESETS}
+    assert len(keys) == len(ENGINE_PRESETS)
+
+
+def test_mode_and_cut_settings_change_transcript_cache_key():
+    sequential = transcript_cache_params("base")
+    chunked = transcript_cache_params("base", mode="chunked")
+    batched = transcript_cache_params("base", mode="batched")
+    assert len({str(sequential), str(chunked), str(batched), str(transcript_cache_params("base", mode="long"))}) == 4
+    assert transcript_cache_params("base", mode="chunked", chunk_seconds=120) != chunked
+    assert transcript_cache_params("base", mode="batched", batch_size=4) != batched
+    # Modu etkilemeyen kesim ayarı anahtarı değiştirmez
+    assert transcript_cache_params("base", batch_size=4) == sequential
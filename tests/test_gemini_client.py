@@ -0,0 +1,94 @@
+import io
+import threading
+
+import pytest
+
+import summarizer
+from summarizer import GeminiClient, RateLimiter, TokenBucket, get_client
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(600) # Kapasite 60, dolum (600 - 60) / 60 = 9 / sn
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(9) == pytest.approx(1.0, abs=0.05)
+    assert bucket.reserve(9) == pytest.approx(2.0, abs=0.05) # Bekleme süreleri birikir
+
+
+def test_token_bucket_counts_oversized_reservations_in_full():
+    bucket = TokenBucket(600)
+    # Kovadan büyük istek tam tutarıyla düşülür: (10000 - 60) / 9 sn beklenir
+    assert bucket.reserve(10_000) == pytest.approx(9940 / 9, abs=0.05)
+    assert bucket.reserve(9) == pytest.approx(9949 / 9, abs=0.05)
+
+
+def test_rate_limiter_waits_for_the_stricter_limit():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+    limiter.reserve(60) # Token kovası boşalır; istek kovasında yer var
+    assert limiter.reserve(9) == pytest.approx(1.0, abs=0.05)
+    limiter.configure(requests_per_minute=0, tokens_per_minute=0)
+    assert limiter.reserve(10_000) == 0
+
+
+def test_one_client_per_api_key(fake_gemini, monkeypatch):
+    keys = []
+    handler = fake_gemini.RequestHandlerClass
+    original = handler.do_POST
+
+    def do_post(self):
+        keys.append(self.headers.get("x-goog-api-key"))
+        return original(self)
+
+    monkeypatch.setattr(handler, "do_POST", do_post)
+    first, second = get_client("ANAHTAR-A"), get_client("ANAHTAR-B")
+    assert first is get_client("ANAHTAR-A") and first is not second
+
+    # Farklı anahtarlı istemciler aynı anda çalışırken her istek kendi anahtarıyla gider
+    threads = [threading.Thread(target=client.generate, args=("merhaba",)) for client in (first, second) * 3]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(keys) == ["ANAHTAR-A"] * 3 + ["ANAHTAR-B"] * 3
+
+
+def test_transient_errors_are_retried_then_raised(fake_gemini, monkeypatch):
+    monkeypatch.setattr(summarizer, "_backoff_delay", lambda attempt: 0.0)
+    fake_gemini.failure_rate = 1.0 # Her istek 503
+    client = GeminiClient("ANAHTAR", max_retries=2)
+    with pytest.raises(Exception) as error:
+        client.generate("merhaba")
+    assert getattr(error.value, "code", None) == 503
+    assert fake_gemini.request_count == 3
+
+
+def test_generate_returns_text(fake_gemini):
+    text, error = GeminiClient("ANAHTAR").generate("merhaba")
+    assert error is None
+    assert text.startswith("Sahte özet")
+
+
+def test_shared_configuration_fallback_keeps_keys_apart(fake_gemini, monkeypatch):
+    """genai iç API'si yoksa genai.configure yolu: her istek yine kendi anahtarıyla gider."""
+    seen = []
+    handler = fake_gemini.RequestHandlerClass
+    original = handler.do_POST
+
+    def do_post(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.rfile = io.BytesIO(body)
+        seen.append((self.headers.get("x-goog-api-key"), body.decode("utf-8")))
+        return original(self)
+
+    monkeypatch.setattr(handler, "do_POST", do_post)
+    monkeypatch.setattr(summarizer, "_client_manager", lambda api_key, endpoint=None: None)
+    clients = [GeminiClient("ANAHTAR-A"), GeminiClient("ANAHTAR-B")]
+    assert all(client._clients is None for client in clients)
+
+    threads = [threading.Thread(target=client.generate, args=(f"merhaba {client.api_key}",))
+               for client in clients * 3]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(seen) == 6
+    assert all(key in body for key, body in seen)
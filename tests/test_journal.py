@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+
+from journal import TranscriptJournal
+from transcriber import SAMPLE_RATE, _find_cut_points, _transcribe_chunks
+
+HEADER = {"mode": "chunked", "chunk_seconds": 300}
+
+
+def _segment(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+
+def test_entries_survive_reopen(tmp_path):
+    path = str(tmp_path / "j.jsonl")
+    journal = TranscriptJournal(path, HEADER)
+    journal.record(unit=0, language="tr", segments=[_segment(0, 1, " a")])
+    journal.record(unit=1, language="tr", segments=[_segment(1, 2, " b")])
+
+    reopened = TranscriptJournal(path, HEADER)
+    assert [entry["unit"] for entry in reopened.entries] == [0, 1]
+    assert [seg["text"] for seg in reopened.segments()] == [" a", " b"]
+
+
+def test_truncated_last_line_is_dropped_and_file_repaired(tmp_path):
+    path = str(tmp_path / "j.jsonl")
+    journal = TranscriptJournal(path, HEADER)
+    journal.record(unit=0, language="tr", segments=[_segment(0, 1, " a")])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"unit": 1, "language": "tr", "segm') # Çökme: yarım satır
+
+    recovered = TranscriptJournal(path, HEADER)
+    assert [entry["unit"] for entry in recovered.entries] == [0]
+    # Yeni kayıt yarım satırın arkasına eklenmez; dosya yeniden okunabilir kalır
+    recovered.record(unit=1, language="tr", segments=[_segment(1, 2, " b")])
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0] == {"header": HEADER}
+    assert [line["unit"] for line in lines[1:]] == [0, 1]
+
+
+def test_header_mismatch_discards_progress(tmp_path):
+    path = str(tmp_path / "j.jsonl")
+    TranscriptJournal(path, HEADER).record(unit=0, language="tr", segments=[])
+    other = TranscriptJournal(path, {**HEADER, "chunk_seconds": 120})
+    assert other.entries == []
+    assert not (tmp_path / "j.jsonl").exists()
+
+
+def test_discard_removes_file(tmp_path):
+    path = str(tmp_path / "j.jsonl")
+    journal = TranscriptJournal(path, HEADER)
+    journal.record(unit=0, language="tr", segments=[])
+    journal.discard()
+    journal.discard() # Dosya yoksa sessizce geçer
+    assert not (tmp_path / "j.jsonl").exists()
+
+
+def test_chunked_transcript_resumes_entirely_from_journal(tmp_path):
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, 70 * SAMPLE_RATE).astype(np.float32)
+    cuts = _find_cut_points(audio, 30)
+    journal = TranscriptJournal(str(tmp_path / "j.jsonl"), HEADER)
+    for i in range(len(cuts) - 1):
+        start = cuts[i] / SAMPLE_RATE
+        journal.record(unit=i, language="de" if i else "tr", segments=[_segment(start, start + 1, f" {i}")])
+
+    # Tüm parçalar günlükte: model ve işçi havuzu hiç kullanılmaz
+    result = _transcribe_chunks(audio, "base", "cpu", "fp32", 2, 30, 2, {}, journal=journal)
+    assert result["text"] == "".join(f" {i}" for i in range(len(cuts) - 1))
+    assert result["language"] == "de" # Süre ağırlıklı oylama
@@ -0,0 +1,54 @@
+import numpy as np
+
+from transcriber import SAMPLE_RATE, _transcribe_windows
+
+
+class _ThreeSegmentModel:
+    """Her pencereyi üç segmente böler; son segment pencere sonunda kesik kalır."""
+
+    def __init__(self):
+        self.windows = []
+
+    def transcribe(self, samples, **options):
+        seconds = len(samples) / SAMPLE_RATE
+        self.windows.append(seconds)
+        n = len(self.windows)
+        bounds = [0.0, seconds * 0.4, seconds * 0.8, seconds]
+        return {"language": "tr", "segments": [
+            {"start": bounds[i], "end": bounds[i + 1], "text": f" {n}.{i}"} for i in range(3)]}
+
+
+def _blocks(seconds, block_seconds=5):
+    return [np.zeros(block_seconds * SAMPLE_RATE, dtype=np.float32)] * (seconds // block_seconds)
+
+
+def test_cut_tail_segment_is_carried_into_next_window():
+    model = _ThreeSegmentModel()
+    result = _transcribe_windows(model, iter(_blocks(60)), False, window_seconds=30)
+    # 1. pencerenin son segmenti (24-30 sn) atılır; ses 24. saniyeden itibaren yeniden çözülür
+    assert model.windows[:2] == [30.0, 30.0]
+    starts = [seg["start"] for seg in result["segments"]]
+    assert starts[:3] == [0.0, 12.0, 24.0]
+    assert starts == sorted(starts)
+    assert result["segments"][-1]["end"] == 60.0
+    assert result["language"] == "tr"
+
+
+def test_windows_report_progress_offsets_for_the_journal():
+    model = _ThreeSegmentModel()
+    offsets = []
+    _transcribe_windows(model, iter(_blocks(60)), False, window_seconds=30,
+                        on_window=lambda offset, segments, language: offsets.append(offset))
+    assert offsets[0] == 24.0
+    assert offsets[-1] == 60.0
+    assert offsets == sorted(offsets)
+
+
+def test_resume_continues_from_offset_with_prior_segments():
+    model = _ThreeSegmentModel()
+    prior = [{"start": 0.0, "end": 24.0, "text": " önceki"}]
+    result = _transcribe_windows(model, iter(_blocks(30)), False, window_seconds=30, start_seconds=24.0,
+                                 language="tr", prior_segments=prior)
+    assert result["segments"][0] == prior[0]
+    assert result["segments"][1]["start"] == 24.0
+    assert result["text"].startswith(" önceki")
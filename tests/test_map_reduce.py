@@ -0,0 +1,57 @@
+from summarizer import _group_partials, _map_reduce, count_tokens, split_into_chunks
+
+
+def _sentences(n):
+    return " ".join(f"Bu {i}. cümle biraz uzunca bir örnek metin içeriyor." for i in range(n))
+
+
+def test_chunks_respect_token_limit_and_keep_text():
+    text = _sentences(200)
+    chunks = split_into_chunks(text, max_tokens=200)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 200 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_short_text_is_single_chunk():
+    assert split_into_chunks("Kısa bir metin. İki cümle.", max_tokens=200) == ["Kısa bir metin. İki cümle."]
+
+
+def test_unpunctuated_text_is_split_on_words():
+    text = " ".join(f"kelime{i}" for i in range(2000))
+    chunks = split_into_chunks(text, max_tokens=100)
+    assert len(chunks) > 1
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_partials_are_grouped_under_reduce_limit():
+    partials = [f"ara özet {i} " * 20 for i in range(10)]
+    limit = count_tokens(partials[0]) * 3
+    groups = _group_partials(partials, limit)
+    assert [p for group in groups for p in group] == partials
+    assert all(sum(count_tokens(p) for p in group) <= limit for group in groups)
+
+
+class _EchoClient:
+    """Her prompt için kısa bir yanıt döndüren sahte istemci; istekleri kaydeder."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompt, on_chunk=None):
+        self.prompts.append(prompt)
+        if on_chunk:
+            on_chunk("son")
+        return f"özet{len(self.prompts)}", None
+
+
+def test_map_reduce_sends_one_request_per_chunk_then_streams_final():
+    client = _EchoClient()
+    chunks = []
+    summary, error = _map_reduce(client, _sentences(200), "İngilizce", chunk_tokens=200,
+                                 reduce_input_tokens=10000, max_concurrency=4, on_chunk=chunks.append)
+    n_chunks = len(split_into_chunks(_sentences(200), 200))
+    assert error is None
+    assert len(client.prompts) == n_chunks + 1 # map istekleri + tek reduce
+    assert summary == f"özet{n_chunks + 1}"
+    assert chunks == ["son"] # Yalnızca son birleştirme akış olarak iletilir
@@ -0,0 +1,76 @@
+import pytest
+
+from metrics import Metrics
+
+
+def test_span_records_duration_and_context_labels():
+    metrics = Metrics()
+    events = []
+    metrics.add_listener(events.append)
+    with metrics.span("job", job=7):
+        with metrics.span("stage", stage="download", video="abc"):
+            metrics.emit("status", message="indiriliyor")
+
+    status = next(e for e in events if e["type"] == "status")
+    assert status["context"] == {"job": 7, "stage": "download", "video": "abc"}
+    ends = [e for e in events if e["type"] == "span_end"]
+    assert [e["span"] for e in ends] == ["stage", "job"]
+    assert all(e["status"] == "ok" for e in ends)
+    # Yüksek kardinaliteli etiketler (video, job) süre özetine girmez
+    assert metrics.average("stage_seconds", stage="download") is not None
+    assert metrics.average("job_seconds") is not None
+
+
+def test_span_marks_errors():
+    metrics = Metrics()
+    events = []
+    metrics.add_listener(events.append)
+    with pytest.raises(ValueError):
+        with metrics.span("stage", stage="transcribe"):
+            raise ValueError("hata")
+    assert [e["status"] for e in events if e["type"] == "span_end"] == ["error"]
+
+
+def test_counters_and_averages_are_keyed_by_labels():
+    metrics = Metrics()
+    metrics.incr("stage_total", stage="download", status="done")
+    metrics.incr("stage_total", 2, status="done", stage="download")
+    metrics.observe("latency", 1.0, model="base")
+    metrics.observe("latency", 3.0, model="base")
+    assert metrics.counter("stage_total", stage="download", status="done") == 3
+    assert metrics.counter("stage_total", stage="summarize", status="done") == 0
+    assert metrics.average("latency", model="base") == 2.0
+    assert metrics.average("latency", model="small") is None
+
+
+def test_progress_reports_eta_for_innermost_span():
+    metrics = Metrics()
+    events = []
+    metrics.add_listener(events.append)
+    metrics.progress(0.5) # Açık span yoksa yok sayılır
+    with metrics.span("whisper_transcribe"):
+        metrics.progress(0.5, chunks_done=1)
+    progress = [e for e in events if e["type"] == "progress"]
+    assert len(progress) == 1
+    assert progress[0]["span"] == "whisper_transcribe"
+    assert progress[0]["fraction"] == 0.5 and progress[0]["chunks_done"] == 1
+    assert progress[0]["eta_seconds"] is not None
+
+
+def test_failing_listener_does_not_break_others():
+    metrics = Metrics()
+    events = []
+    metrics.add_listener(lambda event: 1 / 0)
+    metrics.add_listener(events.append)
+    metrics.emit("status", message="x")
+    assert events and events[0]["message"] == "x"
+
+
+def test_prometheus_text_lists_counters_and_summaries():
+    metrics = Metrics()
+    metrics.incr("gemini_requests_total", status="ok")
+    metrics.observe("gemini_latency_seconds", 0.5)
+    text = metrics.prometheus_text()
+    assert '# TYPE ozetle_gemini_requests_total counter' in text
+    assert 'ozetle_gemini_requests_total{status="ok"} 1' in text
+    assert '# TYPE ozetle_gemini_latency_seconds summary' in text
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from model_registry import ModelRegistry
+
+MB = 1024 * 1024
+
+
+class _Tensor:
+    def __init__(self, size):
+        self.size = size
+
+    def numel(self):
+        return self.size
+
+    def element_size(self):
+        return 1
+
+
+class _Model:
+    def __init__(self, key, size):
+        self.key = key
+        self.size = size
+
+    def state_dict(self):
+        return {"weight": _Tensor(self.size)}
+
+
+class FakeRegistry(ModelRegistry):
+    """Whisper yerine sabit boyutlu sahte model yükler ve yüklemeleri sayar."""
+
+    def __init__(self, model_mb=100, **kwargs):
+        super().__init__(**kwargs)
+        self.model_mb = model_mb
+        self.loads = []
+
+    def _load(self, model_name, device, precision):
+        self.loads.append((model_name, device, precision))
+        time.sleep(0.01)
+        return _Model((model_name, device, precision), self.model_mb * MB)
+
+
+def test_model_is_loaded_once_and_reused():
+    registry = FakeRegistry()
+    first = registry.get("base", device="cpu")
+    second = registry.get("base", device="cpu")
+    assert first is second
+    assert len(registry.loads) == 1
+
+
+def test_instance_is_never_shared_by_concurrent_users():
+    registry = FakeRegistry(max_instances=2)
+    lock = threading.Lock()
+    in_use = set()
+    peak = [0]
+    errors = []
+
+    def work():
+        with registry.use("base", device="cpu") as model:
+            with lock:
+                if id(model) in in_use:
+                    errors.append("aynı kopya iki işte")
+                in_use.add(id(model))
+                peak[0] = max(peak[0], len(in_use))
+            time.sleep(0.02)
+            with lock:
+                in_use.discard(id(model))
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(registry.loads) == 2
+    assert peak[0] == 2
+
+
+def test_least_recently_used_idle_model_is_evicted():
+    registry = FakeRegistry(model_mb=100, memory_budget_mb=250)
+    registry.get("tiny", device="cpu")
+    registry.get("base", device="cpu")
+    registry.get("tiny", device="cpu") # tiny yeniden kullanıldı; en eski base
+    registry.get("small", device="cpu")
+    assert [key[0] for key in registry.loaded_models()] == ["tiny", "small"]
+
+
+def test_busy_model_is_not_evicted():
+    registry = FakeRegistry(model_mb=100, memory_budget_mb=150)
+    with registry.use("tiny", device="cpu"):
+        registry.get("base", device="cpu")
+        assert ("tiny", "cpu", "fp32") in registry.loaded_models()
+    # Kopya boşalınca bütçe uygulanır
+    assert len(registry.loaded_models()) == 1
+
+
+def test_int8_is_always_loaded_on_cpu():
+    registry = FakeRegistry()
+    registry.get("base", device="cuda", precision="int8")
+    assert registry.loads == [("base", "cpu", "int8")]
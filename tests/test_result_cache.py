@@ -0,0 +1,69 @@
+import os
+
+from pipeline import VideoJob, _pin_audio, cleanup_job
+from result_cache import ResultCache, STAGE_SUMMARY, STAGE_TRANSCRIPT
+
+MB = 1024 * 1024
+
+
+def _audio_file(directory, name, size_mb):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"\0" * int(size_mb * MB))
+    return path
+
+
+def _age(path, seconds):
+    """Girdinin son kullanım zamanını (mtime) geriye alır."""
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+
+def test_json_entries_are_keyed_by_video_and_params(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put_json(STAGE_TRANSCRIPT, "vid1", {"model": "base"}, {"text": "merhaba"})
+    assert cache.get_json(STAGE_TRANSCRIPT, "vid1", {"model": "base"}) == {"text": "merhaba"}
+    assert cache.get_json(STAGE_TRANSCRIPT, "vid1", {"model": "small"}) is None
+    assert cache.get_json(STAGE_TRANSCRIPT, "vid2", {"model": "base"}) is None
+    assert cache.get_json(STAGE_SUMMARY, "vid1", {"model": "base"}) is None
+
+
+def test_params_key_ignores_dict_order(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put_json(STAGE_TRANSCRIPT, "vid1", {"model": "base", "vad": True}, {"text": "x"})
+    assert cache.get_json(STAGE_TRANSCRIPT, "vid1", {"vad": True, "model": "base"}) == {"text": "x"}
+
+
+def test_audio_is_moved_into_cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    source = _audio_file(str(tmp_path), "indirilen.m4a", 0.1)
+    path = cache.put_audio("vid1", {"format": "speech"}, source)
+    assert not os.path.exists(source)
+    assert cache.get_audio("vid1", {"format": "speech"}) == path
+    assert cache.get_audio("vid1", {"format": "quality"}) is None
+
+
+def test_eviction_removes_least_recently_used_first(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_size_mb=1)
+    old = cache.put_audio("old", {}, _audio_file(str(tmp_path), "a.m4a", 0.4))
+    used = cache.put_audio("used", {}, _audio_file(str(tmp_path), "b.m4a", 0.4))
+    _age(old, 60)
+    _age(used, 120)
+    cache.get_audio("used", {}) # Kullanılan girdi en yeni olur
+    new = cache.put_audio("new", {}, _audio_file(str(tmp_path), "c.m4a", 0.4))
+    assert not os.path.exists(old)
+    assert os.path.exists(used) and os.path.exists(new)
+
+
+def test_pinned_audio_survives_eviction_until_cleanup(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_size_mb=1)
+    job = VideoJob("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    path = cache.put_audio(job.video_id, {}, _audio_file(str(tmp_path), "a.m4a", 0.7))
+    _pin_audio(job, cache, path)
+    _age(path, 60)
+    cache.put_audio("other", {}, _audio_file(str(tmp_path), "b.m4a", 0.7))
+    assert os.path.exists(path) # Whisper sırası bekleyen işin sesi silinmez
+
+    cleanup_job(job, remove_workspace=False)
+    cache.evict()
+    assert not os.path.exists(path)
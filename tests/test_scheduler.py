@@ -0,0 +1,117 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import scheduler as scheduler_module
+from downloader import caption_cache_params
+from result_cache import ResultCache, STAGE_SUMMARY
+from scheduler import JOB_CANCELLED, JOB_DONE, JOB_FAILED, JobScheduler
+from summarizer import summary_cache_params
+from transcriber import SAMPLE_RATE, TranscriptionCancelled, _transcribe_windows
+
+URL = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+
+
+def _wait(scheduled, timeout=5):
+    deadline = time.monotonic() + timeout
+    while scheduled.state not in (JOB_DONE, JOB_FAILED, JOB_CANCELLED):
+        assert time.monotonic() < deadline, f"iş bitmedi: {scheduled.state}"
+        time.sleep(0.01)
+    return scheduled.state
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def fake_stages(monkeypatch):
+    """İndirme anında biter; transkript iptal edilene veya 'release' olayına kadar pencere pencere sürer."""
+    state = {"release": threading.Event(), "running": 0, "peak": 0, "lock": threading.Lock()}
+
+    def fetch_stage(job, cache, notify=None):
+        return None
+
+    def transcribe_stage(job, cache, notify=None, is_cancelled=None):
+        with state["lock"]:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        try:
+            while not state["release"].wait(0.01):
+                if is_cancelled and is_cancelled():
+                    return "Transkript oluşturulamadı: Transkript iptal edildi."
+            job.transcript, job.language, job.transcript_params = "metin", "en", {}
+            return None
+        finally:
+            with state["lock"]:
+                state["running"] -= 1
+
+    def summarize_stage(job, cache, api_key, notify=None, on_chunk=None):
+        job.summary = "özet"
+        return None
+
+    monkeypatch.setattr(scheduler_module, "fetch_stage", fetch_stage)
+    monkeypatch.setattr(scheduler_module, "transcribe_stage", transcribe_stage)
+    monkeypatch.setattr(scheduler_module, "summarize_stage", summarize_stage)
+    return state
+
+
+def test_cached_summary_finishes_without_stages(cache):
+    cache.put_json(STAGE_SUMMARY, "aaaaaaaaaaa", summary_cache_params(caption_cache_params()),
+                   {"summary": "önbellekteki özet", "source": "manual"})
+    finished = []
+    scheduler = JobScheduler(cache, whisper_slots=1, on_finished=finished.append)
+    scheduled = scheduler.submit(URL, api_key=None)
+    assert _wait(scheduled) == JOB_DONE
+    assert scheduled.summary == "önbellekteki özet"
+    assert finished == [scheduled]
+
+
+def test_cancel_while_waiting_to_start(cache):
+    ready = threading.Event()
+    scheduler = JobScheduler(cache, whisper_slots=1, ready=ready)
+    scheduled = scheduler.submit(URL, api_key=None)
+    scheduler.cancel(scheduled.id)
+    assert _wait(scheduled) == JOB_CANCELLED
+
+
+def test_cancel_stops_running_whisper_stage(cache, fake_stages):
+    finished = []
+    scheduler = JobScheduler(cache, whisper_slots=1, on_finished=finished.append)
+    scheduled = scheduler.submit(URL, api_key=None)
+    while not fake_stages["running"]:
+        time.sleep(0.01)
+    scheduler.cancel(scheduled.id)
+    # İptalle yarıda kalan aşama başarısızlık değil iptal sayılır
+    assert _wait(scheduled) == JOB_CANCELLED
+    assert finished == []
+
+
+def test_whisper_slots_limit_concurrent_transcriptions(cache, fake_stages):
+    scheduler = JobScheduler(cache, whisper_slots=1)
+    jobs = [scheduler.submit(f"https://www.youtube.com/watch?v={c * 11}", api_key=None) for c in "abc"]
+    time.sleep(0.2)
+    assert sum(job.waiting for job in jobs) == 2
+    fake_stages["release"].set()
+    assert [_wait(job) for job in jobs] == [JOB_DONE] * 3
+    assert fake_stages["peak"] == 1
+
+
+class _WindowModel:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, samples, **options):
+        self.calls += 1
+        return {"language": "en", "segments": [{"start": 0.0, "end": len(samples) / SAMPLE_RATE, "text": " x"}]}
+
+
+def test_window_loop_checks_cancellation_before_each_window():
+    model = _WindowModel()
+    blocks = [np.zeros(30 * SAMPLE_RATE, dtype=np.float32)] * 5
+    with pytest.raises(TranscriptionCancelled):
+        _transcribe_windows(model, iter(blocks), False, is_cancelled=lambda: model.calls >= 2)
+    assert model.calls == 2
@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from downloader import caption_cache_params
+from result_cache import ResultCache, STAGE_SUMMARY
+from scheduler import JOB_DONE, JOB_QUEUED, JOB_RUNNING
+from server import JobService, OzetleServer, ServerJob
+from summarizer import summary_cache_params
+
+URL = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+
+
+def _request(server, method, path, payload=None):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(server.url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    """Tek işçili servis; özet önbellekte olduğundan iş Whisper ve Gemini olmadan biter."""
+    cache_dir = str(tmp_path_factory.mktemp("cache"))
+    ResultCache(cache_dir).put_json(STAGE_SUMMARY, "aaaaaaaaaaa", summary_cache_params(caption_cache_params()),
+                                    {"summary": "önbellekteki özet", "source": "manual"})
+    service = JobService(workers=1, cache_dir=cache_dir, api_key="yerel-test-anahtari")
+    http = OzetleServer(("127.0.0.1", 0), service)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    yield http
+    http.shutdown()
+    http.server_close()
+    service.close()
+
+
+def test_job_runs_to_done_and_events_replay(server):
+    status, body = _request(server, "POST", "/jobs", {"url": URL})
+    assert status == 202 and body["state"] == JOB_QUEUED
+    job_id = body["id"]
+
+    deadline = time.monotonic() + 60 # İşçi süreci spawn ile başlar
+    while True:
+        status, body = _request(server, "GET", f"/jobs/{job_id}")
+        if body["state"] == JOB_DONE:
+            break
+        assert time.monotonic() < deadline, f"iş bitmedi: {body}"
+        time.sleep(0.1)
+    assert body["summary"] == "önbellekteki özet"
+
+    # Bitmiş işe sonradan bağlanan SSE istemcisi geçmişi alır ve akış kapanır
+    with urllib.request.urlopen(f"{server.url}/jobs/{job_id}/events", timeout=10) as response:
+        events = [line[len("event: "):] for line in response.read().decode("utf-8").splitlines()
+                  if line.startswith("event: ")]
+    assert events[0] == "job" and "result" in events
+
+    health = _request(server, "GET", "/health")[1]
+    assert health["workers"] == 1 and health["jobs"][JOB_DONE] >= 1
+
+
+def test_invalid_requests_are_rejected(server):
+    assert _request(server, "POST", "/jobs", {})[0] == 400
+    assert _request(server, "POST", "/jobs", {"url": URL, "caption_policy": "yok"})[0] == 400
+    assert _request(server, "GET", "/jobs/999")[0] == 404
+    assert _request(server, "POST", "/jobs/999/cancel")[0] == 404
+
+
+def test_server_job_hides_transcript_unless_requested():
+    job = ServerJob(1, {"url": URL})
+    job.state, job.partial_summary = JOB_RUNNING, "kısmi"
+    assert job.to_dict()["partial_summary"] == "kısmi"
+    job.state = JOB_DONE
+    job.record = {"summary": "özet", "transcript": "metin", "segments": []}
+    assert "transcript" not in job.to_dict()
+    assert job.to_dict(include_transcript=True)["transcript"] == "metin"
+    assert job.to_dict()["partial_summary"] is None
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("torch", "whisper", "google.generativeai", "yt_dlp", "numpy")
+
+
+def _run(code, cwd):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True,
+                            timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_pipeline_modules_do_not_import_heavy_libraries(tmp_path):
+    loaded = _run("import sys, cli, scheduler, server, remote, downloader, transcriber, summarizer, video_store\n"
+                  f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))", str(tmp_path))
+    assert loaded == ""
+
+
+def test_gui_import_builds_no_services(tmp_path):
+    pytest.importorskip("customtkinter")
+    # Spawn işçileri ana modülü yeniden içe aktarır; önbellek/arşiv/zamanlayıcı orada kurulmamalı
+    # Pencereden önce yalnızca arayüz kütüphanesi yüklenir; ağır modüller warm_up() ile arka planda gelir
+    output = _run("import sys, main_gui\n"
+                  "print(main_gui.result_cache, main_gui.video_store, main_gui.scheduler)\n"
+                  f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))", str(tmp_path))
+    assert output == "None None None"
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,21 @@
+from summarizer import summarize_text
+
+
+def test_summary_chunks_are_streamed_and_match_result(fake_gemini):
+    chunks = []
+    summary, error = summarize_text("Bu kısa bir transkript. İki cümleden oluşuyor.", "ANAHTAR", "en",
+                                    on_chunk=chunks.append)
+    assert error is None
+    assert len(chunks) > 1
+    assert "".join(chunks) == summary
+
+
+def test_summary_without_on_chunk_is_not_streamed(fake_gemini):
+    summary, error = summarize_text("Bu kısa bir transkript.", "ANAHTAR", "en")
+    assert error is None and summary.startswith("Sahte özet")
+
+
+def test_missing_api_key_is_reported_before_any_request(fake_gemini):
+    summary, error = summarize_text("Bu kısa bir transkript.", "", "en")
+    assert summary is None and error
+    assert fake_gemini.request_count == 0
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from transcriber import (SAMPLE_RATE, _apply_vad, _restore_timestamps, _to_original_time, compress_silence,
+                         detect_speech)
+
+
+def _speech_like(seconds, rng):
+    """Hece ritminde (4 Hz) açılıp kapanan, konuşma bandında harmonikli ses."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voiced = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((200, 400, 600, 800), start=1))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    return (0.3 * voiced * envelope + 0.001 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def _quiet(seconds, rng):
+    return (0.001 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def _regions_seconds(regions):
+    return [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in regions]
+
+
+def test_detect_speech_finds_speech_between_silences():
+    rng = np.random.default_rng(0)
+    audio = np.concatenate([_quiet(3, rng), _speech_like(4, rng), _quiet(3, rng)])
+    regions = _regions_seconds(detect_speech(audio))
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert 2.5 <= start <= 3.2 and 6.8 <= end <= 7.5
+
+
+def test_detect_speech_skips_steady_tone():
+    rng = np.random.default_rng(0)
+    t = np.arange(5 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32) # Müzik yatağı gibi durağan
+    audio = np.concatenate([_quiet(2, rng), tone, _quiet(2, rng)])
+    # Yalnızca başlangıç/bitiş geçişleri dalgalanır; tonun içi konuşma sayılmaz
+    assert all(end <= 3.0 or start >= 6.0 for start, end in _regions_seconds(detect_speech(audio)))
+
+
+def _timeline():
+    audio = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+    regions = [(1 * SAMPLE_RATE, 3 * SAMPLE_RATE), (6 * SAMPLE_RATE, 8 * SAMPLE_RATE)]
+    return compress_silence(audio, regions, gap_seconds=0.5)
+
+
+def test_compress_silence_joins_regions_with_gaps():
+    compressed, _ = _timeline()
+    assert len(compressed) == int(4.5 * SAMPLE_RATE)
+    assert compressed[0] == 1 * SAMPLE_RATE # İlk bölgenin ilk örneği
+    assert compressed[int(2.5 * SAMPLE_RATE)] == 6 * SAMPLE_RATE # Boşluktan sonra ikinci bölge
+
+
+@pytest.mark.parametrize("t, is_start, expected", [
+    (0.0, True, 1.0),
+    (1.5, False, 2.5),
+    (2.2, True, 6.0), # Boşlukta başlayan segment sonraki bölgeye
+    (2.2, False, 3.0), # Boşlukta biten segment bu bölgenin sonuna
+    (3.0, True, 6.5),
+    (5.0, False, 8.0), # Son bölgenin ötesi sona kırpılır
+])
+def test_to_original_time(t, is_start, expected):
+    _, timeline = _timeline()
+    assert _to_original_time(t, timeline, is_start) == pytest.approx(expected)
+
+
+def test_restore_timestamps_maps_segments_back():
+    _, timeline = _timeline()
+    result = {"segments": [{"start": 0.2, "end": 1.9, "text": "a"}, {"start": 2.1, "end": 4.0, "text": "b"}]}
+    _restore_timestamps(result, timeline)
+    assert [(seg["start"], seg["end"]) for seg in result["segments"]] == [
+        pytest.approx((1.2, 2.9)), pytest.approx((6.0, 7.5))]
+
+
+def test_apply_vad_keeps_audio_without_speech():
+    audio = np.zeros(3 * SAMPLE_RATE, dtype=np.float32)
+    kept, timeline = _apply_vad(audio, None)
+    assert timeline is None and kept is audio
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from video_store import VideoStore, export_text, format_timestamp, timestamp_url
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = VideoStore(str(tmp_path / "arsiv.db"))
+    yield store
+    store.close()
+
+
+def _record(video_id, title, summary=None, segments=None, **fields):
+    return {"video_id": video_id, "url": f"https://www.youtube.com/watch?v={video_id}", "title": title,
+            "language": "tr", "source": "manual", "transcript": None, "summary": summary,
+            "segments": segments, "stages": {"summarize": {"status": "done"}}, **fields}
+
+
+def test_search_matches_title_summary_and_timestamped_segments(store):
+    store.save_many([
+        _record("v1", "Güneş enerjisi", summary="Paneller ve verim anlatılıyor.",
+                segments=[{"start": 0.0, "end": 5.0, "text": " Giriş"},
+                          {"start": 95.0, "end": 99.0, "text": " İnvertör seçimi önemlidir"}]),
+        _record("v2", "Deniz kirliliği", summary="Plastik atıklar."),
+    ])
+    results = store.search("invertör") # Aksan duyarsız
+    assert [(r["video_id"], r["start"]) for r in results] == [("v1", 95.0)]
+    assert "[İnvertör]" in results[0]["snippet"]
+
+    results = store.search("plast") # Önek araması
+    assert [(r["video_id"], r["start"]) for r in results] == [("v2", None)]
+
+
+def test_search_ignores_fts_syntax_characters(store):
+    store.save_many([_record("v1", "C++ ve \"AND\" operatörü", summary="Dil özellikleri")])
+    assert [r["video_id"] for r in store.search('c++ "AND" (')] == ["v1"]
+    assert store.search("  ...  ") == []
+
+
+def test_update_keeps_old_fields_and_reindexes(store):
+    store.save_many([_record("v1", "Eski başlık", summary="İlk özet",
+                             segments=[{"start": 1.0, "end": 2.0, "text": " merhaba"}])])
+    store.save_many([_record("v1", "Yeni başlık", summary=None)])
+    video = store.get("v1")
+    assert video["title"] == "Yeni başlık"
+    assert video["summary"] == "İlk özet" # None alanlar mevcut değeri silmez
+    assert [seg["text"] for seg in video["segments"]] == ["merhaba"]
+    assert store.search("eski") == []
+    assert [r["video_id"] for r in store.search("yeni")] == ["v1"]
+    assert store.count() == 1
+
+
+def test_put_writes_in_background(store):
+    for i in range(5):
+        store.put(_record(f"v{i}", f"Video {i}"))
+    store.flush()
+    assert store.count() == 5
+
+
+def test_bad_record_does_not_stop_later_writes(store):
+    store.put(_record("v1", "Önceki"))
+    store.put({"video_id": "bad", "stages": {"x": object()}}) # json.dumps TypeError
+    store.put(_record("v2", "Sonraki"))
+
+    # Yazma thread'i ölürse flush() sonsuza dek bekler; testi kilitlememesi için ayrı thread'de
+    flushed = threading.Thread(target=store.flush, daemon=True)
+    flushed.start()
+    flushed.join(timeout=5)
+    assert not flushed.is_alive()
+    store.put(_record("v3", "En son"))
+    store.flush()
+    assert store.count() == 3
+    assert store.get("bad") is None
+
+
+def test_export_and_timestamp_helpers(store):
+    store.save_many([_record("v1", "Başlık", summary="Özet",
+                             segments=[{"start": 3725.0, "end": 3730.0, "text": " son"}])])
+    text = export_text(store.get("v1"))
+    assert text.startswith("Başlık\n")
+    assert "[1:02:05] son" in text
+    assert format_timestamp(65) == "01:05"
+    assert timestamp_url("v1", 65.7) == "https://www.youtube.com/watch?v=v1&t=65s"
@@ -1,14 +1,908 @@
 # transcriber.py
-import whisper # openai-whisper kütüphanesi
 import os
+import time
 import logging
+import functools
+import threading
+import multiprocessing
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# numpy (ve torch/whisper) modül yüklenirken değil, kullanan fonksiyonlarda içe aktarılır (arayüz açılışı)
+from model_registry import get_model, use_model, resolve_precision
+from audio_stream import SAMPLE_RATE, PcmStream, probe_duration # SAMPLE_RATE: whisper.audio ile aynı (16 kHz)
+from metrics import metrics
+from journal import TranscriptJournal
 
 # Logger (downloader.py ile aynı formatı kullanabilir)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def transcribe_audio(audio_path, model_name="base", delete_audio=True):
+# Parçalı (chunked) mod varsayılanları
+DEFAULT_CHUNK_SECONDS = 300 # Her parçanın hedef uzunluğu (saniye)
+DEFAULT_OVERLAP_SECONDS = 2 # Parçaların kesim noktasının iki yanındaki örtüşme (saniye)
+CUT_SEARCH_SECONDS = 5 # Kesim noktası hedefin +/- bu kadar saniyesinde aranır
+ENERGY_FRAME_SECONDS = 0.02 # Enerji hesaplaması için çerçeve uzunluğu
+
+# CPU çıkarım motoru ön ayarları: model hassasiyeti ve hız/doğruluk dengesi
+# kuran çözümleme (decoding) seçenekleri. "default", Whisper'ın kendi
+# varsayılanlarıdır (fp32, açgözlü çözümleme, 0.0-1.0 arası sıcaklık geri dönüşü).
+ENGINE_PRESETS = {
+    "default": {"precision": "fp32"},
+    "accurate": {"precision": "fp32", "beam_size": 5, "best_of": 5}, # Işın araması; en yavaş
+    "int8": {"precision": "int8"}, # Linear katmanları int8; çözümleme varsayılan
+    "fast": {"precision": "int8", "best_of": 1, "temperature": (0.0, 0.5, 1.0)}, # Daha az geri dönüş denemesi
+}
+DEFAULT_ENGINE = "default"
+DECODE_OPTION_KEYS = ("beam_size", "best_of", "temperature") # model.transcribe'a iletilen ayarlar
+INTEROP_THREADS = 1 # Whisper'da bağımsız operatör paralelliği az; çekirdekler intra-op'a bırakılır
+
+# Ses etkinliği algılama (VAD) varsayılanları: sessizlik ve müzik Whisper'a verilmeden atlanır
+VAD_FRAME_SECONDS = 0.03 # Analiz çerçevesi (480 örnek)
+VAD_BLOCK_FRAMES = 8192 # FFT bellek kullanımını sınırlamak için tek seferde işlenen çerçeve sayısı
+VAD_SPEECH_BAND_HZ = (100, 4000) # Konuşma enerjisinin yoğunlaştığı frekans bandı
+VAD_MODULATION_SECONDS = 1.0 # Enerji dalgalanmasının ölçüldüğü pencere (hece ritmi ~4 Hz)
+VAD_DEFAULTS = {
+    "energy_margin_db": 10.0, # Gürültü tabanının (10. yüzdelik) bu kadar üstü konuşma adayıdır
+    "min_energy_db": -50.0, # Bunun altındaki çerçeveler her durumda sessizliktir
+    "band_ratio": 0.6, # Konuşma bandındaki enerjinin toplama oranı en az bu kadar olmalı
+    "max_flatness": 0.4, # Spektral düzlük (gürültü ~0.5+, konuşma/ton daha düşük) en fazla bu kadar
+    "min_modulation_db": 4.0, # Enerjinin 1 sn'deki std'si; konuşma hecelerle dalgalanır, müzik yatağı düzdür
+    "min_speech_seconds": 0.25, # Daha kısa konuşma bölgeleri atılır
+    "min_silence_seconds": 0.5, # Daha kısa boşluklar konuşmanın parçası sayılır
+    "pad_seconds": 0.2, # Bölgelerin iki yanına eklenen pay (kelime başı/sonu kesilmesin)
+    "gap_seconds": 0.3, # Sıkıştırılmış seste bölgeler arasına konan sessizlik
+}
+
+TRANSCRIPTION_CANCELLED_MESSAGE = "Transkript iptal edildi."
+
+
+class TranscriptionCancelled(Exception):
+    """is_cancelled() True döndü; transkript pencere/parça/yığın arasında durduruldu."""
+
+
+def _check_cancelled(is_cancelled):
+    if is_cancelled and is_cancelled():
+        raise TranscriptionCancelled()
+
+
+def _find_cut_points(audio, chunk_seconds, search_seconds=CUT_SEARCH_SECONDS):
+    """
+    Sesi yaklaşık chunk_seconds uzunluğunda parçalara bölmek için kesim
+    noktalarını (örnek indeksi) bulur. Her kesim, hedef noktanın çevresindeki
+    en düşük enerjili çerçeveye yerleştirilir (kelimelerin ortasından kesmemek için).
+    İlk eleman 0, son eleman len(audio) olur.
+    """
+    import numpy as np
+    frame = max(1, int(ENERGY_FRAME_SECONDS * SAMPLE_RATE))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [0, len(audio)]
+
+    # Çerçeve başına RMS enerji (vektörel)
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+
+    cuts = [0]
+    chunk_frames = int(chunk_seconds * SAMPLE_RATE) // frame
+    search_frames = int(search_seconds * SAMPLE_RATE) // frame
+    target = chunk_frames
+    # Son parça çok kısa kalmasın diye yarım parça payı bırakılır
+    while target + chunk_frames // 2 < n_frames:
+        lo = max(cuts[-1] // frame + 1, target - search_frames)
+        hi = min(n_frames, target + search_frames + 1)
+        best = lo + int(np.argmin(energy[lo:hi]))
+        cuts.append(best * frame)
+        target = best + chunk_frames
+    cuts.append(len(audio))
+    return cuts
+
+
+def resolve_engine(engine=None, precision="fp32"):
+    """
+    Motor ön ayarını (ENGINE_PRESETS'teki ad veya aynı anahtarları taşıyan
+    sözlük) çözümler. Dönüş: (hassasiyet, model.transcribe çözümleme seçenekleri).
+    """
+    if engine is None:
+        return precision, {}
+    if isinstance(engine, str):
+        if engine not in ENGINE_PRESETS:
+            raise ValueError(f"Bilinmeyen Whisper motoru: {engine} (seçenekler: {', '.join(ENGINE_PRESETS)})")
+        engine = ENGINE_PRESETS[engine]
+    decode_options = {key: engine[key] for key in DECODE_OPTION_KEYS if engine.get(key) is not None}
+    if "temperature" in decode_options and not isinstance(decode_options["temperature"], (int, float)):
+        decode_options["temperature"] = tuple(decode_options["temperature"])
+    return engine.get("precision", precision), decode_options
+
+
+_interop_configured = False
+
+
+def configure_torch_threads(threads=None, interop_threads=INTEROP_THREADS):
+    """
+    torch'un thread sayılarını açıkça ayarlar (süreç geneli). Aynı süreçte
+    eşzamanlı çalışan her transkript kendi intra-op thread takımını
+    kullandığından, çekirdekleri aşmamak için threads = çekirdek / eşzamanlı iş
+    verilmelidir. Inter-op sayısı torch paralel iş yapmadan önce bir kez ayarlanabilir.
+    """
+    global _interop_configured
+    import torch
+    threads = threads or os.cpu_count() or 1
+    if not _interop_configured:
+        _interop_configured = True
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            logging.debug(f"torch inter-op thread sayısı ayarlanamadı: {e}")
+    if torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+    return threads
+
+
+def _frame_features(audio, frame):
+    """Çerçeve başına enerji (dB), konuşma bandı oranı ve spektral düzlük (vektörel, blok blok)."""
+    import numpy as np
+    n_frames = len(audio) // frame
+    freqs = np.fft.rfftfreq(frame, 1 / SAMPLE_RATE)
+    band = (freqs >= VAD_SPEECH_BAND_HZ[0]) & (freqs <= VAD_SPEECH_BAND_HZ[1])
+    window = np.hanning(frame).astype(np.float32)
+    energy_db = np.empty(n_frames, dtype=np.float32)
+    band_ratio = np.empty(n_frames, dtype=np.float32)
+    flatness = np.empty(n_frames, dtype=np.float32)
+    for lo in range(0, n_frames, VAD_BLOCK_FRAMES):
+        hi = min(n_frames, lo + VAD_BLOCK_FRAMES)
+        frames = audio[lo * frame:hi * frame].reshape(hi - lo, frame)
+        energy_db[lo:hi] = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2 + 1e-12
+        total = power.sum(axis=1)
+        band_ratio[lo:hi] = power[:, band].sum(axis=1) / total
+        flatness[lo:hi] = np.exp(np.mean(np.log(power), axis=1)) / (total / power.shape[1])
+    return energy_db, band_ratio, flatness
+
+
+def _energy_modulation(energy_db, frames):
+    """Her çerçevenin çevresindeki pencerede enerjinin (dB) standart sapması (kümülatif toplamlarla)."""
+    import numpy as np
+    half = frames // 2
+    padded = np.pad(energy_db.astype(np.float64), half, mode="edge")
+    csum = np.concatenate(([0.0], np.cumsum(padded)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(padded * padded)))
+    width = 2 * half + 1
+    idx = np.arange(len(energy_db))
+    mean = (csum[idx + width] - csum[idx]) / width
+    mean_sq = (csum_sq[idx + width] - csum_sq[idx]) / width
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def _runs(mask):
+    """Boolean dizideki ardışık True bölgeleri: (başlangıç, bitiş) dizileri (bitiş hariç)."""
+    import numpy as np
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_speech(audio, **options):
+    """
+    16 kHz sesteki konuşma bölgelerini bulur. Bir çerçeve; enerjisi gürültü
+    tabanının yeterince üstünde, enerjisi konuşma bandında yoğun, spektrumu
+    gürültü gibi düz değilse ve enerjisi hece ritmiyle dalgalanıyorsa (müzik
+    yatağı gibi durağan değilse) konuşmadır. Kısa boşluklar doldurulur, kısa
+    bölgeler atılır, bölgelere pay eklenir. Eşikler VAD_DEFAULTS anahtarlarıyla
+    değiştirilebilir. Dönüş: [(başlangıç_örneği, bitiş_örneği), ...]
+    """
+    import numpy as np
+    opts = {**VAD_DEFAULTS, **options}
+    frame = int(VAD_FRAME_SECONDS * SAMPLE_RATE)
+    if len(audio) < frame:
+        return [(0, len(audio))]
+    energy_db, band_ratio, flatness = _frame_features(audio, frame)
+    threshold = max(opts["min_energy_db"], float(np.percentile(energy_db, 10)) + opts["energy_margin_db"])
+    modulation = _energy_modulation(energy_db, int(VAD_MODULATION_SECONDS / VAD_FRAME_SECONDS))
+    speech = ((energy_db > threshold) & (band_ratio >= opts["band_ratio"]) & (flatness <= opts["max_flatness"])
+              & (modulation >= opts["min_modulation_db"]))
+
+    # Kısa sessizlikleri konuşmaya kat, ardından kısa konuşma parçalarını at
+    starts, ends = _runs(~speech)
+    short_gaps = (ends - starts) < opts["min_silence_seconds"] / VAD_FRAME_SECONDS
+    for start, end in zip(starts[short_gaps], ends[short_gaps]):
+        if start > 0 and end < len(speech): # Baştaki/sondaki sessizlik korunur
+            speech[start:end] = True
+    starts, ends = _runs(speech)
+    keep = (ends - starts) >= opts["min_speech_seconds"] / VAD_FRAME_SECONDS
+    pad = int(opts["pad_seconds"] * SAMPLE_RATE)
+
+    regions = []
+    for start, end in zip(starts[keep] * frame, ends[keep] * frame):
+        start, end = max(0, start - pad), min(len(audio), end + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end) # Paylar çakışıyorsa birleştir
+        else:
+            regions.append((int(start), int(end)))
+    return regions
+
+
+def compress_silence(audio, regions, gap_seconds=VAD_DEFAULTS["gap_seconds"]):
+    """
+    Yalnızca konuşma bölgelerini, aralarına kısa sessizlik koyarak birleştirir.
+    Dönüş: (sıkıştırılmış ses, zaman eşlemesi). Eşleme; her bölgenin sıkıştırılmış
+    ve orijinal başlangıcı ile uzunluğunu (saniye) tutan dizilerdir.
+    """
+    import numpy as np
+    gap = np.zeros(int(gap_seconds * SAMPLE_RATE), dtype=audio.dtype)
+    pieces = []
+    compressed_starts, original_starts, lengths = [], [], []
+    position = 0
+    for start, end in regions:
+        if pieces:
+            pieces.append(gap)
+            position += len(gap)
+        pieces.append(audio[start:end])
+        compressed_starts.append(position / SAMPLE_RATE)
+        original_starts.append(start / SAMPLE_RATE)
+        lengths.append((end - start) / SAMPLE_RATE)
+        position += end - start
+    timeline = (np.array(compressed_starts), np.array(original_starts), np.array(lengths))
+    return np.concatenate(pieces) if pieces else audio[:0], timeline
+
+
+def _to_original_time(t, timeline, is_start):
+    """Sıkıştırılmış sesteki zamanı orijinal zaman çizgisine çevirir."""
+    import numpy as np
+    compressed_starts, original_starts, lengths = timeline
+    i = max(0, int(np.searchsorted(compressed_starts, t, side="right")) - 1)
+    offset = t - compressed_starts[i]
+    if offset > lengths[i]:
+        # Eklenen boşluğa düşen zaman: başlangıçsa sonraki bölgeye, bitişse bu bölgenin sonuna
+        if is_start and i + 1 < len(original_starts):
+            return float(original_starts[i + 1])
+        offset = lengths[i]
+    return float(original_starts[i] + offset)
+
+
+def _restore_timestamps(result, timeline):
+    """Whisper sonucundaki segment zamanlarını orijinal sese göre düzeltir."""
+    for seg in result["segments"]:
+        seg["start"] = _to_original_time(seg["start"], timeline, is_start=True)
+        seg["end"] = max(seg["start"], _to_original_time(seg["end"], timeline, is_start=False))
+    return result
+
+
+def _apply_vad(audio, vad_options):
+    """
+    Sesi konuşma bölgelerine indirger. Dönüş: (ses, zaman eşlemesi veya None).
+    Konuşma bulunamazsa (eşikler sese uymuyorsa) ses olduğu gibi kullanılır.
+    """
+    options = dict(vad_options or {})
+    gap_seconds = options.pop("gap_seconds", VAD_DEFAULTS["gap_seconds"])
+    regions = detect_speech(audio, **options)
+    if not regions:
+        logging.warning("VAD konuşma bulamadı; ses kırpılmadan yazıya dökülecek.")
+        return audio, None
+    compressed, timeline = compress_silence(audio, regions, gap_seconds)
+    total_seconds = len(audio) / SAMPLE_RATE
+    skipped_seconds = max(0.0, total_seconds - len(compressed) / SAMPLE_RATE)
+    metrics.observe("whisper_vad_skipped_seconds", skipped_seconds)
+    metrics.observe("whisper_vad_skipped_ratio", skipped_seconds / total_seconds if total_seconds else 0.0)
+    logging.info(f"VAD: {len(regions)} konuşma bölgesi; {total_seconds:.1f} sn sesin "
+                 f"{skipped_seconds:.1f} sn'si atlandı.")
+    return compressed, timeline
+
+
+# --- Parçalı mod işçi süreci ---
+_worker_model = None
+
+
+def _chunk_worker_init(model_name, device, precision, torch_threads):
+    """İşçi süreci başlatılırken modeli bir kez yükler (süreç ömrü boyunca kalır)."""
+    global _worker_model
+    configure_torch_threads(torch_threads)
+    _worker_model = get_model(model_name, device=device, precision=precision)
+
+
+# Parçalı mod işçi havuzları uygulama boyunca yaşar: işçiler torch'u ve modeli bir kez yükler,
+# sonraki videolar hazır işçilerle başlar. anahtar -> [havuz, kullanan iş sayısı]
+_chunk_pools = {}
+_chunk_pools_lock = threading.Lock()
+
+
+@contextmanager
+def _chunk_pool(model_name, device, precision, workers, torch_threads):
+    """
+    Ayarlara uygun kalıcı işçi havuzunu (ilk kullanımda oluşturarak) ödünç verir.
+    Aynı ayarlı eşzamanlı işler havuzu paylaşır; kullanılmayan farklı ayarlı
+    havuzlar kapatılır (her işçi modeli bellekte tutar). Çöken havuz atılır.
+    """
+    key = (model_name, device, precision, workers, torch_threads)
+    with _chunk_pools_lock:
+        for other in [k for k, (_, users) in _chunk_pools.items() if k != key and not users]:
+            _chunk_pools.pop(other)[0].shutdown(wait=False)
+        entry = _chunk_pools.get(key)
+        if entry is None:
+            # torch ile fork güvenli değil; işçiler 'spawn' ile başlatılır
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_chunk_worker_init,
+                                       initargs=(model_name, device, precision, torch_threads))
+            entry = _chunk_pools[key] = [pool, 0]
+        entry[1] += 1
+    try:
+        yield entry[0]
+    except BrokenProcessPool:
+        with _chunk_pools_lock:
+            if _chunk_pools.get(key) is entry:
+                del _chunk_pools[key]
+        raise
+    finally:
+        with _chunk_pools_lock:
+            entry[1] -= 1
+
+
+def shutdown_chunk_pools():
+    """Parçalı mod işçi havuzlarını kapatır (örn. uygulama kapanırken)."""
+    with _chunk_pools_lock:
+        pools = [pool for pool, _ in _chunk_pools.values()]
+        _chunk_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _transcribe_chunk(index, samples, offset_seconds, fp16, decode_options):
+    """Bir ses parçasını yazıya döker; zaman damgalarını orijinal zaman çizgisine kaydırır."""
+    result = _worker_model.transcribe(samples, fp16=fp16, **decode_options)
+    segments = [
+        {
+            "start": seg["start"] + offset_seconds,
+            "end": seg["end"] + offset_seconds,
+            "text": seg["text"],
+        }
+        for seg in result["segments"]
+    ]
+    return index, result["language"], segments
+
+
+def _stitch_segments(chunk_results, cuts):
+    """
+    Parça sonuçlarını sırayla birleştirir. Örtüşme bölgelerindeki tekrarları
+    önlemek için her parçadan yalnızca orta noktası kendi [kesim_i, kesim_i+1)
+    aralığına düşen segmentler alınır.
+    """
+    stitched = []
+    for index, segments in sorted(chunk_results, key=lambda r: r[0]):
+        own_start = cuts[index] / SAMPLE_RATE
+        own_end = cuts[index + 1] / SAMPLE_RATE
+        for seg in segments:
+            mid = (seg["start"] + seg["end"]) / 2
+            if not (own_start <= mid < own_end):
+                continue
+            # Sınırda aynı metin iki parçada da çıkmışsa tekrar ekleme
+            if stitched and stitched[-1]["text"].strip() == seg["text"].strip() \
+                    and seg["start"] < stitched[-1]["end"]:
+                continue
+            stitched.append(seg)
+    return stitched
+
+
+def _record_transcription(audio_seconds, decode_seconds, model_name, mode):
+    """Ses süresi, çözümleme süresi ve gerçek zaman faktörünü (RTF) ölçüm katmanına ekler."""
+    if audio_seconds <= 0:
+        return
+    metrics.observe("whisper_audio_seconds", audio_seconds, model=model_name, mode=mode)
+    metrics.observe("whisper_decode_seconds", decode_seconds, model=model_name, mode=mode)
+    metrics.observe("whisper_rtf", decode_seconds / audio_seconds, model=model_name, mode=mode)
+
+
+def _emit_estimate(audio_seconds, model_name, mode):
+    """Bu süreçte ölçülen ortalama RTF'den beklenen transkript süresini yayınlar (ETA için)."""
+    rtf = metrics.average("whisper_rtf", model=model_name, mode=mode)
+    metrics.emit("estimate", audio_seconds=round(audio_seconds, 1),
+                 expected_seconds=round(audio_seconds * rtf, 1) if rtf else None)
+
+
+def _transcribe_chunked(audio_path, model_name, device, precision, workers, chunk_seconds, overlap_seconds,
+                        decode_options, vad=False, vad_options=None, journal=None, is_cancelled=None):
+    """
+    Sesi düşük enerjili noktalardan örtüşen parçalara böler, parçaları
+    her biri kendi Whisper modelini tutan işçi süreçlerine dağıtır ve
+    sonuçları sırayla birleştirir. vad=True ise önce konuşma dışı bölümler atılır.
+    journal verilirse biten her parça günlüğe yazılır ve günlükteki parçalar atlanır.
+    is_cancelled() her parça sonucundan önce sorulur (bkz. TranscriptionCancelled).
+    """
+    from whisper.audio import load_audio # torch'u içe aktarır; modül yüklenirken değil ilk kullanımda
+    audio = load_audio(audio_path)
+    _emit_estimate(len(audio) / SAMPLE_RATE, model_name, "chunked")
+    timeline = None
+    if vad:
+        audio, timeline = _apply_vad(audio, vad_options)
+    result = _transcribe_chunks(audio, model_name, device, precision, workers, chunk_seconds, overlap_seconds,
+                                decode_options, journal, is_cancelled)
+    return _restore_timestamps(result, timeline) if timeline else result
+
+
+def _transcribe_chunks(audio, model_name, device, precision, workers, chunk_seconds, overlap_seconds,
+                       decode_options, journal=None, is_cancelled=None):
+    cuts = _find_cut_points(audio, chunk_seconds)
+    n_chunks = len(cuts) - 1
+    fp16 = precision == "fp16"
+
+    if n_chunks < 2:
+        # Tek parça: süreç havuzu kurmaya değmez
+        logging.info("Ses tek parçaya sığıyor, sıralı transkripte geçiliyor.")
+        with use_model(model_name, device=device, precision=precision) as model:
+            return model.transcribe(audio, fp16=fp16, **decode_options)
+
+    language_votes = Counter()
+    chunk_results = []
+    # Önceki çalıştırmada tamamlanan parçalar günlükten alınır
+    for entry in (journal.entries if journal else []):
+        index = entry["unit"]
+        language_votes[entry["language"]] += cuts[index + 1] - cuts[index]
+        chunk_results.append((index, entry["segments"]))
+    done_indices = {index for index, _ in chunk_results}
+    pending = [i for i in range(n_chunks) if i not in done_indices]
+    if done_indices:
+        logging.info(f"Transkripte kaldığı yerden devam ediliyor: {len(done_indices)}/{n_chunks} parça hazır.")
+    if not pending:
+        return _chunk_result(chunk_results, cuts, language_votes)
+
+    # İşçi sayısı parça sayısına göre kırpılmaz; havuz sonraki videolarda aynı ayarlarla yeniden kullanılır
+    workers = workers or max(1, (os.cpu_count() or 1) // 2)
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    logging.info(f"Parçalı transkript: {n_chunks} parça, {workers} işçi, işçi başına {torch_threads} thread.")
+
+    with _chunk_pool(model_name, device, precision, workers, torch_threads) as pool:
+        futures = []
+        for i in pending:
+            start = max(0, cuts[i] - overlap)
+            end = min(len(audio), cuts[i + 1] + overlap)
+            futures.append(pool.submit(_transcribe_chunk, i, audio[start:end], start / SAMPLE_RATE, fp16,
+                                       decode_options))
+        try:
+            for done, future in enumerate(futures, start=len(done_indices) + 1):
+                _check_cancelled(is_cancelled)
+                index, language, segments = future.result()
+                if journal:
+                    journal.record(unit=index, language=language, segments=segments)
+                metrics.progress(done / n_chunks, chunks_done=done, chunks_total=n_chunks)
+                # Dil, parça süresine göre ağırlıklı oylama ile belirlenir
+                language_votes[language] += cuts[index + 1] - cuts[index]
+                chunk_results.append((index, segments))
+        finally:
+            # Hata olursa bu işin başlamamış parçaları paylaşılan havuzda yer tutmasın
+            for future in futures:
+                future.cancel()
+
+    return _chunk_result(chunk_results, cuts, language_votes)
+
+
+def _chunk_result(chunk_results, cuts, language_votes):
+    segments = _stitch_segments(sorted(chunk_results, key=lambda r: r[0]), cuts)
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language_votes.most_common(1)[0][0],
+    }
+
+
+# Akış (streaming) modu varsayılanları
+DEFAULT_WINDOW_SECONDS = 30 # Whisper'ın doğal pencere uzunluğu
+PROMPT_TAIL_CHARS = 200 # Bir sonraki pencereye bağlam olarak verilen önceki metin
+
+
+def _transcribe_windows(model, blocks, fp16, window_seconds=DEFAULT_WINDOW_SECONDS,
+                        on_segment=None, start_seconds=0.0, language=None, total_seconds=None,
+                        decode_options=None, vad=False, vad_options=None, prior_segments=None, on_window=None,
+                        is_cancelled=None):
+    """
+    PCM bloklarını biriktirip pencere pencere yazıya döker; ses bittiğini
+    beklemeden ilk pencereden itibaren segment üretir. Penceredeki son segment
+    kesik olabileceğinden, ses bitmediyse bu segmentin başından itibaren kalan
+    ses bir sonraki pencereye aktarılır. Bellekte yalnızca mevcut pencere tutulur.
+    total_seconds biliniyorsa her pencereden sonra ilerleme bildirilir.
+    vad=True ise konuşma içermeyen pencereler çözümlenmeden atlanır.
+    Kaldığı yerden devam için blocks start_seconds'tan başlamalı ve önceki
+    segmentler prior_segments ile verilmelidir. on_window(konum, segmentler, dil)
+    her pencere tamamlandığında, işlenen sesin bittiği konumla çağrılır.
+    is_cancelled() her pencereden önce sorulur (bkz. TranscriptionCancelled).
+    """
+    import numpy as np
+    window = int(window_seconds * SAMPLE_RATE)
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_start = start_seconds # buffer[0]'ın orijinal zaman çizgisindeki konumu
+    segments = list(prior_segments or [])
+
+    vad_detect_options = {k: v for k, v in (vad_options or {}).items() if k != "gap_seconds"}
+    skipped_seconds = 0.0
+
+    def run(samples, final):
+        nonlocal language, skipped_seconds
+        _check_cancelled(is_cancelled)
+        if vad and not detect_speech(samples, **vad_detect_options):
+            skipped_seconds += len(samples) / SAMPLE_RATE # Pencerenin tamamı sessizlik/müzik
+            if on_window:
+                on_window(buffer_start + len(samples) / SAMPLE_RATE, [], language)
+            return len(samples) / SAMPLE_RATE
+        prompt = "".join(seg["text"] for seg in segments)[-PROMPT_TAIL_CHARS:] or None
+        result = model.transcribe(samples, fp16=fp16, language=language, initial_prompt=prompt,
+                                  condition_on_previous_text=False, **(decode_options or {}))
+        language = language or result["language"]
+        window_segments = result["segments"]
+        consumed = len(samples) / SAMPLE_RATE
+        if not final and len(window_segments) > 1 and window_segments[-1]["start"] > 1.0:
+            consumed = window_segments[-1]["start"]
+            window_segments = window_segments[:-1]
+        new_segments = []
+        for seg in window_segments:
+            if seg["start"] >= consumed:
+                continue
+            segment = {
+                "start": buffer_start + seg["start"],
+                "end": buffer_start + min(seg["end"], consumed),
+                "text": seg["text"],
+            }
+            new_segments.append(segment)
+            if on_segment:
+                on_segment(segment)
+        segments.extend(new_segments)
+        if on_window:
+            on_window(buffer_start + consumed, new_segments, language)
+        return consumed
+
+    for block in blocks:
+        buffer = np.concatenate([buffer, block])
+        while len(buffer) >= window:
+            consumed = run(buffer[:window], final=False)
+            buffer = buffer[int(consumed * SAMPLE_RATE):]
+            buffer_start += consumed
+            if total_seconds:
+                metrics.progress(buffer_start / total_seconds, audio_seconds_done=round(buffer_start, 1))
+    if len(buffer):
+        run(buffer, final=True)
+    if vad:
+        metrics.observe("whisper_vad_skipped_seconds", skipped_seconds)
+        logging.info(f"VAD (akış): {skipped_seconds:.1f} sn sessizlik/müzik atlandı.")
+
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language,
+    }
+
+
+# Uzun ses modu: tüm ses belleğe alınmaz (4 saatlik ses float32 olarak ~920 MB)
+LONG_AUDIO_SECONDS = 2 * 60 * 60 # Bundan uzun sesler her modda otomatik olarak "long" modda işlenir (None: kapalı)
+
+
+def _transcribe_long(audio_path, model, fp16, decode_options, vad=False, vad_options=None, total_seconds=None,
+                     journal=None, is_cancelled=None):
+    """
+    Sesi ffmpeg'den sabit boyutlu PCM blokları halinde okuyup pencere pencere
+    yazıya döker; bellekte yalnızca mevcut pencere ve devreden kısmı tutulur,
+    bu yüzden tepe bellek ses süresinden bağımsızdır. journal verilirse her
+    pencere günlüğe yazılır ve okuma günlükteki son konumdan başlar.
+    """
+    start_seconds, language, prior_segments, on_window = 0.0, None, None, None
+    if journal:
+        if journal.entries:
+            last = journal.entries[-1]
+            start_seconds, language, prior_segments = last["offset"], last["language"], journal.segments()
+            logging.info(f"Transkripte kaldığı yerden devam ediliyor: {start_seconds / 60:.1f}. dakika.")
+        on_window = lambda offset, segments, lang: journal.record(offset=offset, language=lang, segments=segments)
+    stream = PcmStream(audio_path, start_seconds=start_seconds)
+    try:
+        result = _transcribe_windows(model, stream.iter_blocks(), fp16, start_seconds=start_seconds,
+                                     language=language, total_seconds=total_seconds,
+                                     decode_options=decode_options, vad=vad, vad_options=vad_options,
+                                     prior_segments=prior_segments, on_window=on_window,
+                                     is_cancelled=is_cancelled)
+    except BaseException:
+        stream.kill()
+        raise
+    error = stream.wait()
+    if error:
+        raise RuntimeError(error)
+    return result
+
+
+def transcribe_stream(pcm_stream, model_name="base", device=None, precision="fp32",
+                      window_seconds=DEFAULT_WINDOW_SECONDS, on_segment=None, total_seconds=None,
+                      engine=None, threads=None, vad=False, vad_options=None, is_cancelled=None):
+    """
+    Akan PCM sesini (audio_stream.PcmStream) indirme sürerken yazıya döker.
+    on_segment(segment) her yeni segmentte çağrılır (ilk metin birkaç saniyede gelir).
+    total_seconds (video süresi) verilirse ilerleme ve süre tahmini yayınlanır.
+    engine, threads ve vad seçenekleri transcribe_audio'daki gibidir; akışta VAD
+    konuşma içermeyen pencereleri atlar (pencere içi sessizlik Whisper'a gider).
+    is_cancelled() True dönerse akış bir sonraki pencereden önce durdurulur.
+    Dönüş: (transkript, dil, hata) — transcribe_audio ile aynı sözleşme.
+    """
+    transcript = None
+    detected_language = None
+    error_message = None
+
+    try:
+        logging.info(f"Akış transkripti başlatılıyor (Model: {model_name}, Pencere: {window_seconds} sn)...")
+        precision, decode_options = resolve_engine(engine, precision)
+        precision = resolve_precision(precision, device)
+        configure_torch_threads(threads)
+        with use_model(model_name, device=device, precision=precision) as model, \
+                metrics.span("whisper_transcribe", model=model_name, mode="stream"):
+            if total_seconds:
+                _emit_estimate(total_seconds, model_name, "stream")
+            started = time.perf_counter()
+            result = _transcribe_windows(model, pcm_stream.iter_blocks(), precision == "fp16",
+                                         window_seconds=window_seconds, on_segment=on_segment,
+                                         total_seconds=total_seconds, decode_options=decode_options,
+                                         vad=vad, vad_options=vad_options, is_cancelled=is_cancelled)
+            error_message = pcm_stream.wait()
+        if result["segments"]:
+            _record_transcription(result["segments"][-1]["end"], time.perf_counter() - started, model_name, "stream")
+        if not error_message:
+            transcript = result["text"]
+            detected_language = result["language"]
+            logging.info(f"Akış transkripti oluşturuldu. Algılanan Dil: {detected_language}")
+        else:
+            logging.error(f"Akış transkripti yarıda kaldı: {error_message}")
+    except TranscriptionCancelled:
+        pcm_stream.kill()
+        error_message = TRANSCRIPTION_CANCELLED_MESSAGE
+        logging.info(error_message)
+    except Exception as e:
+        pcm_stream.kill()
+        error_message = f"Akış transkripti sırasında hata: {e}"
+        logging.error(error_message, exc_info=True)
+
+    return transcript, detected_language, error_message
+
+
+# Toplu (batched) mod: birden çok 30 sn'lik pencere tek seferde kodlanır/çözümlenir
+DEFAULT_BATCH_SIZE = 8 # Aynı anda işlenen pencere sayısı
+MEL_FILTERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mel_filters.npz")
+N_FFT = 400 # whisper.audio ile aynı STFT ayarları
+HOP_LENGTH = 160
+WINDOW_SAMPLES = DEFAULT_WINDOW_SECONDS * SAMPLE_RATE
+TIME_PRECISION = 0.02 # Zaman damgası token'larının çözünürlüğü (sn)
+BATCH_CUT_SEARCH_SECONDS = 3 # Pencere kesimi son bu kadar saniyedeki en sessiz noktaya yerleşir
+# whisper.transcribe varsayılanları (sıcaklık geri dönüşü ve sessiz pencere atlama)
+WHISPER_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+@functools.lru_cache(maxsize=None)
+def _mel_filters(n_mels):
+    """Paketlenen mel_filters.npz'den mel filtre bankası (n_mels x 201)."""
+    import numpy as np
+    with np.load(MEL_FILTERS_PATH, allow_pickle=False) as f:
+        return f[f"mel_{n_mels}"].astype(np.float32)
+
+
+def log_mel_batch(windows, n_mels=80):
+    """
+    Ses pencerelerinin (her biri <= 30 sn, 30 sn'ye sıfırla tamamlanır) log-mel
+    spektrogramlarını tek vektörel geçişte hesaplar. whisper.audio.log_mel_spectrogram
+    ile aynı adımlar: yansıtmalı dolgu, periyodik Hann penceresi, son çerçeve
+    atılır, log10 ve (maks - 8) kırpması. Kırpma toplu iş genelindeki maksimuma
+    göre yapılır (sıralı yolda tüm sesin maksimumu). Dönüş: (B, n_mels, 3000) float32.
+    """
+    import numpy as np
+    batch = np.zeros((len(windows), WINDOW_SAMPLES), dtype=np.float32)
+    for i, window in enumerate(windows):
+        batch[i, :min(len(window), WINDOW_SAMPLES)] = window[:WINDOW_SAMPLES]
+    padded = np.pad(batch, ((0, 0), (N_FFT // 2, N_FFT // 2)), mode="reflect")
+    frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT, axis=1)[:, ::HOP_LENGTH]
+    hann = np.hanning(N_FFT + 1)[:-1].astype(np.float32) # torch.hann_window (periyodik)
+    power = np.abs(np.fft.rfft(frames * hann, axis=-1)[:, :-1]) ** 2
+    mel = power.astype(np.float32) @ _mel_filters(n_mels).T
+    log_spec = np.log10(np.maximum(mel, 1e-10))
+    log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+    return ((log_spec + 4.0) / 4.0).transpose(0, 2, 1).astype(np.float32)
+
+
+def _window_cuts(audio, window_seconds=DEFAULT_WINDOW_SECONDS, search_seconds=BATCH_CUT_SEARCH_SECONDS):
+    """
+    Sesi en fazla window_seconds uzunluğunda pencerelere böler; her kesim
+    pencerenin son search_seconds'ındaki en düşük enerjili çerçeveye konur.
+    Dönüş: örnek indeksleri [0, ..., len(audio)].
+    """
+    import numpy as np
+    frame = max(1, int(ENERGY_FRAME_SECONDS * SAMPLE_RATE))
+    window = int(window_seconds * SAMPLE_RATE)
+    search = int(search_seconds * SAMPLE_RATE)
+    cuts = [0]
+    while len(audio) - cuts[-1] > window:
+        lo = cuts[-1] + window - search
+        n_frames = search // frame
+        frames = audio[lo:lo + n_frames * frame].reshape(n_frames, frame)
+        cuts.append(lo + int(np.argmin(np.mean(frames * frames, axis=1))) * frame)
+    cuts.append(len(audio))
+    return cuts
+
+
+def _is_silent(result):
+    return result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def _needs_fallback(result):
+    """whisper.transcribe ile aynı ölçüt: tekrarlı veya düşük olasılıklı çıktı (sessizlik hariç)."""
+    if _is_silent(result):
+        return False
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def _decode_batch(model, mel, decode_options, language, fp16):
+    """
+    Mel yığınını tek whisper.decode çağrısıyla (toplu açgözlü/ışın araması)
+    çözümler. Başarısız pencereler bir sonraki sıcaklıkla yalnız kendi aralarında
+    yeniden çözümlenir (whisper.transcribe'daki geri dönüşün toplu karşılığı).
+    """
+    import torch
+    import whisper
+    temperatures = decode_options.get("temperature", WHISPER_TEMPERATURES)
+    if isinstance(temperatures, (int, float)):
+        temperatures = (temperatures,)
+    mel_tensor = torch.from_numpy(mel).to(model.device)
+    if fp16:
+        mel_tensor = mel_tensor.half()
+
+    results = [None] * len(mel)
+    pending = list(range(len(mel)))
+    for temperature in temperatures:
+        options = {"language": language, "fp16": fp16, "temperature": temperature}
+        if temperature > 0:
+            options["best_of"] = decode_options.get("best_of")
+        else:
+            options["beam_size"] = decode_options.get("beam_size")
+        decoded = whisper.decode(model, mel_tensor[pending], whisper.DecodingOptions(**options))
+        retry = []
+        for index, result in zip(pending, decoded):
+            results[index] = result
+            if _needs_fallback(result):
+                retry.append(index)
+        pending = retry
+        if not pending:
+            break
+    return results
+
+
+def _segments_from_tokens(tokens, tokenizer, offset_seconds, duration_seconds):
+    """Zaman damgalı token dizisini segmentlere ayırır (zamanlar orijinal sese göre)."""
+    segments = []
+    start = 0.0
+    text_tokens = []
+
+    def close(end):
+        text = tokenizer.decode(text_tokens)
+        if text.strip():
+            segments.append({"start": offset_seconds + start,
+                             "end": offset_seconds + min(max(end, start), duration_seconds),
+                             "text": text})
+
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            timestamp = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+            if text_tokens:
+                close(timestamp)
+                text_tokens = []
+            start = timestamp
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    if text_tokens:
+        close(duration_seconds)
+    return segments
+
+
+def _transcribe_batched(model, audio, fp16, decode_options, batch_size=DEFAULT_BATCH_SIZE, journal=None,
+                        is_cancelled=None):
+    """
+    Sesi sessiz noktalardan <= 30 sn'lik pencerelere böler ve batch_size
+    pencereyi birlikte işler: log-mel tek geçişte hesaplanır, kodlayıcı ve
+    çözümleyici tüm yığın üzerinde çalışır. Pencereler bağımsız çözümlendiğinden
+    önceki metin bağlam olarak verilmez. Dil ilk yığında algılanır (süre ağırlıklı
+    oylama) ve sonraki yığınlarda sabitlenir. journal verilirse biten her
+    pencere günlüğe yazılır ve günlükteki pencereler atlanır. is_cancelled()
+    her yığından önce sorulur (bkz. TranscriptionCancelled).
+    """
+    from whisper.tokenizer import get_tokenizer
+    tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages, task="transcribe")
+    language = decode_options.get("language")
+    cuts = _window_cuts(audio)
+    n_windows = len(cuts) - 1
+    language_votes = Counter()
+    window_segments = {}
+    for entry in (journal.entries if journal else []):
+        i = entry["unit"]
+        language_votes[entry["language"]] += cuts[i + 1] - cuts[i]
+        window_segments[i] = entry["segments"]
+    if window_segments:
+        language = language or language_votes.most_common(1)[0][0]
+        logging.info(f"Transkripte kaldığı yerden devam ediliyor: {len(window_segments)}/{n_windows} pencere hazır.")
+    pending = [i for i in range(n_windows) if i not in window_segments]
+    for lo in range(0, len(pending), batch_size):
+        _check_cancelled(is_cancelled)
+        indices = pending[lo:lo + batch_size]
+        mel = log_mel_batch([audio[cuts[i]:cuts[i + 1]] for i in indices], model.dims.n_mels)
+        results = _decode_batch(model, mel, decode_options, language, fp16)
+        for i, result in zip(indices, results):
+            language_votes[result.language] += cuts[i + 1] - cuts[i]
+            window_segments[i] = [] if _is_silent(result) else _segments_from_tokens(
+                result.tokens, tokenizer, cuts[i] / SAMPLE_RATE, (cuts[i + 1] - cuts[i]) / SAMPLE_RATE)
+            if journal:
+                journal.record(unit=i, language=result.language, segments=window_segments[i])
+        language = language or language_votes.most_common(1)[0][0]
+        done = len(window_segments)
+        metrics.progress(done / n_windows, windows_done=done, windows_total=n_windows)
+    segments = [seg for i in range(n_windows) for seg in window_segments[i]]
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language,
+    }
+
+
+def transcript_cache_params(model_name, precision="fp32", engine=None, vad=False, vad_options=None,
+                            mode="sequential", chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                            overlap_seconds=DEFAULT_OVERLAP_SECONDS, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Transkript önbelleği anahtarı için parametreler. Mod ve modun kesim ayarları
+    (chunked: parça/örtüşme, batched: yığın boyu — log-mel kırpması yığın geneli),
+    varsayılan dışı çözümleme seçenekleri ve VAD ayarları da anahtara girer
+    (çıktıyı değiştirdikleri için). mode="stream": indirme sürerken akış transkripti.
+    """
+    precision, decode_options = resolve_engine(engine, precision)
+    params = {"source": "whisper", "model": model_name, "precision": precision, "mode": mode}
+    if mode == "chunked":
+        params.update(chunk_seconds=chunk_seconds, overlap_seconds=overlap_seconds)
+    elif mode == "batched":
+        params["batch_size"] = batch_size
+    if decode_options:
+        params["decode"] = decode_options
+    if vad:
+        params["vad"] = {**VAD_DEFAULTS, **(vad_options or {})}
+    return params
+
+
+def _open_journal(journal_path, mode, chunk_seconds, overlap_seconds):
+    """
+    Mod için kontrol noktası günlüğünü açar. Başlık, birimleri (pencere/parça
+    sınırlarını) belirleyen ayarları içerir; farklı ayarlarla yazılmış günlük atılır.
+    "sequential" modda Whisper tüm sesi tek çağrıda işlediğinden günlük tutulmaz.
+    """
+    if not journal_path or mode == "sequential":
+        return None
+    header = {"mode": mode}
+    if mode == "chunked":
+        header.update(chunk_seconds=chunk_seconds, overlap_seconds=overlap_seconds)
+    return TranscriptJournal(journal_path, header)
+
+
+def transcribe_audio(audio_path, model_name="base", delete_audio=True, device=None, precision="fp32",
+                     mode="sequential", workers=None, chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                     overlap_seconds=DEFAULT_OVERLAP_SECONDS, engine=None, threads=None, vad=False,
+                     vad_options=None, batch_size=DEFAULT_BATCH_SIZE, journal_path=None, on_segments=None,
+                     is_cancelled=None):
     """
     Verilen ses dosyasını Whisper kullanarak yazıya döker.
+    Model, süreç genelindeki kayıt defterinden alınır (her işte yeniden yüklenmez).
+    mode="chunked" ile uzun sesler parçalara bölünüp birden çok CPU çekirdeğinde
+    paralel işlenir (workers: işçi sayısı, chunk_seconds: parça uzunluğu).
+    mode="batched" ile 30 sn'lik pencereler batch_size'lık yığınlar halinde
+    birlikte kodlanıp çözümlenir (çok çekirdekli CPU'da matris çarpımları dolar).
+    mode="long" ile ses belleğe alınmadan bloklar halinde okunur (tepe bellek
+    sabit); LONG_AUDIO_SECONDS'tan uzun sesler bu moda otomatik geçer.
+    engine: ENGINE_PRESETS'ten ön ayar adı veya sözlüğü (hassasiyet, beam_size,
+    best_of, temperature); verilirse precision yerine ön ayarınki kullanılır.
+    threads: torch intra-op thread sayısı (None: tüm çekirdekler).
+    vad=True ile sessizlik/müzik bölümleri yazıya dökülmeden atlanır (zaman
+    damgaları orijinal sese göre kalır); vad_options VAD_DEFAULTS eşiklerini değiştirir.
+    journal_path verilirse "long", "chunked" ve "batched" modlarda tamamlanan
+    pencere/parçalar bu dosyaya işlenir; yarıda kalan transkript aynı dosyayla
+    yeniden çağrıldığında kaldığı yerden sürer. Başarıda günlük silinir.
+    on_segments(segmentler) başarıda zaman damgalı segment listesiyle çağrılır.
+    is_cancelled() True dönerse transkript bir sonraki pencere/parça/yığından
+    önce durur ve TRANSCRIPTION_CANCELLED_MESSAGE hatası döner; günlük silinmez.
+    "sequential" modda tek model çağrısı bölünemez; iptal sorulmaz.
     İşlem sonrası ses dosyasını silebilir (varsayılan: True).
     """
     if not audio_path or not os.path.exists(audio_path):
@@ -21,18 +915,68 @@ def transcribe_audio(audio_path, model_name="base", delete_audio=True):
     error_message = None
 
     try:
-        logging.info(f"Transkript oluşturuluyor (Model: {1})... Dosya: {audio_path}")
-        # Modeli yükle (ilk kullanımda indirir)
-        # Cihaz belirtilebilir: model = whisper.load_model(model_name, device="cuda") # GPU varsa
-        model = whisper.load_model(model_name)
+        precision, decode_options = resolve_engine(engine, precision)
+        precision = resolve_precision(precision, device)
+        logging.info(f"Transkript oluşturuluyor (Model: {model_name}, Mod: {mode}, Hassasiyet: {precision})... "
+                     f"Dosya: {audio_path}")
+        configure_torch_threads(threads)
+        duration = probe_duration(audio_path) if LONG_AUDIO_SECONDS else None
+        if mode != "long" and duration and duration > LONG_AUDIO_SECONDS:
+            logging.info(f"Ses {duration / 3600:.1f} saat; bellek sınırlı uzun ses moduna geçiliyor.")
+            mode = "long"
+        journal = _open_journal(journal_path, mode, chunk_seconds, overlap_seconds)
+        with metrics.span("whisper_transcribe", model=model_name, mode=mode):
+            if mode == "long":
+                if duration:
+                    _emit_estimate(duration, model_name, mode)
+                started = time.perf_counter()
+                with use_model(model_name, device=device, precision=precision) as model:
+                    result = _transcribe_long(audio_path, model, precision == "fp16", decode_options,
+                                              vad=vad, vad_options=vad_options, total_seconds=duration,
+                                              journal=journal, is_cancelled=is_cancelled)
+                audio_seconds = duration or (result["segments"][-1]["end"] if result["segments"] else 0)
+            elif mode == "chunked":
+                started = time.perf_counter()
+                result = _transcribe_chunked(audio_path, model_name, device, precision,
+                                             workers, chunk_seconds, overlap_seconds, decode_options,
+                                             vad=vad, vad_options=vad_options, journal=journal,
+                                             is_cancelled=is_cancelled)
+                audio_seconds = result["segments"][-1]["end"] if result["segments"] else 0
+            else:
+                # Ses önceden çözülür; süresi ETA tahmini ve RTF ölçümü için gerekir
+                from whisper.audio import load_audio
+                audio = load_audio(audio_path)
+                audio_seconds = len(audio) / SAMPLE_RATE
+                _emit_estimate(audio_seconds, model_name, mode)
+                started = time.perf_counter()
+                timeline = None
+                if vad:
+                    audio, timeline = _apply_vad(audio, vad_options)
 
-        # Transkripsiyon yap (fp16=False CPU'da daha uyumlu olabilir)
-        result = model.transcribe(audio_path, fp16=False)
+                # Model kopyası kayıt defterinden ödünç alınır (ilk kullanımda yüklenir, sonra bellekte
+                # kalır); transkript bitene kadar başka iş aynı kopyayı kullanmaz
+                with use_model(model_name, device=device, precision=precision) as model:
+                    # Transkripsiyon yap (fp16=False CPU'da daha uyumlu olabilir)
+                    if mode == "batched":
+                        result = _transcribe_batched(model, audio, precision == "fp16", decode_options,
+                                                     batch_size, journal=journal, is_cancelled=is_cancelled)
+                    else:
+                        result = model.transcribe(audio, fp16=(precision == "fp16"), **decode_options)
+                if timeline:
+                    _restore_timestamps(result, timeline)
+            _record_transcription(audio_seconds, time.perf_counter() - started, model_name, mode)
 
         transcript = result["text"]
         detected_language = result["language"]
         logging.info(f"Transkript oluşturuldu. Algılanan Dil: {detected_language}")
+        if journal:
+            journal.discard()
+        if on_segments:
+            on_segments(result["segments"])
 
+    except TranscriptionCancelled:
+        error_message = TRANSCRIPTION_CANCELLED_MESSAGE
+        logging.info(error_message)
     except Exception as e:
         error_message = f"Transkript sırasında hata: {e}"
         logging.error(error_message, exc_info=True) # Hata detayını logla
@@ -45,4 +989,4 @@ def transcribe_audio(audio_path, model_name="base", delete_audio=True):
             except OSError as e:
                 logging.warning(f"Geçici ses dosyası silinemedi: {e}")
 
-    return transcript, detected_language, error_message
\ No newline at end of file
+    return transcript, detected_language, error_message
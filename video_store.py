@@ -0,0 +1,249 @@
+# video_store.py
+import os
+import re
+import json
+import time
+import queue
+import sqlite3
+import threading
+import logging
+
+# Logger (diğer modüllerle aynı format)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_STORE_PATH = "ozetle_arsiv.sqlite3"
+STORE_BATCH_SIZE = 50 # Tek işlemde (transaction) yazılan en fazla video
+STORE_FLUSH_SECONDS = 1.0 # Kuyruktaki kayıtların en fazla bekleme süresi
+SEARCH_LIMIT = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    url TEXT,
+    title TEXT,
+    language TEXT,
+    source TEXT,
+    transcript TEXT,
+    summary TEXT,
+    stages TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_video ON segments(video_id, start);
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    title, summary, content='videos', content_rowid='id', tokenize='unicode61 remove_diacritics 2');
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2');
+"""
+
+_QUERY_WORD_RE = re.compile(r'\w+')
+
+
+def format_timestamp(seconds):
+    """Saniyeyi 'sa:dd:ss' veya 'dd:ss' biçimine çevirir."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60:02d}:{rest % 60:02d}"
+
+
+def timestamp_url(video_id, seconds):
+    """Videoyu verilen saniyeden açan YouTube bağlantısı."""
+    return f"https://www.youtube.com/watch?v={video_id}&t={int(seconds)}s"
+
+
+def _match_query(text):
+    """
+    Kullanıcı girdisini FTS5 sorgusuna çevirir: her kelime tırnaklanır (özel
+    karakterler sözdizimi hatası vermesin) ve önek araması yapılır (yazarken arama).
+    """
+    words = _QUERY_WORD_RE.findall(text)
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+class VideoStore:
+    """
+    İşlenen videoların kalıcı arşivi (SQLite): başlık, dil, transkript
+    segmentleri (zaman damgalarıyla), özet ve aşama süreleri. Başlık/özet ve
+    segment metinleri FTS5 ile indekslenir; binlerce video içinde arama
+    milisaniyeler sürer. Kayıtlar put() ile kuyruğa eklenir ve arka plandaki
+    yazıcı thread tarafından toplu işlemlerle (STORE_BATCH_SIZE) yazılır.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL") # Arama, yazma sürerken bekletilmez
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._writer = None
+
+    # --- Yazma ---
+    def save_many(self, records):
+        """
+        Kayıtları tek işlemde yazar. Kayıttaki None alanlar mevcut değerleri
+        silmez (örn. önbellekten gelen özet, daha önce kaydedilmiş transkripti korur).
+        """
+        records = [record for record in records if record.get("video_id")]
+        if not records:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            for record in records:
+                self._save(record, now)
+        logging.info(f"Arşive {len(records)} video yazıldı.")
+
+    def _save(self, record, now):
+        conn = self._conn
+        video_id = record["video_id"]
+        old = conn.execute("SELECT id, title, summary FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        if old:
+            # Harici içerikli FTS5 tablosunda eski değerler 'delete' komutuyla çıkarılır
+            conn.execute("INSERT INTO videos_fts(videos_fts, rowid, title, summary) VALUES ('delete', ?, ?, ?)",
+                         (old["id"], old["title"], old["summary"]))
+        stages = json.dumps(record["stages"], ensure_ascii=False) if record.get("stages") else None
+        conn.execute(
+            """INSERT INTO videos (video_id, url, title, language, source, transcript, summary, stages, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(video_id) DO UPDATE SET
+                   url = COALESCE(excluded.url, url),
+                   title = COALESCE(excluded.title, title),
+                   language = COALESCE(excluded.language, language),
+                   source = COALESCE(excluded.source, source),
+                   transcript = COALESCE(excluded.transcript, transcript),
+                   summary = COALESCE(excluded.summary, summary),
+                   stages = COALESCE(excluded.stages, stages),
+                   updated_at = excluded.updated_at""",
+            (video_id, record.get("url"), record.get("title"), record.get("language"), record.get("source"),
+             record.get("transcript"), record.get("summary"), stages, now))
+        row = conn.execute("SELECT id, title, summary FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        conn.execute("INSERT INTO videos_fts(rowid, title, summary) VALUES (?, ?, ?)",
+                     (row["id"], row["title"], row["summary"]))
+
+        segments = record.get("segments")
+        if segments:
+            conn.execute("INSERT INTO segments_fts(segments_fts, rowid, text) "
+                         "SELECT 'delete', id, text FROM segments WHERE video_id = ?", (video_id,))
+            conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            conn.executemany("INSERT INTO segments (video_id, start, end, text) VALUES (?, ?, ?, ?)",
+                             [(video_id, seg["start"], seg.get("end"), seg["text"].strip()) for seg in segments])
+            conn.execute("INSERT INTO segments_fts(rowid, text) SELECT id, text FROM segments WHERE video_id = ?",
+                         (video_id,))
+
+    def put(self, record):
+        """Kaydı yazma kuyruğuna ekler (hemen döner)."""
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="video-store", daemon=True)
+                    self._writer.start()
+        self._pending.put(record)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + STORE_FLUSH_SECONDS
+            while len(batch) < STORE_BATCH_SIZE:
+                try:
+                    batch.append(self._pending.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._save_batch(batch)
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+
+    def _save_batch(self, batch):
+        """
+        Toplu yazar; biri hatalıysa (sqlite, serileştirilemeyen alan vb.) kayıtları
+        tek tek yeniden dener ve bozuk olanı atlar. Yazma thread'i hiçbir
+        hatayla ölmez; aksi halde flush()/close() sonsuza dek bekler.
+        """
+        try:
+            self.save_many(batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                logging.error(f"Arşive yazılamadı, kayıt atlandı ({batch[0].get('video_id')}): {e}",
+                              exc_info=True)
+                return
+            logging.warning(f"Toplu arşiv yazımı başarısız, kayıtlar tek tek yazılıyor: {e}")
+        for record in batch:
+            try:
+                self.save_many([record])
+            except Exception as e:
+                logging.error(f"Arşive yazılamadı, kayıt atlandı ({record.get('video_id')}): {e}", exc_info=True)
+
+    def flush(self):
+        """Kuyruktaki tüm kayıtlar yazılana kadar bekler."""
+        self._pending.join()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    # --- Okuma ---
+    def search(self, text, limit=SEARCH_LIMIT):
+        """
+        Başlık/özet ve transkript segmentlerinde tam metin araması. Önce
+        başlık/özet eşleşmeleri (zaman damgasız), sonra segment eşleşmeleri
+        (zaman damgalı) ilgililiğe göre sıralı döner.
+        Dönüş: [{"video_id", "title", "start", "snippet"}]
+        """
+        query = _match_query(text)
+        if not query:
+            return []
+        with self._lock:
+            videos = self._conn.execute(
+                """SELECT v.video_id, v.title, NULL AS start,
+                          snippet(videos_fts, -1, '[', ']', '…', 12) AS snippet
+                   FROM videos_fts JOIN videos v ON v.id = videos_fts.rowid
+                   WHERE videos_fts MATCH ? ORDER BY bm25(videos_fts) LIMIT ?""", (query, limit)).fetchall()
+            segments = self._conn.execute(
+                """SELECT s.video_id, v.title, s.start,
+                          snippet(segments_fts, 0, '[', ']', '…', 12) AS snippet
+                   FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid
+                   JOIN videos v ON v.video_id = s.video_id
+                   WHERE segments_fts MATCH ? ORDER BY bm25(segments_fts) LIMIT ?""", (query, limit)).fetchall()
+        return [dict(row) for row in videos] + [dict(row) for row in segments]
+
+    def get(self, video_id):
+        """Videonun kaydı ve segmentleri; yoksa None."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            if row is None:
+                return None
+            segments = self._conn.execute("SELECT start, end, text FROM segments WHERE video_id = ? ORDER BY start",
+                                          (video_id,)).fetchall()
+        video = dict(row)
+        video["stages"] = json.loads(video["stages"]) if video["stages"] else {}
+        video["segments"] = [dict(segment) for segment in segments]
+        return video
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+
+def export_text(video):
+    """Arşivdeki video kaydının düz metin dökümü: başlık, özet ve zaman damgalı transkript."""
+    lines = [video.get("title") or video["video_id"], video.get("url") or "", ""]
+    if video.get("summary"):
+        lines += ["Özet:", video["summary"], ""]
+    if video.get("segments"):
+        lines.append("Transkript:")
+        lines += [f"[{format_timestamp(seg['start'])}] {seg['text']}" for seg in video["segments"]]
+    elif video.get("transcript"):
+        lines += ["Transkript:", video["transcript"]]
+    return "\n".join(lines).strip() + "\n"